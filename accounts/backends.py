@@ -0,0 +1,62 @@
+"""
+Authentication backend with a shared, versioned permission snapshot cache.
+
+ModelBackend recomputes a user's permissions with group and permission
+joins on every request, in every worker. This backend stores the resulting
+permission set in the shared cache, keyed by user and tagged with a global
+permission version. Any change to groups, group permissions or user
+permissions bumps the version (see accounts.signals), which invalidates
+every snapshot at once. Warm authorization checks cost no queries.
+"""
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+from dashboard.metrics import record_cache_lookup
+
+VERSION_KEY = 'perms:version'
+
+
+def _cache():
+    return caches[settings.PERMISSION_CACHE_ALIAS]
+
+
+def _snapshot_key(user_pk):
+    return f'perms:user:{user_pk}'
+
+
+def bump_permission_version():
+    """Invalidate every cached permission snapshot"""
+    _cache().set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+class CachedPermissionBackend(ModelBackend):
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = self._get_snapshot(user_obj)
+        return user_obj._perm_cache
+
+    def _get_snapshot(self, user_obj):
+        cache = _cache()
+        key = _snapshot_key(user_obj.pk)
+        cached = cache.get_many([VERSION_KEY, key])
+        version = cached.get(VERSION_KEY)
+        snapshot = cached.get(key)
+        hit = version is not None and snapshot is not None and snapshot[0] == version
+        record_cache_lookup('permissions', hit)
+        if hit:
+            return set(snapshot[1])
+
+        if version is None:
+            cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(VERSION_KEY)
+        # The version was read before querying, so a role change committed
+        # meanwhile leaves this snapshot tagged with an already stale version.
+        permissions = super().get_all_permissions(user_obj)
+        cache.set(key, (version, frozenset(permissions)), settings.PERMISSION_CACHE_TIMEOUT)
+        return permissions
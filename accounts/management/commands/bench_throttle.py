@@ -0,0 +1,84 @@
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from accounts.throttling import TokenBucketThrottle
+from public.api_views import NoticeViewSet
+
+BENCH_SCOPE = 'NoticeViewSet.bench'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the cost of one token-bucket throttle check against the configured '
+        'throttle cache and an in-process cache, for a growing number of distinct clients. '
+        'Bucket keys are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=5_000)
+        parser.add_argument('--clients', type=int, nargs='+', default=[1, 100, 1_000])
+
+    def handle(self, *args, **options):
+        aliases = [settings.THROTTLE_CACHE_ALIAS, 'bench-locmem']
+        bench_caches = {
+            **settings.CACHES,
+            'bench-locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'},
+        }
+        view = NoticeViewSet(action='bench')
+        # High enough that every check takes the allow path and writes the bucket
+        rates = {BENCH_SCOPE: f'{options["checks"] * 10}/s'}
+
+        with override_settings(CACHES=bench_caches, THROTTLE_RATES=rates, THROTTLE_ENABLED=True):
+            for alias in aliases:
+                for clients in options['clients']:
+                    with override_settings(THROTTLE_CACHE_ALIAS=alias):
+                        timings, allowed = self.run(view, clients, options['checks'])
+                    timings.sort()
+                    self.stdout.write(
+                        f'{alias:<13} {clients:>6} clients: '
+                        f'mean {statistics.fmean(timings):>7.1f} us  '
+                        f'p50 {timings[len(timings) // 2]:>7.1f} us  '
+                        f'p99 {timings[int(len(timings) * 0.99)]:>7.1f} us  '
+                        f'({options["checks"] / (sum(timings) / 1e6):,.0f} checks/s, {allowed} allowed)'
+                    )
+                    self.cleanup(alias, clients)
+
+            # A single client over its limit: the deny path skips the write
+            with override_settings(THROTTLE_RATES={BENCH_SCOPE: '1/d'}):
+                for alias in aliases:
+                    with override_settings(THROTTLE_CACHE_ALIAS=alias):
+                        timings, allowed = self.run(view, 1, options['checks'])
+                    self.stdout.write(
+                        f'{alias:<13}      1 client over limit: mean {statistics.fmean(timings):>7.1f} us '
+                        f'({allowed} allowed)'
+                    )
+                    self.cleanup(alias, 1)
+
+    def requests(self, clients):
+        return [
+            SimpleNamespace(user=AnonymousUser(), META={'REMOTE_ADDR': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'})
+            for i in range(clients)
+        ]
+
+    def run(self, view, clients, checks):
+        requests = self.requests(clients)
+        timings, allowed = [], 0
+        for i in range(checks):
+            throttle = TokenBucketThrottle()
+            started = time.perf_counter()
+            allowed += throttle.allow_request(requests[i % clients], view)
+            timings.append((time.perf_counter() - started) * 1e6)
+        return timings, allowed
+
+    def cleanup(self, alias, clients):
+        throttle = TokenBucketThrottle()
+        caches[alias].delete_many([
+            throttle.get_cache_key(request, BENCH_SCOPE) for request in self.requests(clients)
+        ])
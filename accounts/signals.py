@@ -0,0 +1,28 @@
+"""
+Bump the permission snapshot version whenever effective permissions change.
+
+Covers role assignment (User.groups), role edits (Group.permissions),
+direct grants (User.user_permissions) and group or permission deletion.
+Bumps run after commit so no worker can cache pre-change data under the
+new version.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete
+from .backends import bump_permission_version
+
+User = get_user_model()
+
+
+def schedule_permission_bump(**kwargs):
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        transaction.on_commit(bump_permission_version)
+
+
+for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+    m2m_changed.connect(schedule_permission_bump, sender=through, dispatch_uid=f'perm-version-{through._meta.label}')
+
+for model in (Group, Permission):
+    post_delete.connect(schedule_permission_bump, sender=model, dispatch_uid=f'perm-version-{model._meta.label}')
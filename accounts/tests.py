@@ -1,3 +1,111 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .backends import bump_permission_version
+
+User = get_user_model()
+
+THROTTLE_CACHES = {
+    **settings.CACHES,
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle-tests'},
+}
+
+
+@override_settings(
+    CACHES=THROTTLE_CACHES, THROTTLE_ENABLED=True, THROTTLE_RATES={'NoticeViewSet': '2/min'},
+    REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=False,
+)
+class TokenBucketThrottleTests(TestCase):
+    url = reverse('notice-list')
+
+    def setUp(self):
+        caches['throttle'].clear()
+
+    def get(self, remote_addr='203.0.113.1', forwarded_for=None):
+        headers = {'X-Forwarded-For': forwarded_for} if forwarded_for else {}
+        return self.client.get(self.url, REMOTE_ADDR=remote_addr, headers=headers)
+
+    def test_empty_bucket_answers_429_with_retry_after(self):
+        for _ in range(2):
+            self.assertEqual(self.get().status_code, 200)
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 30)
+        # Other clients have their own bucket
+        self.assertEqual(self.get(remote_addr='203.0.113.2').status_code, 200)
+
+    def test_client_supplied_forwarded_for_does_not_pick_the_bucket(self):
+        statuses = [self.get(forwarded_for=str(uuid.uuid4())).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_behind_a_proxy_clients_are_told_apart_by_the_address_it_saw(self):
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            # The proxy appends the address it saw to whatever the client sent
+            statuses = [self.get(forwarded_for=f'{uuid.uuid4()}, 198.51.100.7').status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+            self.assertEqual(self.get(forwarded_for='198.51.100.8').status_code, 200)
+
+
+@override_settings(REPLICA_DATABASES=[], THROTTLE_ENABLED=False)
+class CachedPermissionBackendTests(TestCase):
+    """Role changes reach the very next request, while warm checks cost no queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.editors = Group.objects.create(name='Editors')
+        cls.editors.permissions.add(Permission.objects.get(codename='add_notice'))
+        cls.teacher = User.objects.create_user(email='teacher@example.com', password='unused')
+
+    def setUp(self):
+        # The shared cache outlives the test database
+        bump_permission_version()
+        self.admin = self.client_class()
+        self.admin.force_login(User.objects.create_superuser(email='admin@example.com', password='unused'))
+        self.client.force_login(self.teacher)
+
+    def can_add_notices(self):
+        """Whether the teacher's next request may create a notice"""
+        status = self.client.get(reverse('dashboard:notice_create')).status_code
+        self.assertIn(status, (200, 403))
+        return status == 200
+
+    def test_warm_snapshot_answers_without_queries(self):
+        self.teacher.groups.add(self.editors)
+        User.objects.get(pk=self.teacher.pk).has_perm('public.add_notice')
+        # A new request loads a new user object
+        user = User.objects.get(pk=self.teacher.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('public.add_notice'))
+            self.assertFalse(user.has_perm('public.delete_notice'))
+
+    def test_role_changes_apply_to_the_next_request(self):
+        self.assertFalse(self.can_add_notices())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin.post(
+                reverse('user-update-roles', args=[self.teacher.pk]), {'groups': [self.editors.pk]},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.can_add_notices())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin.post(
+                reverse('user-bulk-roles'),
+                {'users': [self.teacher.pk], 'groups': [self.editors.pk], 'mode': 'remove'},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.can_add_notices())
+
+    def test_role_permission_edits_apply_to_the_next_request(self):
+        self.teacher.groups.add(self.editors)
+        self.assertTrue(self.can_add_notices())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.editors.permissions.clear()
+        self.assertFalse(self.can_add_notices())
@@ -0,0 +1,120 @@
+"""
+Token-bucket throttling shared by all workers.
+
+Limits are set per view and action in THROTTLE_RATES, e.g.
+"AdmissionApplicationViewSet.create" or "TokenObtainPairView" (a bare class
+name covers every action). Views without a matching entry are not
+throttled. Requests are counted per user when authenticated, and per client
+IP otherwise, taken from X-Forwarded-For only as far as the
+REST_FRAMEWORK["NUM_PROXIES"] trusted proxies vouch for it.
+
+A rate of "10/min" is a bucket of 10 tokens refilled at one every 6
+seconds. The bucket is stored as a single number in the shared cache, its
+theoretical arrival time (the GCRA form of a token bucket), so a check is
+one cache read and one write whatever the traffic. The read and the write
+are not atomic: concurrent requests from the same client in different
+workers can both get through the last token.
+
+Buckets go to their own cache alias. Use Redis for it when running several
+hosts; the default BucketFileCache is a file cache cheap enough to write on
+every request.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """
+    Parse a DRF-style rate string
+
+    Args:
+        rate: "<requests>/<period>", where the period starts with s, m, h or d
+
+    Returns:
+        tuple: (requests, period in seconds)
+    """
+    requests, period = rate.split('/')
+    return int(requests), PERIODS[period[0]]
+
+
+class BucketFileCache(FileBasedCache):
+    """
+    FileBasedCache that checks whether to cull on every CULL_EVERY-th write
+
+    FileBasedCache lists its whole directory on each set() to count entries,
+    which makes a write cost grow with the number of clients being tracked.
+    Buckets expire within one rate period, so an occasional cull keeps the
+    directory bounded just as well.
+    """
+    CULL_EVERY = 1000
+
+    def __init__(self, dir, params):
+        options = {'MAX_ENTRIES': 100_000, **params.get('OPTIONS', {})}
+        super().__init__(dir, {**params, 'OPTIONS': options})
+        self._writes = 0
+
+    def _cull(self):
+        self._writes += 1
+        if self._writes % self.CULL_EVERY == 0:
+            super()._cull()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    A view can refine the action it is throttled as with get_throttle_action(),
+    e.g. to give searches a lower limit than plain listing, and share another
+    view's limits by naming it in `throttle_name`.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def get_scope(self, view):
+        name = getattr(view, 'throttle_name', type(view).__name__)
+        get_action = getattr(view, 'get_throttle_action', None)
+        action = get_action() if get_action else getattr(view, 'action', None)
+        for scope in (f'{name}.{action}', name):
+            if scope in settings.THROTTLE_RATES:
+                return scope
+        return None
+
+    def get_cache_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'throttle:{scope}:{ident}'
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE_ENABLED:
+            return True
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+
+        requests, period = parse_rate(settings.THROTTLE_RATES[scope])
+        interval = period / requests
+        key = self.get_cache_key(request, scope)
+        now = time.time()
+
+        # The bucket is empty once its arrival time is a full period ahead
+        arrival = max(self.cache.get(key, now), now) + interval
+        allowed_at = arrival - period
+        if now < allowed_at:
+            self.wait_seconds = allowed_at - now
+            return False
+        self.cache.set(key, arrival, int(arrival - now) + 1)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
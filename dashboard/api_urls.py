@@ -1,4 +1,5 @@
 from rest_framework.routers import DefaultRouter
+from django.conf import settings
 from django.urls import path, include
 from .api_views import (
     DashboardStatsAPIView,
@@ -14,8 +15,25 @@ router.register("users", UserManagementViewSet, basename="user")
 router.register("groups", GroupManagementViewSet, basename="group")
 router.register("permissions", PermissionViewSet, basename="permission")
 
-urlpatterns = [
-    path("stats/", DashboardStatsAPIView.as_view(), name="dashboard-stats"),
-    path("permissions/", UserPermissionsAPIView.as_view(), name="user-permissions"),
+
+def async_urlpatterns():
+    """The async stats and permissions routes, mounted with ASYNC_API_VIEWS"""
+    from .async_api_views import AsyncDashboardStatsAPIView, AsyncUserPermissionsAPIView
+    
+    return [
+        path("stats/", AsyncDashboardStatsAPIView.as_view(), name="dashboard-stats"),
+        path("permissions/", AsyncUserPermissionsAPIView.as_view(), name="user-permissions"),
+    ]
+
+
+if settings.ASYNC_API_VIEWS:
+    urlpatterns = async_urlpatterns()
+else:
+    urlpatterns = [
+        path("stats/", DashboardStatsAPIView.as_view(), name="dashboard-stats"),
+        path("permissions/", UserPermissionsAPIView.as_view(), name="user-permissions"),
+    ]
+
+urlpatterns += [
     path("", include(router.urls)),
 ]
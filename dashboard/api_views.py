@@ -4,70 +4,87 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth.models import Group, Permission
 from django.contrib.auth import get_user_model
-from public.models import Notice, AdmissionApplication
-from public.utils import apply_search_filter, check_api_permission, USER_SEARCH_FIELDS
+from django.db.models import Count, Prefetch, prefetch_related_objects
+from public.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, stream_export
+from public.imports import CSV
+from public.utils import apply_search_filter, apply_autocomplete, check_api_permission, USER_SEARCH_FIELDS
+from . import counters, roles
 from .serializers import (
-    DashboardStatsSerializer, UserManagementSerializer, 
+    DashboardStatsSerializer, UserManagementSerializer, UserAutocompleteSerializer, BulkRoleUpdateSerializer,
     GroupManagementSerializer, PermissionSerializer
 )
 
 User = get_user_model()
 
+def groups_prefetch():
+    """The users' groups, loaded once for both UserManagementSerializer group fields"""
+    return Prefetch('groups', queryset=Group.objects.only('id', 'name'))
+
+
+USER_EXPORT_FIELDS = [
+    'id', 'email', 'first_name', 'last_name', 'phone', 'is_staff', 'is_active', 'date_joined',
+]
+
 
 class DashboardStatsAPIView(APIView):
     """API view for dashboard statistics - replaces direct template context data"""
     permission_classes = [permissions.IsAuthenticated]
+    # Safe to serve from a read replica (school_management.db_router)
+    replica_reads = True
     
     def get(self, request):
         """Get dashboard statistics for authenticated user"""
         user = request.user
+        # Denormalized counters: one small indexed read instead of table counts
+        stats = counters.get_counters(counters.ACTIVE_NOTICES, counters.ADMISSIONS)
         
         # Basic stats for all users
         stats_data = {
-            'notice_count': Notice.objects.filter(is_active=True).count(),
+            'notice_count': stats[counters.ACTIVE_NOTICES],
             'user_groups_count': user.groups.count()
         }
         
         # Additional stats for users with permissions
         if user.has_perm('public.view_admissionapplication'):
-            stats_data['admission_count'] = AdmissionApplication.objects.count()
+            stats_data['admission_count'] = stats[counters.ADMISSIONS]
         
         serializer = DashboardStatsSerializer(stats_data)
         return Response(serializer.data)
 
 
+def permission_flags(user):
+    """Navigation flags for the permissions the user holds"""
+    return {
+        'can_view_notices': user.has_perm('public.view_notice'),
+        'can_add_notices': user.has_perm('public.add_notice'),
+        'can_change_notices': user.has_perm('public.change_notice'),
+        'can_delete_notices': user.has_perm('public.delete_notice'),
+        'can_view_admissions': user.has_perm('public.view_admissionapplication'),
+        'can_add_admissions': user.has_perm('public.add_admissionapplication'),
+        'can_change_admissions': user.has_perm('public.change_admissionapplication'),
+        'can_delete_admissions': user.has_perm('public.delete_admissionapplication'),
+        'can_manage_roles': (
+            user.has_perm('auth.view_group') or 
+            user.has_perm('auth.add_group') or 
+            user.has_perm('auth.change_group') or 
+            user.has_perm('auth.delete_group')
+        ),
+        'can_manage_users': (
+            user.has_perm('accounts.view_user') or 
+            user.has_perm('accounts.add_user') or 
+            user.has_perm('accounts.change_user') or 
+            user.has_perm('accounts.delete_user')
+        )
+    }
+
+
 class UserPermissionsAPIView(APIView):
     """API view for user permissions - replaces template permission checks"""
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
         """Get user permissions for frontend navigation"""
-        user = request.user
-        
-        permissions_data = {
-            'can_view_notices': user.has_perm('public.view_notice'),
-            'can_add_notices': user.has_perm('public.add_notice'),
-            'can_change_notices': user.has_perm('public.change_notice'),
-            'can_delete_notices': user.has_perm('public.delete_notice'),
-            'can_view_admissions': user.has_perm('public.view_admissionapplication'),
-            'can_add_admissions': user.has_perm('public.add_admissionapplication'),
-            'can_change_admissions': user.has_perm('public.change_admissionapplication'),
-            'can_delete_admissions': user.has_perm('public.delete_admissionapplication'),
-            'can_manage_roles': (
-                user.has_perm('auth.view_group') or 
-                user.has_perm('auth.add_group') or 
-                user.has_perm('auth.change_group') or 
-                user.has_perm('auth.delete_group')
-            ),
-            'can_manage_users': (
-                user.has_perm('accounts.view_user') or 
-                user.has_perm('accounts.add_user') or 
-                user.has_perm('accounts.change_user') or 
-                user.has_perm('accounts.delete_user')
-            )
-        }
-        
-        return Response(permissions_data)
+        return Response(permission_flags(request.user))
 
 
 class UserManagementViewSet(viewsets.ModelViewSet):
@@ -75,10 +92,15 @@ class UserManagementViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserManagementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Keyset order for ?pagination=cursor
+    cursor_ordering = ('email', 'id')
+    # Actions safe to serve from a read replica (school_management.db_router)
+    replica_actions = {'list', 'retrieve', 'export', 'autocomplete'}
     
     def get_queryset(self):
         """Filter users based on search and role parameters"""
-        queryset = User.objects.all().prefetch_related('groups')
+        # groups and groups_list are both served from this one prefetch
+        queryset = User.objects.all().prefetch_related(groups_prefetch())
         
         search = self.request.query_params.get('search', None)
         role_filter = self.request.query_params.get('role', None)
@@ -135,14 +157,66 @@ class UserManagementViewSet(viewsets.ModelViewSet):
         user = self.get_object()
         group_ids = request.data.get('groups', [])
         
-        # Clear existing groups and add new ones
-        user.groups.clear()
-        if group_ids:
-            groups = Group.objects.filter(id__in=group_ids)
-            user.groups.set(groups)
+        # Replace roles in one diff so the user is never left without any
+        groups = Group.objects.filter(id__in=group_ids).values_list('id', flat=True)
+        roles.bulk_update_roles([user.pk], groups, roles.ASSIGN)
         
+        # Only the groups changed: drop their prefetched rows and load them again
+        user.refresh_from_db(fields=['groups'])
+        prefetch_related_objects([user], groups_prefetch())
         serializer = self.get_serializer(user)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-roles')
+    def bulk_roles(self, request):
+        """Assign, add or remove roles for many users at once - requires change_group permission"""
+        permission_check = check_api_permission(request.user, 'auth.change_group')
+        if permission_check:
+            return permission_check
+        
+        serializer = BulkRoleUpdateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        changed = roles.bulk_update_roles(data['users'], data['groups'], data['mode'])
+        return Response({'mode': data['mode'], 'users': len(set(data['users'])), **changed})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream matching users with their roles as CSV or NDJSON - requires view_user permission"""
+        permission_check = check_api_permission(request.user, 'accounts.view_user')
+        if permission_check:
+            return permission_check
+        
+        file_format = request.query_params.get('file_format', CSV)
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'file_format': [f'Expected one of {", ".join(EXPORT_FORMATS)}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Groups are prefetched per chunk of users, not per user
+        users = self.get_queryset().only(*USER_EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        rows = (
+            [getattr(user, field) for field in USER_EXPORT_FIELDS]
+            + [';'.join(group.name for group in user.groups.all())]
+            for user in users
+        )
+        return stream_export(USER_EXPORT_FIELDS + ['groups'], rows, file_format, 'users')
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Typeahead matches by name or email - requires view_user permission"""
+        permission_check = check_api_permission(request.user, 'accounts.view_user')
+        if permission_check:
+            return permission_check
+        
+        queryset = User.objects.only(*UserAutocompleteSerializer.Meta.fields)
+        matches = apply_autocomplete(
+            queryset, request.query_params.get('q'), USER_SEARCH_FIELDS,
+            limit=request.query_params.get('limit'),
+        )
+        serializer = UserAutocompleteSerializer(matches, many=True)
+        return Response(serializer.data)
 
 
 class GroupManagementViewSet(viewsets.ModelViewSet):
@@ -152,8 +226,15 @@ class GroupManagementViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        """Return all groups with related data"""
-        return Group.objects.all().prefetch_related('permissions', 'user_set')
+        """Return all groups with member counts and permissions, never the members themselves"""
+        return (
+            Group.objects
+            .annotate(user_count=Count('user', distinct=True))
+            .prefetch_related(
+                Prefetch('permissions', queryset=Permission.objects.select_related('content_type'))
+            )
+            .order_by('name')
+        )
     
     def list(self, request, *args, **kwargs):
         """List groups - requires view_group permission"""
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        
+        if settings.METRICS_ENABLED:
+            from .metrics import setup
+            setup()
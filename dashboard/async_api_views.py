@@ -0,0 +1,47 @@
+"""
+Async read path for dashboard stats and permissions (see public.async_api).
+
+Mounted in place of DashboardStatsAPIView and UserPermissionsAPIView when
+ASYNC_API_VIEWS is enabled.
+"""
+from rest_framework import permissions
+from rest_framework.response import Response
+from public.async_api import AsyncAPIView, run_concurrently
+from . import counters
+from .api_views import permission_flags
+from .serializers import DashboardStatsSerializer
+
+
+class AsyncDashboardStatsAPIView(AsyncAPIView):
+    """DashboardStatsAPIView with the counters, group count and permission check run concurrently"""
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_name = 'DashboardStatsAPIView'
+    replica_reads = True
+    
+    async def get(self, request):
+        user = request.user
+        stats, user_groups_count, can_view_admissions = await run_concurrently(
+            lambda: counters.get_counters(counters.ACTIVE_NOTICES, counters.ADMISSIONS),
+            user.groups.count,
+            lambda: user.has_perm('public.view_admissionapplication'),
+        )
+        
+        stats_data = {
+            'notice_count': stats[counters.ACTIVE_NOTICES],
+            'user_groups_count': user_groups_count,
+        }
+        if can_view_admissions:
+            stats_data['admission_count'] = stats[counters.ADMISSIONS]
+        
+        serializer = DashboardStatsSerializer(stats_data)
+        return Response(serializer.data)
+
+
+class AsyncUserPermissionsAPIView(AsyncAPIView):
+    """UserPermissionsAPIView with the permission snapshot loaded off the event loop"""
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_name = 'UserPermissionsAPIView'
+    
+    async def get(self, request):
+        [flags] = await run_concurrently(lambda: permission_flags(request.user))
+        return Response(flags)
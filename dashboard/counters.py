@@ -0,0 +1,90 @@
+"""
+Denormalized dashboard counters.
+
+Each counter is adjusted by dashboard.signals whenever the underlying table
+changes, so reading it costs one indexed lookup no matter how large the
+table grows. Adjustments run in the caller's transaction when there is one;
+anything that slips past the signals (raw SQL, fixture loads, failed
+autocommit sequences) is repaired by `manage.py reconcile_counters`.
+
+A counter is spread over SHARDS StatCounter rows and each adjustment goes
+to one of them at random. An increment holds its row lock until the
+caller's transaction commits, so with a single row every concurrent
+admission would queue behind the one before it; with shards they rarely
+meet. Reads sum the shards in the same single query.
+"""
+import random
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.db.models.functions import Now
+from public.models import Notice, AdmissionApplication
+from .models import StatCounter
+
+ACTIVE_NOTICES = 'active_notices'
+ADMISSIONS = 'admissions'
+
+SHARDS = 8
+
+# Exact count for each counter, used to seed and reconcile stored values
+COUNTER_SOURCES = {
+    ACTIVE_NOTICES: lambda: Notice.objects.filter(is_active=True).count(),
+    ADMISSIONS: lambda: AdmissionApplication.objects.count(),
+}
+
+
+def increment(name, delta):
+    """Atomically add `delta` to a counter"""
+    if not delta:
+        return
+    shard = random.randrange(SHARDS)
+    updated = StatCounter.objects.filter(name=name, shard=shard).update(value=F('value') + delta)
+    if not updated:
+        # Never seeded, or seeded before it was sharded; reconciling creates
+        # every shard and the change is already visible to an exact count
+        reconcile([name])
+
+
+def get_counters(*names):
+    """
+    Return {name: value} for the given counters in a single query
+
+    Reads never write, as they may run on a replica. The rows are created by
+    migrations and recreated by reconcile() (`manage.py reconcile_counters`);
+    until then a missing counter reads as 0.
+    """
+    values = dict(
+        StatCounter.objects.filter(name__in=names).values('name')
+        .annotate(total=Sum('value')).values_list('name', 'total')
+    )
+    return {name: values.get(name, 0) for name in names}
+
+
+def reconcile(names=None):
+    """
+    Recompute counters from their source tables
+    
+    The counter's shards are locked before counting, so increments from
+    concurrent writers either land in the exact count or are applied after
+    it. A repaired counter keeps its whole value in shard 0.
+    
+    Returns:
+        {name: (stored value or None, exact value)}
+    """
+    results = {}
+    for name in names or COUNTER_SOURCES:
+        with transaction.atomic():
+            shards = list(StatCounter.objects.select_for_update().filter(name=name).order_by('shard'))
+            stored = sum(shard.value for shard in shards) if shards else None
+            present = {shard.shard for shard in shards}
+            StatCounter.objects.bulk_create(
+                [StatCounter(name=name, shard=shard) for shard in range(SHARDS) if shard not in present],
+                ignore_conflicts=True,
+            )
+            exact = COUNTER_SOURCES[name]()
+            if stored != exact:
+                StatCounter.objects.filter(name=name).update(
+                    value=Case(When(shard=0, then=Value(exact)), default=Value(0)), updated_at=Now(),
+                )
+            results[name] = (stored, exact)
+    return results
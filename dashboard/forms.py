@@ -0,0 +1,23 @@
+from django import forms
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from . import roles
+
+User = get_user_model()
+
+
+class BulkRoleUpdateForm(forms.Form):
+    users = forms.ModelMultipleChoiceField(queryset=User.objects.all())
+    groups = forms.ModelMultipleChoiceField(queryset=Group.objects.all(), required=False)
+    mode = forms.ChoiceField(choices=roles.MODES, initial=roles.ASSIGN)
+
+    def __init__(self, *args, request_user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_user = request_user
+
+    def clean_users(self):
+        users = self.cleaned_data['users']
+        if not self.request_user.is_superuser and users.filter(is_superuser=True).exists():
+            raise ValidationError('Only superusers can change superuser roles.')
+        return users
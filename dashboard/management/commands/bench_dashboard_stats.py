@@ -0,0 +1,63 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard import counters
+from public.models import AdmissionApplication, Notice
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks dashboard stats from table counts against the denormalized '
+        'counters as the tables grow. Seeded rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--steps', type=int, nargs='+', default=[10_000, 100_000, 500_000],
+                            help='Table sizes to measure at')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seeded = 0
+            for target in options['steps']:
+                self.seed(target - seeded)
+                seeded = target
+                counted = self.measure(options['repeat'], lambda: (
+                    Notice.objects.filter(is_active=True).count(),
+                    AdmissionApplication.objects.count(),
+                ))
+                cached = self.measure(options['repeat'], lambda: counters.get_counters(
+                    counters.ACTIVE_NOTICES, counters.ADMISSIONS,
+                ))
+                self.stdout.write(
+                    f'rows={target:<9} count(*)={counted:.3f}ms counters={cached:.3f}ms'
+                )
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        for start in range(0, count, 5000):
+            size = min(5000, count - start)
+            Notice.objects.bulk_create([
+                Notice(title='-', content='-', is_active=i % 10 != 0) for i in range(size)
+            ])
+            AdmissionApplication.objects.bulk_create([
+                AdmissionApplication(
+                    first_name='-', last_name='-', email='a@example.com', phone='0',
+                    date_of_birth=date(2012, 1, 1), gender='M', address='-',
+                    grade_applying_for='Grade 1', parent_name='-', parent_phone='0',
+                    parent_email='p@example.com',
+                )
+                for _ in range(size)
+            ])
+
+    def measure(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2]
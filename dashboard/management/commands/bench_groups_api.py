@@ -0,0 +1,56 @@
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures queries, peak Python memory and latency of the groups API as one '
+        "group's membership grows. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, nargs='+', default=[100, 1_000, 10_000],
+                            help='Group sizes to measure at')
+
+    def handle(self, *args, **options):
+        # Replicas cannot see the seeded rows, which are never committed
+        with override_settings(ALLOWED_HOSTS=['*'], REPLICA_DATABASES=[]), transaction.atomic():
+            client = Client()
+            client.force_login(User.objects.create_superuser(
+                email='bench-groups@example.com', password='bench-groups',
+            ))
+            group = Group.objects.create(name='Bench teachers')
+            group.permissions.set(Permission.objects.all())
+            url = reverse('group-list')
+            client.get(url)
+
+            members = 0
+            for target in options['members']:
+                users = User.objects.bulk_create([
+                    User(email=f'bench-teacher{i}@example.com') for i in range(members, target)
+                ], batch_size=5000)
+                group.user_set.add(*users)
+                members = target
+
+                tracemalloc.start()
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                elapsed = (time.perf_counter() - started) * 1000
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(
+                    f'members={target:<7} status={response.status_code} queries={len(queries)} '
+                    f'peak={peak / 1024:.0f}KiB time={elapsed:.1f}ms'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes dashboard counters from their source tables and repairs any drift. '
+        'Safe to run periodically (e.g. from cron) while the site is live.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Counters to reconcile (default: all)')
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(counters.COUNTER_SOURCES)
+        if unknown:
+            raise CommandError(f'Unknown counters: {", ".join(sorted(unknown))}')
+
+        results = counters.reconcile(options['names'] or None)
+        for name, (stored, exact) in results.items():
+            if stored == exact:
+                self.stdout.write(f'{name}: {exact} (ok)')
+            else:
+                self.stdout.write(self.style.WARNING(f'{name}: {stored} -> {exact} (repaired)'))
@@ -0,0 +1,185 @@
+"""
+Prometheus metrics for every request, scraped from /metrics.
+
+MetricsMiddleware records, per resolved URL name (`notice-list`,
+`dashboard:notice_management`, ...), the request count by method and
+status, a latency histogram and a histogram of queries per request;
+exceptions raised by views are counted separately. The response and
+permission caches report their hits and misses through
+record_cache_lookup(). Error rates and hit ratios are left to the query
+side, e.g.
+
+    sum(rate(django_http_requests_total{status=~"5.."}[5m])) by (view)
+      / sum(rate(django_http_requests_total[5m])) by (view)
+    sum(rate(app_cache_lookups_total{result="hit"}[5m])) by (cache)
+      / sum(rate(app_cache_lookups_total[5m])) by (cache)
+
+Each worker process writes its samples to its own memory-mapped files in
+METRICS_DIR (prometheus_client's multiprocess mode), so recording takes
+no cross-process lock and a scrape of any worker sums all of them. The
+directory is cleared when gunicorn starts (see gunicorn.conf.py); point
+PROMETHEUS_MULTIPROC_DIR elsewhere to keep separate deployments apart.
+With METRICS_ENABLED off (the default outside production) nothing here
+touches the environment or the filesystem.
+"""
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from . import server_timing
+
+UNRESOLVED = '<unresolved>'
+
+
+class Metrics:
+    """The metric objects; create them through setup()"""
+
+    def __init__(self):
+        from prometheus_client import Counter, Histogram
+
+        self.requests = Counter(
+            'django_http_requests_total', 'Requests by URL name, method and response status',
+            ['view', 'method', 'status'],
+        )
+        self.latency = Histogram(
+            'django_http_request_duration_seconds', 'Request latency by URL name', ['view'],
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        )
+        self.queries = Histogram(
+            'django_http_request_queries', 'Database queries per request by URL name', ['view'],
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+        )
+        self.exceptions = Counter(
+            'django_http_exceptions_total', 'Exceptions raised by views, by URL name and type', ['view', 'type'],
+        )
+        self.cache_lookups = Counter(
+            'app_cache_lookups_total', 'Application cache lookups by cache and result', ['cache', 'result'],
+        )
+
+
+_metrics = None
+
+
+def setup():
+    """
+    Create the metrics on first use, in METRICS_DIR
+
+    prometheus_client picks its value store when it is first imported, so
+    the directory is exported and created before then. Only called with
+    METRICS_ENABLED: from DashboardConfig.ready() and the middleware.
+    """
+    global _metrics
+    if _metrics is None:
+        os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', str(settings.METRICS_DIR))
+        os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+        _metrics = Metrics()
+    return _metrics
+
+
+# Labelled children by label values. metric.labels() takes a lock per call;
+# a plain dict read does not, and a racing first insert is harmless since
+# labels() returns the same child either way.
+_children = {}
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def record_cache_lookup(cache, hit):
+    """Count a hit or miss of `cache`; a no-op unless METRICS_ENABLED"""
+    if settings.METRICS_ENABLED:
+        _child(setup().cache_lookups, cache, 'hit' if hit else 'miss').inc()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED
+
+
+class MetricsMiddleware:
+    """Records request metrics per URL name; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.metrics = setup()
+        server_timing.install_query_hook()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Share the Server-Timing counters when that middleware is on
+        timings, token = server_timing.current(), None
+        if timings is None:
+            timings, token = server_timing.start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                server_timing.stop(token)
+        self.record(request, response, time.perf_counter() - started, timings.queries)
+        return response
+
+    async def __acall__(self, request):
+        timings, token = server_timing.current(), None
+        if timings is None:
+            timings, token = server_timing.start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                server_timing.stop(token)
+        self.record(request, response, time.perf_counter() - started, timings.queries)
+        return response
+
+    def record(self, request, response, duration, queries):
+        view = _view_name(request)
+        _child(self.metrics.requests, view, request.method, str(response.status_code)).inc()
+        _child(self.metrics.latency, view).observe(duration)
+        _child(self.metrics.queries, view).observe(queries)
+
+    def process_exception(self, request, exception):
+        # Django turns these into 404 and 403 responses, counted above
+        if isinstance(exception, (Http404, PermissionDenied)):
+            return
+        _child(self.metrics.exceptions, _view_name(request), type(exception).__name__).inc()
+
+
+def metrics_view(request):
+    """
+    The metrics of every worker in the Prometheus text format
+
+    Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`; without
+    a token configured, only superusers may read the metrics.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'):
+            raise PermissionDenied
+    elif not request.user.is_superuser:
+        raise PermissionDenied
+
+    setup()
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-17 20:02
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    StatCounter = apps.get_model('dashboard', 'StatCounter')
+    Notice = apps.get_model('public', 'Notice')
+    AdmissionApplication = apps.get_model('public', 'AdmissionApplication')
+    StatCounter.objects.bulk_create([
+        StatCounter(name='active_notices', value=Notice.objects.filter(is_active=True).count()),
+        StatCounter(name='admissions', value=AdmissionApplication.objects.count()),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_delete_rolemanagement'),
+        ('public', '0004_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.23 on 2026-10-17 21:43
+
+from django.db import migrations, models
+
+# dashboard.counters.SHARDS when this migration was written
+SHARDS = 8
+
+
+def add_shards(apps, schema_editor):
+    # Existing counters become shard 0; their other shards start at zero
+    StatCounter = apps.get_model('dashboard', 'StatCounter')
+    StatCounter.objects.bulk_create([
+        StatCounter(name=name, shard=shard)
+        for name in StatCounter.objects.values_list('name', flat=True)
+        for shard in range(1, SHARDS)
+    ])
+
+
+def remove_shards(apps, schema_editor):
+    # Fold every shard back into shard 0 before the unique name returns
+    StatCounter = apps.get_model('dashboard', 'StatCounter')
+    for name in set(StatCounter.objects.values_list('name', flat=True)):
+        shards = StatCounter.objects.filter(name=name)
+        total = shards.aggregate(total=models.Sum('value'))['total']
+        shards.exclude(shard=0).delete()
+        shards.update(value=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_statcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statcounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='statcounter',
+            name='name',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='statcounter',
+            constraint=models.UniqueConstraint(fields=('name', 'shard'), name='statcounter_name_shard_uniq'),
+        ),
+        migrations.RunPython(add_shards, remove_shards),
+    ]
@@ -1 +1,23 @@
 from django.db import models
+
+
+class StatCounter(models.Model):
+    """
+    One shard of a denormalized row count kept current by dashboard.signals.
+
+    Lets the dashboard read a handful of rows instead of counting whole
+    tables; a counter's value is the sum of its shards. See
+    dashboard.counters for the API and reconcile_counters for drift repair.
+    """
+    name = models.CharField(max_length=50)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'shard'], name='statcounter_name_shard_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name}[{self.shard}]: {self.value}"
@@ -0,0 +1,176 @@
+"""
+N+1 query detection.
+
+NPlusOneMiddleware fingerprints every query a request runs (see
+server_timing.fingerprint) and flags any shape that runs
+NPLUSONE_THRESHOLD times or more: the signature of a per-row query inside
+a loop, such as a template calling `group.permissions.all` for every
+checkbox or a serializer field reading a relation that was not prefetched.
+When a shape crosses the threshold the detector looks up the stack for
+where it came from: the template and line being rendered, the serializer
+field being read, and the innermost frame of project code.
+
+With NPLUSONE_DETECTION = "log" each offending shape is logged as a
+warning on the `dashboard.nplusone` logger, with the details in the
+record's `n_plus_one` attribute for structured log handlers. With "raise"
+the request fails with NPlusOneError instead, which the test client
+re-raises; the whole test suite runs that way
+(school_management.test_runner). "off" removes the middleware.
+"""
+import functools
+import logging
+import os
+import sys
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.base import Node
+from rest_framework.serializers import Serializer
+
+from . import server_timing
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('nplusone', default=None)
+_installed = False
+
+_RENDER_ANNOTATED = Node.render_annotated.__code__
+_TO_REPRESENTATION = Serializer.to_representation.__code__
+_PROJECT_DIR = str(settings.BASE_DIR) + os.sep
+# Request instrumentation frames, which wrap every query and render
+_INSTRUMENTATION = {__file__, server_timing.__file__, os.path.join(os.path.dirname(__file__), 'metrics.py')}
+
+# Query text is parameterised, so a loop repeats the exact same string and
+# the regexes run once per distinct query rather than once per execution
+_shape = functools.lru_cache(maxsize=2048)(server_timing.fingerprint)
+
+
+class NPlusOneError(Exception):
+    """A request ran the same query shape NPLUSONE_THRESHOLD times or more"""
+
+    def __init__(self, view, offenders):
+        self.view = view
+        self.offenders = offenders
+        lines = [f'N+1 queries in {view}:']
+        for offender in offenders:
+            lines.append(f'  {offender["count"]}x {offender["fingerprint"]}')
+            lines.extend(f'    {key}: {value}' for key, value in offender['origin'].items())
+        super().__init__('\n'.join(lines))
+
+
+def origin(frame):
+    """
+    Where the query being run at `frame` comes from
+
+    Returns:
+        dict with any of `template` (name:line), `node` (the template tag or
+        variable), `serializer` (Serializer.field) and `code` (file:line of
+        the innermost project frame).
+    """
+    found = {}
+    while frame is not None and len(found) < 4:
+        code = frame.f_code
+        if code is _RENDER_ANNOTATED and 'template' not in found:
+            node = frame.f_locals['self']
+            if node.token is not None:
+                found['template'] = f'{node.origin.template_name or node.origin.name}:{node.token.lineno}'
+                found['node'] = node.token.contents
+        elif code is _TO_REPRESENTATION and 'serializer' not in found:
+            field = frame.f_locals.get('field')
+            if field is not None:
+                found['serializer'] = f'{type(frame.f_locals["self"]).__name__}.{field.field_name}'
+        elif ('code' not in found and code.co_filename.startswith(_PROJECT_DIR)
+              and code.co_filename not in _INSTRUMENTATION and 'site-packages' not in code.co_filename):
+            found['code'] = f'{os.path.relpath(code.co_filename, _PROJECT_DIR)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return {key: found[key] for key in ('template', 'node', 'serializer', 'code') if key in found}
+
+
+class QueryShapes:
+    """Query shape counts for one request"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = {}
+        self.origins = {}
+
+    def add(self, sql):
+        shape = _shape(sql)
+        count = self.counts[shape] = self.counts.get(shape, 0) + 1
+        if count == self.threshold:
+            # Only here, once per offending shape, is the stack walked
+            self.origins[shape] = origin(sys._getframe(2))
+
+    def offenders(self):
+        return [
+            {'fingerprint': shape, 'count': self.counts[shape], 'origin': found}
+            for shape, found in self.origins.items()
+        ]
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    shapes = _current.get()
+    if shapes is not None and not many:
+        shapes.add(sql)
+    return execute(sql, params, many, context)
+
+
+def install():
+    """Hook the query counter into every connection, once per process"""
+    global _installed
+    if not _installed:
+        _installed = True
+        server_timing.add_execute_wrapper(_execute_wrapper)
+
+
+class NPlusOneMiddleware:
+    """Logs or raises on repeated query shapes; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.NPLUSONE_DETECTION == 'off':
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        shapes = QueryShapes(settings.NPLUSONE_THRESHOLD)
+        token = _current.set(shapes)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, shapes)
+        return response
+
+    async def __acall__(self, request):
+        shapes = QueryShapes(settings.NPLUSONE_THRESHOLD)
+        token = _current.set(shapes)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, shapes)
+        return response
+
+    def report(self, request, shapes):
+        offenders = shapes.offenders()
+        if not offenders:
+            return
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else request.path
+        if settings.NPLUSONE_DETECTION == 'raise':
+            raise NPlusOneError(view, offenders)
+        for offender in offenders:
+            logger.warning(
+                'N+1 queries in %s: %dx %s (%s)', view, offender['count'], offender['fingerprint'],
+                ', '.join(f'{key}={value}' for key, value in offender['origin'].items()),
+                extra={'n_plus_one': {'view': view, 'method': request.method, 'path': request.path, **offender}},
+            )
@@ -0,0 +1,252 @@
+"""
+On-demand sampling profiler for single requests.
+
+With PROFILER_ENABLED, ProfilerMiddleware profiles a request when a
+superuser adds ?_profile to its URL, or at random for PROFILER_SAMPLE_RATE
+of all traffic. A background thread samples the request thread's stack
+every PROFILER_INTERVAL seconds, so the view, the ORM and template
+rendering are all captured without instrumenting them, and the profile is
+written to PROFILER_DIR in the collapsed-stack format that flamegraph.pl
+and speedscope (https://www.speedscope.app) read. A JSON summary next to
+it records the request and the share of samples spent in the database,
+templates and serializers; the dashboard lists them at /dashboard/profiles/.
+
+The overhead is bounded: a process profiles at most one request at a time
+(other triggers are ignored), a sample costs one stack walk, and sampling
+stops after PROFILER_MAX_SECONDS. Only the newest PROFILER_KEEP profiles
+are kept. Async views are sampled on the event loop thread, so work they
+hand to sync_to_async shows up as waiting.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+PROFILE_PARAM = '_profile'
+SUFFIX = '.folded'
+
+# Layer of a sample: that of its innermost frame in one of these packages
+LAYERS = [
+    ('db', os.path.join('django', 'db', '')),
+    ('template', os.path.join('django', 'template', '')),
+    ('serializer', os.path.join('rest_framework', 'serializers.py')),
+    ('serializer', os.path.join('rest_framework', 'fields.py')),
+]
+
+_busy = threading.Lock()
+
+
+class Sampler(threading.Thread):
+    """Counts the distinct stacks of one thread, sampled at an interval"""
+
+    def __init__(self, thread_id, interval, max_seconds, stop_code):
+        super().__init__(name='profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_samples = int(max_seconds / interval)
+        # Frames from this one outward belong to the server, not the request
+        self.stop_code = stop_code
+        self.stacks = {}
+        self.samples = 0
+        self.finished = threading.Event()
+
+    def run(self):
+        while not self.finished.wait(self.interval) and self.samples < self.max_samples:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.stop_code:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            # Innermost first
+            stack = tuple(stack)
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+def frame_label(code):
+    """`function (path:line)`, with paths relative to the project or site-packages"""
+    path = code.co_filename
+    if path.startswith(str(settings.BASE_DIR)):
+        path = os.path.relpath(path, settings.BASE_DIR)
+    elif 'site-packages' in path:
+        path = path.split('site-packages' + os.sep, 1)[-1]
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+def layer(stack):
+    for code in stack:
+        for name, marker in LAYERS:
+            if marker in code.co_filename:
+                return name
+    return 'python'
+
+
+def collapsed(stacks):
+    """The stacks in collapsed-stack format: root;...;leaf count, one per line"""
+    labels = {}
+    lines = []
+    for stack, count in stacks.items():
+        frames = [labels.get(code) or labels.setdefault(code, frame_label(code)) for code in reversed(stack)]
+        lines.append(f'{";".join(frames)} {count}')
+    return '\n'.join(sorted(lines)) + '\n'
+
+
+def save(request, response, sampler, duration, reason):
+    """
+    Write a sampled request to PROFILER_DIR and drop the oldest profiles
+
+    Returns:
+        The profile's name, which identifies its files.
+    """
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else '<unresolved>'
+    name = f'{time.strftime("%Y%m%dT%H%M%S")}-{view.replace(":", "-")}-{uuid.uuid4().hex[:6]}'
+    layers = {}
+    for stack, count in sampler.stacks.items():
+        kind = layer(stack)
+        layers[kind] = layers.get(kind, 0) + count
+
+    os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+    with open(os.path.join(settings.PROFILER_DIR, name + SUFFIX), 'w') as file:
+        file.write(collapsed(sampler.stacks))
+    summary = {
+        'name': name,
+        'created': time.time(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': view,
+        'status': response.status_code,
+        'ms': round(duration * 1000, 1),
+        'samples': sampler.samples,
+        'interval_ms': sampler.interval * 1000,
+        'layers': layers,
+        'reason': reason,
+    }
+    with open(os.path.join(settings.PROFILER_DIR, name + '.json'), 'w') as file:
+        json.dump(summary, file)
+
+    for old in list_profiles()[settings.PROFILER_KEEP:]:
+        for suffix in ('.json', SUFFIX):
+            try:
+                os.remove(os.path.join(settings.PROFILER_DIR, old['name'] + suffix))
+            except FileNotFoundError:
+                pass
+    return name
+
+
+def list_profiles():
+    """Summaries of the stored profiles, newest first"""
+    try:
+        names = [name for name in os.listdir(settings.PROFILER_DIR) if name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(settings.PROFILER_DIR, name)) as file:
+                profiles.append(json.load(file))
+        except (FileNotFoundError, ValueError):
+            # Pruned or half-written by another worker
+            continue
+    return sorted(profiles, key=lambda profile: -profile['created'])
+
+
+def is_superuser(request):
+    """Whether the request comes from a superuser, by session or by JWT"""
+    if request.user.is_authenticated:
+        return request.user.is_superuser
+    # DRF authenticates API tokens only in the view, which is too late here
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_superuser
+
+
+def profile_path(name):
+    """Path of a profile's collapsed stacks, or None for names that are not one"""
+    path = os.path.join(settings.PROFILER_DIR, os.path.basename(name) + SUFFIX)
+    return path if os.path.isfile(path) else None
+
+
+class ProfilerMiddleware:
+    """Samples requests on demand; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def reason(self, request):
+        if PROFILE_PARAM in request.GET:
+            return 'requested' if is_superuser(request) else None
+        if settings.PROFILER_SAMPLE_RATE and random.random() < settings.PROFILER_SAMPLE_RATE:
+            return 'sampled'
+        return None
+
+    def start(self, reason, stop_code):
+        if reason is None or not _busy.acquire(blocking=False):
+            return None
+        sampler = Sampler(threading.get_ident(), settings.PROFILER_INTERVAL, settings.PROFILER_MAX_SECONDS, stop_code)
+        sampler.start()
+        return sampler
+
+    def finish(self, request, response, sampler, reason, started):
+        duration = time.perf_counter() - started
+        sampler.stop()
+        try:
+            response['X-Profile'] = save(request, response, sampler, duration, reason)
+        finally:
+            _busy.release()
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        reason = self.reason(request)
+        sampler = self.start(reason, ProfilerMiddleware.__call__.__code__)
+        if sampler is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            sampler.stop()
+            _busy.release()
+            raise
+        return self.finish(request, response, sampler, reason, started)
+
+    async def __acall__(self, request):
+        if PROFILE_PARAM in request.GET:
+            # Looking up the user queries the database
+            reason = await sync_to_async(self.reason)(request)
+        else:
+            reason = self.reason(request)
+        sampler = self.start(reason, ProfilerMiddleware.__acall__.__code__)
+        if sampler is None:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            sampler.stop()
+            _busy.release()
+            raise
+        return self.finish(request, response, sampler, reason, started)
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import Group, Permission
 from django.contrib.auth import get_user_model
 from public.models import Notice, AdmissionApplication
+from . import roles
 
 User = get_user_model()
 
@@ -25,7 +26,38 @@ class UserManagementSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined']
     
     def get_groups_list(self, obj):
-        return list(obj.groups.values_list('id', flat=True))
+        # Iterate .all() so the viewset's groups prefetch is used, as `groups` does
+        return [group.id for group in obj.groups.all()]
+
+
+class BulkRoleUpdateSerializer(serializers.Serializer):
+    users = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    groups = serializers.ListField(child=serializers.IntegerField())
+    mode = serializers.ChoiceField(choices=roles.MODES, default=roles.ASSIGN)
+    
+    def validate_users(self, value):
+        found = User.objects.filter(pk__in=value)
+        missing = set(value) - set(found.values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError(f'Unknown users: {sorted(missing)}')
+        request = self.context.get('request')
+        if request and not request.user.is_superuser and found.filter(is_superuser=True).exists():
+            raise serializers.ValidationError('Only superusers can change superuser roles.')
+        return value
+    
+    def validate_groups(self, value):
+        missing = set(value) - set(Group.objects.filter(pk__in=value).values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError(f'Unknown groups: {sorted(missing)}')
+        return value
+
+
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'first_name', 'last_name']
+        read_only_fields = fields
 
 
 class GroupManagementSerializer(serializers.ModelSerializer):
@@ -53,6 +85,9 @@ class GroupManagementSerializer(serializers.ModelSerializer):
         ]
     
     def get_user_count(self, obj):
+        # Annotated by GroupManagementViewSet; freshly created groups lack it
+        if hasattr(obj, 'user_count'):
+            return obj.user_count
         return obj.user_set.count()
 
 
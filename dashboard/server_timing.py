@@ -0,0 +1,262 @@
+"""
+Per-request SQL, template and serializer timings as Server-Timing headers.
+
+With SERVER_TIMING_ENABLED, ServerTimingMiddleware records for each request
+the number of queries and the time spent in the database, in rendering
+templates and in DRF serializers, and returns them in a Server-Timing
+header that browser dev tools show next to the request. A superuser can
+add ?_timing=json to any URL to get a JSON breakdown instead of the page:
+the slowest queries and the query shapes that ran more than once.
+
+The hooks (a database execute wrapper on every connection, a wrapper
+around Django template rendering and around serializer.data) are only
+installed when the setting is on, and the middleware removes itself from
+the chain otherwise, so a disabled profile costs nothing per request.
+Timings are kept in a context variable, so queries that async views run on
+worker threads are counted for the request that started them.
+"""
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+DEBUG_PARAM = '_timing'
+SLOWEST_QUERIES = 10
+
+_current = ContextVar('server_timing', default=None)
+_installed = False
+_query_hook_installed = False
+
+# Literals and placeholder lists that vary between otherwise identical queries
+FINGERPRINT_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\?(?:\s*,\s*\?)*\)'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def fingerprint(sql):
+    """
+    The shape of a query, with literals and parameters replaced by ?
+
+    Queries that differ only in their parameters, or in how many values an
+    IN list has, share a fingerprint.
+    """
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class RequestTimings:
+    """Time spent per layer while handling one request, in seconds"""
+
+    def __init__(self, record_sql=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.serializer = 0.0
+        # (sql, seconds) per query, only kept for the debug breakdown
+        self.sql = [] if record_sql else None
+        self._depth = {'template': 0, 'serializer': 0}
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def timed(self, layer, func, *args, **kwargs):
+        """Call func, adding its duration to `layer` unless already inside it"""
+        if self._depth[layer]:
+            return func(*args, **kwargs)
+        self._depth[layer] += 1
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            setattr(self, layer, getattr(self, layer) + time.perf_counter() - started)
+            self._depth[layer] -= 1
+
+    def header(self):
+        total = self.total
+        app = total - self.db - self.template - self.serializer
+        return ', '.join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f};desc="Templates"',
+            f'ser;dur={self.serializer * 1000:.1f};desc="Serializers"',
+            f'app;dur={max(app, 0) * 1000:.1f};desc="Other"',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+    def breakdown(self, request, response):
+        shapes = {}
+        for sql, duration in self.sql:
+            shape = shapes.setdefault(fingerprint(sql), {'count': 0, 'ms': 0.0, 'sql': sql})
+            shape['count'] += 1
+            shape['ms'] += duration * 1000
+        duplicates = sorted(
+            ({'fingerprint': key, **shape} for key, shape in shapes.items() if shape['count'] > 1),
+            key=lambda shape: -shape['count'],
+        )
+        slowest = sorted(self.sql, key=lambda query: -query[1])[:SLOWEST_QUERIES]
+        return {
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'ms': {
+                'total': round(self.total * 1000, 2),
+                'db': round(self.db * 1000, 2),
+                'template': round(self.template * 1000, 2),
+                'serializer': round(self.serializer * 1000, 2),
+            },
+            'queries': self.queries,
+            'slowest': [{'ms': round(duration * 1000, 2), 'sql': sql} for sql, duration in slowest],
+            'duplicates': [
+                {**shape, 'ms': round(shape['ms'], 2)} for shape in duplicates
+            ],
+        }
+
+
+def current():
+    """The RequestTimings of the request being handled, or None"""
+    return _current.get()
+
+
+def start(record_sql=False):
+    """
+    Begin collecting timings for the current request
+
+    Returns:
+        (RequestTimings, token); pass the token to stop() when the request ends.
+    """
+    timings = RequestTimings(record_sql=record_sql)
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        timings.queries += 1
+        timings.db += duration
+        if timings.sql is not None:
+            timings.sql.append((sql, duration))
+
+
+def add_execute_wrapper(wrapper):
+    """Run every query of every connection, open or yet to open, through `wrapper`"""
+    def add(sender, connection, **kwargs):
+        # First in the list is outermost, and stays clear of the pop() that
+        # ends a connection.execute_wrapper() block opened before this ran
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, wrapper)
+
+    # Connections are per thread; new ones get the wrapper as they open
+    connection_created.connect(add, weak=False)
+    for connection in connections.all(initialized_only=True):
+        add(None, connection)
+
+
+def _timed_method(cls, name, layer):
+    original = getattr(cls, name)
+
+    def method(self, *args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return original(self, *args, **kwargs)
+        return timings.timed(layer, original, self, *args, **kwargs)
+    setattr(cls, name, method)
+
+
+def _timed_property(cls, name, layer):
+    original = getattr(cls, name)
+
+    def fget(self):
+        timings = _current.get()
+        if timings is None:
+            return original.fget(self)
+        return timings.timed(layer, original.fget, self)
+    setattr(cls, name, property(fget, original.fset, original.fdel, original.__doc__))
+
+
+def install_query_hook():
+    """Count and time queries of every connection, once per process"""
+    global _query_hook_installed
+    if _query_hook_installed:
+        return
+    _query_hook_installed = True
+    add_execute_wrapper(_execute_wrapper)
+
+
+def install():
+    """Hook query, template and serializer timing into Django and DRF, once per process"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    from django.template.backends.django import Template
+    from rest_framework.serializers import BaseSerializer
+
+    install_query_hook()
+    # Top-level renders only; {% include %} and friends render inside them
+    _timed_method(Template, 'render', 'template')
+    # Serializer.data and ListSerializer.data both go through BaseSerializer.data
+    _timed_property(BaseSerializer, 'data', 'serializer')
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header to every response; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = start(record_sql=DEBUG_PARAM in request.GET)
+        try:
+            response = self.get_response(request)
+        finally:
+            stop(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = start(record_sql=DEBUG_PARAM in request.GET)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        if timings.sql is not None and getattr(request, 'user', None) and request.user.is_superuser:
+            response = JsonResponse(
+                timings.breakdown(request, response), encoder=DjangoJSONEncoder,
+                json_dumps_params={'indent': 2},
+            )
+        response['Server-Timing'] = timings.header()
+        return response
@@ -0,0 +1,68 @@
+"""
+Keep dashboard counters in step with Notice and AdmissionApplication writes.
+
+Per-instance saves and deletes use Django's model signals; bulk_create()
+and update() use the bulk signals sent by public.querysets.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from public.models import Notice, AdmissionApplication
+from public.signals import post_bulk_create, pre_bulk_update
+from . import counters
+
+
+@receiver(post_init, sender=Notice)
+def remember_notice_active(sender, instance, **kwargs):
+    # None when is_active was deferred and the loaded value is unknown
+    instance._counted_is_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=Notice)
+def count_saved_notice(sender, instance, created, **kwargs):
+    was_active = False if created else instance._counted_is_active
+    if was_active is None:
+        counters.reconcile([counters.ACTIVE_NOTICES])
+    else:
+        counters.increment(counters.ACTIVE_NOTICES, int(instance.is_active) - int(was_active))
+    instance._counted_is_active = instance.is_active
+
+
+@receiver(post_delete, sender=Notice)
+def count_deleted_notice(sender, instance, **kwargs):
+    if instance.is_active:
+        counters.increment(counters.ACTIVE_NOTICES, -1)
+
+
+@receiver(post_save, sender=AdmissionApplication)
+def count_saved_admission(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(counters.ADMISSIONS, 1)
+
+
+@receiver(post_delete, sender=AdmissionApplication)
+def count_deleted_admission(sender, instance, **kwargs):
+    counters.increment(counters.ADMISSIONS, -1)
+
+
+@receiver(post_bulk_create, sender=Notice)
+def count_bulk_created_notices(sender, objs, **kwargs):
+    counters.increment(counters.ACTIVE_NOTICES, sum(1 for obj in objs if obj.is_active))
+
+
+@receiver(post_bulk_create, sender=AdmissionApplication)
+def count_bulk_created_admissions(sender, objs, **kwargs):
+    counters.increment(counters.ADMISSIONS, len(objs))
+
+
+@receiver(pre_bulk_update, sender=Notice)
+def count_bulk_updated_notices(sender, queryset, values, **kwargs):
+    if 'is_active' not in values:
+        return
+    is_active = values['is_active']
+    if not isinstance(is_active, bool):
+        # An expression; the outcome is only known after the update
+        transaction.on_commit(lambda: counters.reconcile([counters.ACTIVE_NOTICES]))
+        return
+    changed = queryset.exclude(is_active=is_active).count()
+    counters.increment(counters.ACTIVE_NOTICES, changed if is_active else -changed)
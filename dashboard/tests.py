@@ -1,3 +1,216 @@
-from django.test import TestCase
+import io
+import tempfile
+import threading
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from public.models import AdmissionApplication, Notice
+
+from . import counters, profiling, urls
+from .models import StatCounter
+from .nplusone import NPlusOneError, NPlusOneMiddleware
+
+User = get_user_model()
+
+ROWS = 5
+
+
+def create_rows(start=0, count=ROWS):
+    """`count` rows of every model the pages list, with relations, so per-row queries repeat"""
+    permissions = list(Permission.objects.order_by('pk'))
+    groups = [Group.objects.create(name=f'Role {n}') for n in range(start, start + count)]
+    for n, group in enumerate(groups, start):
+        group.permissions.set(permissions[n * 4 % len(permissions):][:8])
+    for n in range(start, start + count):
+        User.objects.create_user(email=f'user{n}@example.com', password='unused').groups.set(groups[:n - start + 1])
+        Notice.objects.create(title=f'Notice {n}', content='Classes resume on Monday.')
+        AdmissionApplication.objects.create(
+            first_name=f'Student{n}', last_name='Rahman', email=f'student{n}@example.com',
+            phone='01700000000', date_of_birth=date(2015, 1, n % 28 + 1), gender='M', address='Dhaka',
+            grade_applying_for=f'Grade {n % 12 + 1}', parent_name='Parent', parent_phone='01800000000',
+            parent_email=f'parent{n}@example.com',
+        )
+
+
+class QueryBudgetMixin:
+    """
+    Loads each page in QUERY_BUDGETS (URL name -> queries) with self.client
+    at two data sizes; its query count must be the budget both times
+    """
+    QUERY_BUDGETS = {}
+
+    def test_pages_keep_their_query_budgets_as_rows_grow(self):
+        for start, count in ((0, ROWS), (ROWS, ROWS * 4)):
+            create_rows(start, count)
+            for name, budget in self.QUERY_BUDGETS.items():
+                url = reverse(name)
+                with self.subTest(url=url, rows=start + count):
+                    # Warm per-process caches: content types, permission snapshots
+                    self.client.get(url)
+                    with self.assertNumQueries(budget):
+                        response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+
+# The emulated replica is a second connection, which cannot see the rows
+# TestCase keeps in an open transaction; school_management.tests covers it
+@override_settings(REPLICA_DATABASES=[])
+class NPlusOneSweepTests(TestCase):
+    """GETs every dashboard page as a superuser; an N+1 query fails the page"""
+
+    # Model of the <pk> by URL name prefix
+    PK_MODELS = [
+        ('notice_', Notice), ('admission_', AdmissionApplication), ('user_', User), ('role_', Group),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows()
+        cls.superuser = User.objects.create_superuser(email='admin@example.com', password='unused')
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def url(self, pattern):
+        if 'name' in pattern.pattern.regex.groupindex:
+            return reverse(f'dashboard:{pattern.name}', kwargs={'name': 'missing'})
+        if 'pk' not in pattern.pattern.regex.groupindex:
+            return reverse(f'dashboard:{pattern.name}')
+        model = next(model for prefix, model in self.PK_MODELS if pattern.name.startswith(prefix))
+        return reverse(f'dashboard:{pattern.name}', kwargs={'pk': model.objects.order_by('pk').last().pk})
+
+    def test_pages_have_no_n_plus_one_queries(self):
+        for pattern in urls.urlpatterns:
+            url = self.url(pattern)
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertLess(response.status_code, 500)
+
+    def test_role_update_has_no_n_plus_one_queries(self):
+        user = User.objects.exclude(pk=self.superuser.pk).order_by('pk').last()
+        group = Group.objects.order_by('pk').first()
+        response = self.client.post(
+            reverse('user-update-roles', args=[user.pk]), {'groups': [group.pk]}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['groups_list'], [group.pk])
+
+    def test_repeated_query_shape_raises_with_its_template_line(self):
+        template = Template('{% for user in users %}\n{{ user.groups.count }}{% endfor %}')
+
+        def view(request):
+            return HttpResponse(template.render(Context({'users': User.objects.all()})))
+
+        with self.assertRaises(NPlusOneError) as raised:
+            NPlusOneMiddleware(view)(RequestFactory().get('/'))
+        [offender] = raised.exception.offenders
+        self.assertEqual(offender['count'], User.objects.count())
+        self.assertTrue(offender['origin']['template'].endswith(':2'))
+        self.assertEqual(offender['origin']['node'], 'user.groups.count')
+
+
+@override_settings(REPLICA_DATABASES=[], THROTTLE_ENABLED=False)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Dashboard pages and APIs, as a superuser"""
+    QUERY_BUDGETS = {
+        'dashboard:dashboard': 6,
+        'dashboard:notice_management': 4,
+        'dashboard:admission_management': 5,
+        'dashboard:user_management': 6,
+        'dashboard:role_management': 6,
+        'dashboard-stats': 4,
+        'user-list': 5,
+        'group-list': 5,
+    }
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='unused'))
+
+
+@override_settings(PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=0, REPLICA_DATABASES=[])
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(email='admin@example.com', password='unused')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(PROFILER_DIR=directory.name))
+
+    def profile(self, **headers):
+        sampler_start = mock.patch.object(profiling.Sampler, 'start', autospec=True, side_effect=threading.Thread.start)
+        with sampler_start as start:
+            response = self.client.get(reverse('notice-list') + '?_profile', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response, start.called
+
+    def test_anonymous_requests_do_not_start_the_sampler(self):
+        response, started = self.profile()
+        self.assertFalse(started)
+        self.assertNotIn('X-Profile', response)
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_superusers_are_profiled_by_session_or_token(self):
+        token = AccessToken.for_user(self.superuser)
+        for headers in ({}, {'Authorization': f'Bearer {token}'}):
+            with self.subTest(headers=headers):
+                if not headers:
+                    self.client.force_login(self.superuser)
+                response, started = self.profile(**headers)
+                self.client.logout()
+                self.assertTrue(started)
+                self.assertIn(response['X-Profile'], [profile['name'] for profile in profiling.list_profiles()])
+
+    def test_other_users_are_not_profiled(self):
+        user = User.objects.create_user(email='teacher@example.com', password='unused')
+        self.client.force_login(user)
+        self.assertFalse(self.profile()[1])
+        self.client.logout()
+        self.assertFalse(self.profile(Authorization=f'Bearer {AccessToken.for_user(user)}')[1])
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN='scraper', REPLICA_DATABASES=[], THROTTLE_ENABLED=False)
+class MetricsTests(TestCase):
+    def test_requests_are_counted_per_view(self):
+        self.client.get(reverse('notice-recent'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer scraper'})
+        self.assertContains(response, 'django_http_requests_total{method="GET",status="200",view="notice-recent"}')
+        self.assertContains(response, 'django_http_request_queries_count{view="notice-recent"}')
+
+
+@override_settings(REPLICA_DATABASES=[])
+class CounterTests(TestCase):
+    def test_shards_add_up_to_the_exact_count(self):
+        create_rows(count=12)
+        AdmissionApplication.objects.filter(first_name='Student0').delete()
+        self.assertEqual(StatCounter.objects.filter(name=counters.ADMISSIONS).count(), counters.SHARDS)
+        with self.assertNumQueries(1):
+            self.assertEqual(counters.get_counters(counters.ADMISSIONS), {counters.ADMISSIONS: 11})
+
+    def test_missing_rows_read_as_zero_until_reconciled(self):
+        create_rows()
+        StatCounter.objects.filter(name=counters.ADMISSIONS).delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(counters.get_counters(counters.ADMISSIONS), {counters.ADMISSIONS: 0})
+        self.assertFalse(StatCounter.objects.filter(name=counters.ADMISSIONS).exists())
+        call_command('reconcile_counters', counters.ADMISSIONS, stdout=io.StringIO())
+        self.assertEqual(counters.get_counters(counters.ADMISSIONS), {counters.ADMISSIONS: ROWS})
+
+    def test_reconcile_repairs_drift(self):
+        create_rows()
+        StatCounter.objects.filter(name=counters.ACTIVE_NOTICES).update(value=3)
+        stored = 3 * counters.SHARDS
+        self.assertEqual(counters.reconcile([counters.ACTIVE_NOTICES]), {counters.ACTIVE_NOTICES: (stored, ROWS)})
+        self.assertEqual(counters.get_counters(counters.ACTIVE_NOTICES), {counters.ACTIVE_NOTICES: ROWS})
+        self.assertEqual(counters.reconcile([counters.ACTIVE_NOTICES]), {counters.ACTIVE_NOTICES: (ROWS, ROWS)})
@@ -27,5 +27,9 @@ urlpatterns = [
     path('roles/create/', views.RoleCreateView.as_view(), name='role_create'),
     path('roles/<int:pk>/edit/', views.RoleUpdateView.as_view(), name='role_update'),
     path('roles/<int:pk>/delete/', views.RoleDeleteView.as_view(), name='role_delete'),
+    path('roles/users/bulk/', views.BulkRoleUpdateView.as_view(), name='bulk_role_update'),
     path('roles/users/<int:pk>/', views.UserRoleUpdateView.as_view(), name='user_role_update'),
+    
+    path('profiles/', views.ProfileListView.as_view(), name='profiles'),
+    path('profiles/<str:name>.folded', views.ProfileDownloadView.as_view(), name='profile_download'),
 ]
\ No newline at end of file
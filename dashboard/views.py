@@ -1,30 +1,39 @@
+from django.conf import settings
+from django.http import FileResponse, Http404
 from django.shortcuts import render, get_object_or_404, redirect
-from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin, UserPassesTestMixin
 from django.views.generic import (
-    TemplateView, ListView, CreateView, UpdateView, DeleteView, DetailView
+    View, TemplateView, ListView, CreateView, UpdateView, DeleteView, DetailView
 )
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.models import Group, Permission
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
 from public.models import Notice, AdmissionApplication
+from public.pagination import CURSOR_QUERY_PARAM, InvalidCursor, encode_cursor, paginate_keyset
 from public.utils import apply_search_filter, NOTICE_SEARCH_FIELDS, ADMISSION_SEARCH_FIELDS, USER_SEARCH_FIELDS
+from . import counters, profiling, roles
+from .forms import BulkRoleUpdateForm
 
 User = get_user_model()
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'dashboard/dashboard.html'
+    # Stats only, safe to serve from a read replica (school_management.db_router)
+    replica_reads = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Simple stats for dashboard - no API dependency needed
-        context['notice_count'] = Notice.objects.filter(is_active=True).count()
+        # Stats come from denormalized counters instead of table counts
+        stats = counters.get_counters(counters.ACTIVE_NOTICES, counters.ADMISSIONS)
+        context['notice_count'] = stats[counters.ACTIVE_NOTICES]
         
         # Only show admission count if user has permission
         if self.request.user.has_perm('public.view_admissionapplication'):
-            context['admission_count'] = AdmissionApplication.objects.count()
+            context['admission_count'] = stats[counters.ADMISSIONS]
         
         return context
 
@@ -91,6 +100,8 @@ class AdmissionManagementView(LoginRequiredMixin, PermissionRequiredMixin, ListV
     context_object_name = 'applications'
     permission_required = 'public.view_admissionapplication'
     paginate_by = 20
+    # Keyset order for "load more" requests (?cursor=...&partial=1)
+    cursor_ordering = ('-created_at', 'id')
     
     def get_queryset(self):
         queryset = AdmissionApplication.objects.all()
@@ -102,13 +113,43 @@ class AdmissionManagementView(LoginRequiredMixin, PermissionRequiredMixin, ListV
         if grade_filter and grade_filter != '':
             queryset = queryset.filter(grade_applying_for=grade_filter)
             
-        return queryset.order_by('-created_at')
+        return queryset.order_by(*self.cursor_ordering)
+    
+    def paginate_queryset(self, queryset, page_size):
+        """Serve cursor requests with a keyset page instead of COUNT + OFFSET"""
+        if CURSOR_QUERY_PARAM not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        
+        try:
+            page = paginate_keyset(
+                queryset, self.cursor_ordering, self.request.GET[CURSOR_QUERY_PARAM], page_size
+            )
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        self.next_cursor = page.next_cursor
+        return (None, None, page.object_list, False)
+    
+    def get_template_names(self):
+        if self.request.GET.get('partial'):
+            return ['dashboard/admission_rows.html']
+        return super().get_template_names()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get unique grades for filtering dropdown
-        context['available_grades'] = AdmissionApplication.objects.values_list('grade_applying_for', flat=True).distinct().order_by('grade_applying_for')
+        if CURSOR_QUERY_PARAM in self.request.GET:
+            context['next_cursor'] = self.next_cursor
+        elif context['page_obj'] and context['page_obj'].has_next():
+            context['next_cursor'] = encode_cursor(list(context['applications'])[-1], self.cursor_ordering)
+        
+        if not self.request.GET.get('partial'):
+            # Get unique grades for filtering dropdown
+            context['available_grades'] = AdmissionApplication.objects.values_list('grade_applying_for', flat=True).distinct().order_by('grade_applying_for')
         return context
+    
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        response['X-Next-Cursor'] = context.get('next_cursor') or ''
+        return response
 
 
 class AdmissionCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
@@ -167,8 +208,16 @@ class RoleManagementView(LoginRequiredMixin, PermissionRequiredMixin, TemplateVi
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['users'] = User.objects.all()
-        context['groups'] = Group.objects.all()
+        # Everything the template shows per row is prefetched or annotated,
+        # so the page costs the same number of queries at any headcount
+        context['users'] = User.objects.prefetch_related('groups').order_by('email')
+        context['groups'] = (
+            Group.objects
+            .annotate(user_count=Count('user', distinct=True))
+            .prefetch_related('permissions')
+            .order_by('name')
+        )
+        context['role_modes'] = roles.MODES
         return context
 
 
@@ -178,23 +227,46 @@ class UserRoleUpdateView(LoginRequiredMixin, PermissionRequiredMixin, TemplateVi
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['user_obj'] = get_object_or_404(User, pk=kwargs['pk'])
-        context['groups'] = Group.objects.all()
+        # The template checks membership and lists permissions per group
+        context['user_obj'] = get_object_or_404(User.objects.prefetch_related('groups'), pk=kwargs['pk'])
+        context['groups'] = Group.objects.prefetch_related('permissions')
         return context
     
     def post(self, request, *args, **kwargs):
         user_obj = get_object_or_404(User, pk=kwargs['pk'])
-        selected_groups = request.POST.getlist('groups')
+        selected_groups = set(request.POST.getlist('groups'))
         
-        user_obj.groups.clear()
-        for group_id in selected_groups:
-            group = get_object_or_404(Group, pk=group_id)
-            user_obj.groups.add(group)
+        group_ids = list(Group.objects.filter(pk__in=selected_groups).values_list('pk', flat=True))
+        if len(group_ids) != len(selected_groups):
+            raise Http404('No Group matches the given query.')
+        roles.bulk_update_roles([user_obj.pk], group_ids, roles.ASSIGN)
         
         messages.success(request, f'Roles updated for {user_obj.email}')
         return redirect('dashboard:role_management')
 
 
+class BulkRoleUpdateView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    permission_required = 'auth.change_group'
+    http_method_names = ['post']
+    
+    def post(self, request, *args, **kwargs):
+        form = BulkRoleUpdateForm(request.POST, request_user=request.user)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect('dashboard:role_management')
+        
+        users = list(form.cleaned_data['users'].values_list('pk', flat=True))
+        groups = form.cleaned_data['groups'].values_list('pk', flat=True)
+        changed = roles.bulk_update_roles(users, groups, form.cleaned_data['mode'])
+        messages.success(
+            request,
+            f"Roles updated for {len(users)} users: {changed['added']} added, {changed['removed']} removed"
+        )
+        return redirect('dashboard:role_management')
+
+
 # User Management Views
 class UserManagementView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     model = User
@@ -338,7 +410,9 @@ class RoleUpdateView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['group'] = get_object_or_404(Group, pk=kwargs['pk'])
+        # Prefetched so the per-checkbox `permission in group.permissions.all`
+        # reads one cached list instead of querying for each permission
+        context['group'] = get_object_or_404(Group.objects.prefetch_related('permissions'), pk=kwargs['pk'])
         context['permissions'] = Permission.objects.all().select_related('content_type')
         context['form_title'] = f'Edit Role: {context["group"].name}'
         return context
@@ -387,3 +461,39 @@ class RoleDeleteView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
         group.delete()
         messages.success(request, f'Role "{group_name}" deleted successfully!')
         return redirect('dashboard:role_management')
+
+
+# Profiler Views
+class SuperuserRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def test_func(self):
+        return self.request.user.is_superuser
+
+
+class ProfileListView(SuperuserRequiredMixin, TemplateView):
+    template_name = 'dashboard/profiles.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        profiles = profiling.list_profiles()
+        for profile in profiles:
+            # Shares of the samples, for the layer columns
+            samples = profile['samples'] or 1
+            profile['shares'] = {
+                layer: round(100 * profile['layers'].get(layer, 0) / samples)
+                for layer in ('db', 'template', 'serializer', 'python')
+            }
+        context['profiles'] = profiles
+        context['profiler_enabled'] = settings.PROFILER_ENABLED
+        context['profile_param'] = profiling.PROFILE_PARAM
+        return context
+
+
+class ProfileDownloadView(SuperuserRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        path = profiling.profile_path(kwargs['name'])
+        if path is None:
+            raise Http404('Profile not found')
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=kwargs['name'] + profiling.SUFFIX,
+            content_type='text/plain',
+        )
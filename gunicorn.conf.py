@@ -0,0 +1,26 @@
+"""
+gunicorn settings, read from the working directory when gunicorn starts.
+
+Workers record Prometheus metrics (dashboard.metrics) in memory-mapped
+files; the directory is exported here so every worker uses the same one,
+and emptied on start so a scrape does not add up the previous run.
+"""
+import glob
+import os
+import tempfile
+
+# Same default as METRICS_DIR in the settings
+METRICS_DIR = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'school_management_metrics'),
+)
+
+
+def on_starting(server):
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.db')):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid, METRICS_DIR)
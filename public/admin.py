@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notice, AdmissionApplication
+from .models import Notice, AdmissionApplication, AdmissionIntake
 
 
 @admin.register(Notice)
@@ -30,3 +30,12 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
+
+
+@admin.register(AdmissionIntake)
+class AdmissionIntakeAdmin(admin.ModelAdmin):
+    list_display = ('receipt', 'status', 'received_at', 'processed_at', 'application')
+    list_filter = ('status',)
+    search_fields = ('receipt',)
+    readonly_fields = ('receipt', 'payload', 'status', 'application', 'error', 'received_at', 'processed_at')
+    ordering = ('-id',)
@@ -1,6 +1,8 @@
 """
 API URL routing for public app endpoints.
 """
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .api_views import NoticeViewSet, AdmissionApplicationViewSet
 
@@ -10,4 +12,24 @@ router = DefaultRouter()
 router.register('notices', NoticeViewSet, basename='notice')
 router.register('admissions', AdmissionApplicationViewSet, basename='admission')
 
-urlpatterns = router.urls
\ No newline at end of file
+
+def async_urlpatterns():
+    """The async read routes for notices, mounted ahead of the router's with ASYNC_API_VIEWS"""
+    from .async_api import read_async
+    from .async_api_views import AsyncNoticeListView, AsyncRecentNoticesView
+    
+    # Writes to the list URL still go to the viewset
+    return [
+        path(
+            'notices/',
+            read_async(AsyncNoticeListView.as_view(), NoticeViewSet.as_view({'get': 'list', 'post': 'create'})),
+            name='notice-list',
+        ),
+        path('notices/recent/', AsyncRecentNoticesView.as_view(), name='notice-recent'),
+    ]
+
+
+urlpatterns = router.urls
+
+if settings.ASYNC_API_VIEWS:
+    urlpatterns = async_urlpatterns() + urlpatterns
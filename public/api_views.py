@@ -1,29 +1,83 @@
+from django.db.models import Max
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from .models import Notice, AdmissionApplication
-from .serializers import NoticeSerializer, AdmissionApplicationSerializer
-from .utils import apply_search_filter, check_api_permission, NOTICE_SEARCH_FIELDS, ADMISSION_SEARCH_FIELDS
 
+from dashboard import counters
+from .conditional import ConditionalGetMixin, conditional_response, make_etag
+from .exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, stream_export
+from .idempotency import idempotent
+from .imports import CSV, FORMATS, decode_lines, detect_format, import_admissions, iter_records
+from . import intake
+from .models import Notice, AdmissionApplication, AdmissionIntake
+from .response_cache import cache_response, notice_cache
+from .serializers import (
+    NoticeSerializer, AdmissionApplicationSerializer, AdmissionAutocompleteSerializer, AdmissionIntakeSerializer
+)
+from .utils import (
+    apply_search_filter, apply_autocomplete, check_api_permission,
+    NOTICE_SEARCH_FIELDS, ADMISSION_SEARCH_FIELDS
+)
 
-class NoticeViewSet(viewsets.ModelViewSet):
+
+def notice_etag(request, *parts):
+    """
+    ETag for a listing of notices at the request's path
+
+    Built on the notice response cache version, which every committed
+    notice write bumps (public.receivers), so validating costs no query.
+    """
+    return make_etag(notice_cache.version(), request.get_full_path(), *parts)
+
+
+def notice_queryset(request):
+    """Notices visible to the request's user, newest first, matching ?search="""
+    queryset = Notice.objects.all().order_by('-created_at')
+    
+    if not request.user.is_authenticated or not request.user.has_perm('public.view_notice'):
+        queryset = queryset.filter(is_active=True)
+        
+    # Ordered before searching so ranked search keeps date as tiebreaker
+    search = request.query_params.get('search', None)
+    return apply_search_filter(queryset, search, NOTICE_SEARCH_FIELDS)
+
+
+class NoticeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = NoticeSerializer
     permission_classes = [permissions.AllowAny]
+    # Keyset order for ?pagination=cursor
+    cursor_ordering = ('-created_at', 'id')
+    # Actions safe to serve from a read replica (school_management.db_router);
+    # cached responses are filled from the primary
+    replica_actions = {'list', 'retrieve', 'recent'}
     
     def get_queryset(self):
-        queryset = Notice.objects.all()
-        
-        if not self.request.user.is_authenticated or not self.request.user.has_perm('public.view_notice'):
-            queryset = queryset.filter(is_active=True)
-            
-        search = self.request.query_params.get('search', None)
-        queryset = apply_search_filter(queryset, search, NOTICE_SEARCH_FIELDS)
-        
-        return queryset.order_by('-created_at')
+        return notice_queryset(self.request)
+    
+    def list_version(self):
+        # Bumped on commit of every notice write (public.receivers)
+        return notice_cache.version()
+    
+    def list_etag_parts(self):
+        # Staff see inactive notices too
+        return (self.request.user.has_perm('public.view_notice'),)
     
     def get_serializer_class(self):
         return NoticeSerializer
     
+    def get_throttle_action(self):
+        # Searches scan the notice table, so they get their own, lower limit
+        if self.action == 'list' and self.request.query_params.get('search'):
+            return 'search'
+        return self.action
+    
+    @cache_response(notice_cache)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @idempotent('notices')
     def create(self, request, *args, **kwargs):
         """Create notice - requires add_notice permission"""
         permission_check = check_api_permission(request.user, 'public.add_notice')
@@ -53,18 +107,28 @@ class NoticeViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
     
     @action(detail=False, methods=['get'])
+    @cache_response(notice_cache, anonymous_only=False)
     def recent(self, request):
-        recent_notices = Notice.objects.filter(is_active=True)[:3]
-        serializer = NoticeSerializer(recent_notices, many=True)
-        return Response(serializer.data)
+        active = Notice.objects.filter(is_active=True)
+        
+        def get_response():
+            serializer = NoticeSerializer(active[:3], many=True)
+            return Response(serializer.data)
+        
+        etag = notice_etag(request, request.accepted_media_type)
+        return conditional_response(request, get_response, etag=etag)
 
 
-class AdmissionApplicationViewSet(viewsets.ModelViewSet):
+class AdmissionApplicationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = AdmissionApplication.objects.all()
     serializer_class = AdmissionApplicationSerializer
+    # Keyset order for ?pagination=cursor
+    cursor_ordering = ('-created_at', 'id')
+    # intake_status is left out: it polls a submission that was just queued
+    replica_actions = {'list', 'retrieve', 'export', 'autocomplete'}
     
     def get_permissions(self):
-        if self.action == 'create':
+        if self.action in ('create', 'intake_status'):
             permission_classes = [permissions.AllowAny]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -83,6 +147,12 @@ class AdmissionApplicationViewSet(viewsets.ModelViewSet):
             
         return queryset.order_by('-created_at')
     
+    def list_version(self):
+        # Inserts and deletes move the counter; saves raise the newest
+        # updated_at, which its index answers without a scan
+        count = counters.get_counters(counters.ADMISSIONS)[counters.ADMISSIONS]
+        return count, AdmissionApplication.objects.aggregate(latest=Max('updated_at'))['latest']
+    
     def list(self, request, *args, **kwargs):
         """List admissions - requires view_admissionapplication permission"""
         permission_check = check_api_permission(request.user, 'public.view_admissionapplication')
@@ -118,5 +188,83 @@ class AdmissionApplicationViewSet(viewsets.ModelViewSet):
             return permission_check
         return super().destroy(request, *args, **kwargs)
     
+    @idempotent('admissions')
+    def create(self, request, *args, **kwargs):
+        """Create admission, or queue it and return a receipt in intake mode"""
+        if not intake.intake_enabled():
+            return super().create(request, *args, **kwargs)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        entry = intake.enqueue(serializer.validated_data)
+        receipt = AdmissionIntakeSerializer(entry, context=self.get_serializer_context())
+        return Response(receipt.data, status=status.HTTP_202_ACCEPTED)
+    
     def perform_create(self, serializer):
-        serializer.save()
\ No newline at end of file
+        serializer.save()
+    
+    @action(detail=False, methods=['get'], url_path=r'intake/(?P<receipt>[0-9a-f-]{36})')
+    def intake_status(self, request, receipt=None):
+        """Processing status of a queued submission, looked up by its receipt"""
+        entry = get_object_or_404(AdmissionIntake, receipt=receipt)
+        serializer = AdmissionIntakeSerializer(entry, context=self.get_serializer_context())
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream matching admissions as CSV or NDJSON - requires view_admissionapplication permission"""
+        permission_check = check_api_permission(request.user, 'public.view_admissionapplication')
+        if permission_check:
+            return permission_check
+        
+        file_format = request.query_params.get('file_format', CSV)
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'file_format': [f'Expected one of {", ".join(EXPORT_FORMATS)}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Same search and grade filters as the list and the dashboard page
+        fields = [field.name for field in AdmissionApplication._meta.concrete_fields]
+        rows = self.get_queryset().values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return stream_export(fields, rows, file_format, 'admissions')
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """Bulk import from an uploaded CSV or NDJSON file - requires add_admissionapplication permission"""
+        permission_check = check_api_permission(request.user, 'public.add_admissionapplication')
+        if permission_check:
+            return permission_check
+        
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in FORMATS:
+            return Response(
+                {'file_format': [f'Expected one of {", ".join(FORMATS)}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Large uploads are spooled to disk by Django; rows are read lazily from there
+        try:
+            result = import_admissions(iter_records(decode_lines(upload), file_format))
+        except UnicodeDecodeError:
+            return Response({'file': ['File is not valid UTF-8.']}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Typeahead matches by name or email - requires view_admissionapplication permission"""
+        permission_check = check_api_permission(request.user, 'public.view_admissionapplication')
+        if permission_check:
+            return permission_check
+        
+        fields = AdmissionAutocompleteSerializer.Meta.fields
+        queryset = AdmissionApplication.objects.only(*fields)
+        matches = apply_autocomplete(
+            queryset, request.query_params.get('q'), ADMISSION_SEARCH_FIELDS,
+            limit=request.query_params.get('limit'),
+        )
+        serializer = AdmissionAutocompleteSerializer(matches, many=True)
+        return Response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Async DRF views for the read-heavy API endpoints, served under ASGI.
+
+Django 4.2's async ORM still runs each query on a thread, so an async view
+by itself makes no query faster. The gain is that a request's independent
+queries (a page and its count, an ETag aggregate, separate counters) run
+concurrently, each on a worker thread with its own connection, while the
+event loop carries on serving other requests. Those connections stay open
+between calls, so CONN_MAX_AGE does not apply to them.
+
+Authentication, permission and throttle checks may query the database, so
+AsyncAPIView runs them in one thread hop before awaiting the handler. The
+async routes are only mounted with ASYNC_API_VIEWS enabled; writes keep
+going to the sync viewsets.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.utils.cache import get_conditional_response
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+
+from school_management.db_router import replica_safe
+
+
+def _with_own_connection(func):
+    def run():
+        try:
+            return func()
+        finally:
+            # Worker threads keep their connection between calls, like a small
+            # pool bounded by the executor's size; a broken one is dropped
+            for connection in connections.all(initialized_only=True):
+                if connection.errors_occurred:
+                    connection.close_if_unusable_or_obsolete()
+    return run
+
+
+async def run_concurrently(*funcs):
+    """
+    Run independent blocking callables, typically queries, concurrently
+
+    Each callable runs on its own worker thread and database connection, so
+    they must not depend on each other or on an open transaction.
+
+    Returns:
+        list: The callables' results, in order
+    """
+    return await asyncio.gather(*(
+        sync_to_async(_with_own_connection(func), thread_sensitive=False)() for func in funcs
+    ))
+
+
+async def with_etag(request, get_etag, fetch):
+    """
+    Return (etag, data), with data None when the client's copy is current
+
+    Revalidating requests mostly end in a 304, so they check the ETag before
+    fetching; other requests run the ETag query alongside the fetch.
+
+    Args:
+        request: The request, whose If-None-Match is checked
+        get_etag: Blocking callable returning the current ETag
+        fetch: Callable returning an awaitable of the response data
+    """
+    if request.META.get('HTTP_IF_NONE_MATCH'):
+        [etag] = await run_concurrently(get_etag)
+        if get_conditional_response(request, etag=etag) is not None:
+            return etag, None
+        return etag, await fetch()
+    [etag], data = await asyncio.gather(run_concurrently(get_etag), fetch())
+    return etag, data
+
+
+async def paginate_concurrently(paginator, queryset, request, view):
+    """
+    Page-number pagination with the page and the COUNT queried concurrently
+
+    Returns the page's rows like paginator.paginate_queryset(). Keyset
+    pages and ?page=last need the other query's answer first, so they are
+    paginated as usual on a worker thread.
+    """
+    if paginator.use_keyset(request, view):
+        return await sync_to_async(paginator.paginate_queryset)(queryset, request, view)
+
+    page_size = paginator.get_page_size(request)
+    page_number = request.query_params.get(paginator.page_query_param) or 1
+    try:
+        number = int(page_number)
+    except ValueError:
+        number = 0
+    if not page_size or number < 1:
+        return await sync_to_async(paginator.paginate_queryset)(queryset, request, view)
+
+    offset = (number - 1) * page_size
+    count, rows = await run_concurrently(
+        queryset.count, lambda: list(queryset[offset:offset + page_size])
+    )
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    django_paginator.count = count
+    try:
+        django_paginator.validate_number(number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+    paginator.keyset = None
+    paginator.request = request
+    paginator.page = django_paginator._get_page(rows, number, django_paginator)
+    if paginator.template is not None and django_paginator.num_pages > 1:
+        paginator.display_page_controls = True
+    return rows
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines
+
+    Views are named after the sync view they mirror in `throttle_name`, so
+    both share the same THROTTLE_RATES entries.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+
+def read_async(async_view, sync_view):
+    """
+    Serve GET and HEAD with `async_view` and other methods with `sync_view`
+
+    For a URL shared by an async read path and a sync viewset's writes;
+    the sync view runs on a thread exactly as Django would run it under ASGI.
+    """
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+    # DRF views do their own CSRF checks in SessionAuthentication
+    view.csrf_exempt = True
+    # GET and HEAD are the async view's, so its replica routing applies
+    view.replica_reads = replica_safe(async_view, 'GET')
+    return view
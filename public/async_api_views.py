@@ -0,0 +1,75 @@
+"""
+Async read path for notices (see public.async_api).
+
+Mounted in place of NoticeViewSet's list and recent routes when
+ASYNC_API_VIEWS is enabled. Responses, ETags, response caching and
+throttling match the sync views.
+"""
+from rest_framework import permissions
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+from .api_views import NoticeViewSet, notice_etag, notice_queryset
+from .async_api import AsyncAPIView, paginate_concurrently, run_concurrently, with_etag
+from .conditional import conditional_response
+from .models import Notice
+from .response_cache import cache_response, notice_cache
+from .serializers import NoticeSerializer
+
+
+class AsyncNoticeListView(AsyncAPIView, GenericAPIView):
+    """NoticeViewSet.list with the page, its count and the ETag queried concurrently"""
+    serializer_class = NoticeSerializer
+    permission_classes = [permissions.AllowAny]
+    cursor_ordering = NoticeViewSet.cursor_ordering
+    throttle_name = 'NoticeViewSet'
+    replica_reads = True
+    
+    def get_throttle_action(self):
+        return 'search' if self.request.query_params.get('search') else 'list'
+    
+    def get_queryset(self):
+        return notice_queryset(self.request)
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Visibility depends on the user's permissions, which may need a query
+        self.notices = self.get_queryset()
+        self.sees_inactive = request.user.has_perm('public.view_notice')
+    
+    @cache_response(notice_cache)
+    async def get(self, request):
+        queryset = self.notices
+        if self.paginator.use_keyset(request, self):
+            # Not validated, like NoticeViewSet's keyset pages
+            etag, rows = None, await paginate_concurrently(self.paginator, queryset, request, self)
+        else:
+            etag, rows = await with_etag(
+                request,
+                lambda: notice_etag(request, request.accepted_media_type, self.sees_inactive),
+                lambda: paginate_concurrently(self.paginator, queryset, request, self),
+            )
+        return conditional_response(
+            request, lambda: self.get_paginated_response(self.get_serializer(rows, many=True).data), etag=etag
+        )
+
+
+class AsyncRecentNoticesView(AsyncAPIView):
+    """NoticeViewSet.recent with the notices and the ETag queried concurrently"""
+    permission_classes = [permissions.AllowAny]
+    throttle_name = 'NoticeViewSet'
+    replica_reads = True
+    
+    def get_throttle_action(self):
+        return 'recent'
+    
+    @cache_response(notice_cache, anonymous_only=False)
+    async def get(self, request):
+        active = Notice.objects.filter(is_active=True)
+        etag, result = await with_etag(
+            request,
+            lambda: notice_etag(request, request.accepted_media_type),
+            lambda: run_concurrently(lambda: list(active[:3])),
+        )
+        return conditional_response(
+            request, lambda: Response(NoticeSerializer(result[0], many=True).data), etag=etag
+        )
@@ -0,0 +1,100 @@
+"""
+Conditional GET support (ETag / Last-Modified) for list and detail views.
+
+Validators must cost far less than the response they save. Details use the
+row's updated_at, fetched by primary key. List ETags are built from a
+table version that every write changes and that is cheap to read: the
+notice response cache version for notices, and the admission counter plus
+the indexed newest updated_at for admissions. They stand for the whole
+table, so any write turns every list's ETag over, whatever its filters.
+QuerySet.update() skips auto_now, so admission updates made that way must
+set updated_at themselves or the list ETag will not change.
+
+Lists only carry an ETag. Deleting a row never raises max(updated_at), so a
+list Last-Modified would let If-Modified-Since clients miss deletions.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Return a quoted ETag derived from `parts`"""
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def conditional_response(request, get_response, etag=None, last_modified=None):
+    """
+    Return 304 if the request's validators match, else `get_response()`
+
+    Successful responses are tagged with the validators and marked
+    no-cache, so clients revalidate on every use instead of refetching.
+
+    Args:
+        request: The request, whose If-None-Match / If-Modified-Since are checked
+        get_response: Callable that builds the full response
+        etag: Quoted ETag of the current representation
+        last_modified: POSIX timestamp of the last change, if known
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = get_response()
+        if response.status_code != 200:
+            return response
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag for list() and ETag plus Last-Modified for retrieve() on a DRF
+    viewset over a model with an `updated_at` field.
+
+    Lists are validated when the viewset's list_version() returns a table
+    version (see the module docstring); list_etag_parts() adds whatever
+    else changes what the user sees. Keyset pages are never validated, as
+    they exist to avoid whole-table work.
+    """
+
+    def list_version(self):
+        """A cheap value that changes with every write to the table, or None to skip validation"""
+        return None
+
+    def list_etag_parts(self):
+        return ()
+
+    def list(self, request, *args, **kwargs):
+        get_response = lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        if self.paginator is not None and self.paginator.use_keyset(request, self):
+            return get_response()
+        version = self.list_version()
+        if version is None:
+            return get_response()
+        # The full path carries search, filter and page parameters
+        etag = make_etag(version, request.get_full_path(), request.accepted_media_type, *self.list_etag_parts())
+        return conditional_response(request, get_response, etag=etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        get_response = lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        try:
+            updated_at = (
+                self.filter_queryset(self.get_queryset())
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list('updated_at', flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            updated_at = None
+        if updated_at is None:
+            # Missing (404) or never stamped: nothing to validate against
+            return get_response()
+        etag = make_etag(self.kwargs[lookup_url_kwarg], updated_at, request.accepted_media_type)
+        return conditional_response(
+            request, get_response, etag=etag, last_modified=int(updated_at.timestamp()),
+        )
@@ -0,0 +1,143 @@
+"""
+Idempotency keys for create endpoints.
+
+A client that may retry a POST sends an `Idempotency-Key` header (the public
+admission form sends a hidden token instead). The first request with a key
+inserts an IdempotencyKey row in the same transaction as the create and
+stores the response on it; a retry with the same key gets that response
+back without touching the model table.
+
+The unique (scope, key) index collapses concurrent duplicates: the second
+insert waits for the first transaction and then fails, after which the
+stored response is replayed. Failed requests (4xx/5xx or an exception) roll
+the key back with everything else, so the client can retry them. Keys older
+than IDEMPOTENCY_KEY_TTL are ignored and removed by
+`manage.py sweep_idempotency_keys`.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+# Response headers stored with the response data
+STORED_HEADERS = ('Location',)
+
+KEY_MAX_LENGTH = IdempotencyKey._meta.get_field('key').max_length
+
+
+def expiry_cutoff():
+    """Keys created before this are expired"""
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def sweep():
+    """Delete expired keys and return how many were removed"""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
+
+
+def request_fingerprint(data):
+    """Hash of the request payload, to spot a key reused for a different request"""
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _claim(scope, key, fingerprint):
+    """
+    Insert the key, or return the live row that already holds it
+
+    Returns:
+        None if the key was claimed, else the existing IdempotencyKey
+    """
+    for _ in range(3):
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(scope=scope, key=key, fingerprint=fingerprint)
+            return None
+        except IntegrityError:
+            # A locking read sees the committed row even under snapshot isolation
+            existing = IdempotencyKey.objects.select_for_update().filter(scope=scope, key=key).first()
+            if existing is not None and existing.created_at >= expiry_cutoff():
+                return existing
+            IdempotencyKey.objects.filter(scope=scope, key=key, created_at__lt=expiry_cutoff()).delete()
+    raise IntegrityError(f'Could not claim idempotency key {key!r}')
+
+
+def _replay(record):
+    if record.response_data is not None:
+        response = Response(record.response_data, status=record.status_code)
+    else:
+        response = HttpResponse(status=record.status_code)
+    for header, value in record.response_headers.items():
+        response[header] = value
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent_response(request, scope, get_response, key=None, fingerprint=''):
+    """
+    Return `get_response()`, or the stored response for a repeated key
+
+    Args:
+        request: The request; its user is part of the key's scope
+        scope: Name of the endpoint the key belongs to
+        get_response: Callable that performs the create and builds the response
+        key: Idempotency key; defaults to the Idempotency-Key header
+        fingerprint: Payload hash; a repeated key with a different one is rejected
+    """
+    if key is None:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return get_response()
+    if len(key) > KEY_MAX_LENGTH:
+        return JsonResponse(
+            {'detail': f'{IDEMPOTENCY_HEADER} must be at most {KEY_MAX_LENGTH} characters.'}, status=400
+        )
+
+    scope = f'{scope}:{request.user.pk or "anonymous"}'
+    with transaction.atomic():
+        record = _claim(scope, key, fingerprint)
+        if record is not None:
+            if record.fingerprint != fingerprint:
+                return JsonResponse(
+                    {'detail': f'{IDEMPOTENCY_HEADER} was already used for a different request.'}, status=422
+                )
+            if record.status_code is None:
+                return JsonResponse(
+                    {'detail': 'A request with this key is still being processed.'}, status=409
+                )
+            return _replay(record)
+
+        response = get_response()
+        if response.status_code >= 400:
+            transaction.set_rollback(True)
+            return response
+        IdempotencyKey.objects.filter(scope=scope, key=key).update(
+            status_code=response.status_code,
+            response_data=getattr(response, 'data', None),
+            response_headers={header: response[header] for header in STORED_HEADERS if header in response},
+        )
+    return response
+
+
+def idempotent(scope):
+    """Make a DRF view method honour the Idempotency-Key header (see idempotent_response)"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            return idempotent_response(
+                request, scope, lambda: method(self, request, *args, **kwargs),
+                fingerprint=request_fingerprint(request.data),
+            )
+        return wrapper
+    return decorator
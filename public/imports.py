@@ -0,0 +1,110 @@
+"""
+Streaming bulk import of admission applications.
+
+Records are read one at a time from a CSV or NDJSON line iterator,
+validated with AdmissionApplicationSerializer and inserted with batched
+bulk_create, so memory use depends on the batch size rather than on the
+size of the file. Invalid rows are skipped and reported; valid rows are
+committed batch by batch.
+"""
+import codecs
+import csv
+import json
+import os
+
+from rest_framework import serializers
+from .models import AdmissionApplication
+from .serializers import AdmissionApplicationSerializer
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+FORMATS = [CSV, NDJSON]
+
+FORMAT_EXTENSIONS = {
+    '.csv': CSV,
+    '.ndjson': NDJSON,
+    '.jsonl': NDJSON,
+}
+
+IMPORT_BATCH_SIZE = 500
+
+# Rows whose errors are kept in the result; later failures are only counted
+IMPORT_ERROR_LIMIT = 1000
+
+
+def detect_format(filename):
+    """Return the import format implied by a file name, or None"""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def decode_lines(chunks, encoding='utf-8-sig'):
+    """Decode an iterable of byte lines (e.g. an UploadedFile) into text lines"""
+    return codecs.iterdecode(chunks, encoding)
+
+
+def iter_records(lines, file_format):
+    """
+    Yield (row, record) pairs from an iterable of text lines
+
+    `row` is the line number the record starts on. A line that cannot be
+    parsed yields a serializers.ValidationError instead of a record.
+    """
+    if file_format == CSV:
+        reader = csv.DictReader(lines)
+        reader.fieldnames  # consume the header so line numbers start after it
+        start = reader.line_num + 1
+        for record in reader:
+            yield start, record
+            start = reader.line_num + 1
+    elif file_format == NDJSON:
+        for row, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield row, serializers.ValidationError({'non_field_errors': [f'Invalid JSON: {error}']})
+                continue
+            if not isinstance(record, dict):
+                record = serializers.ValidationError({'non_field_errors': ['Expected a JSON object.']})
+            yield row, record
+    else:
+        raise ValueError(f'Unknown import format {file_format!r}')
+
+
+def import_admissions(records, batch_size=IMPORT_BATCH_SIZE, error_limit=IMPORT_ERROR_LIMIT):
+    """
+    Validate and insert admission records in batches
+
+    Args:
+        records: Iterable of (row, record) pairs from iter_records
+        batch_size: Rows per bulk_create
+        error_limit: Maximum number of failed rows to include in 'errors'
+
+    Returns:
+        dict: 'created' and 'failed' row counts and per-row 'errors'
+    """
+    # One serializer validates every row, as ListSerializer does, instead of
+    # rebuilding its fields for each record
+    serializer = AdmissionApplicationSerializer()
+    result = {'created': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    for row, record in records:
+        try:
+            if isinstance(record, serializers.ValidationError):
+                raise record
+            batch.append(AdmissionApplication(**serializer.run_validation(record)))
+        except serializers.ValidationError as error:
+            result['failed'] += 1
+            if len(result['errors']) < error_limit:
+                result['errors'].append({'row': row, 'errors': error.detail})
+            continue
+
+        if len(batch) >= batch_size:
+            result['created'] += len(AdmissionApplication.objects.bulk_create(batch))
+            batch = []
+
+    if batch:
+        result['created'] += len(AdmissionApplication.objects.bulk_create(batch))
+    return result
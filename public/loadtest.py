@@ -0,0 +1,297 @@
+"""
+HTTP load testing against a running server, used by `manage.py loadtest`.
+
+Routes are labelled by URL name, with a suffix for variants such as
+searches; a scenario is a weighted mix of route labels. Requests are sent
+over keep-alive connections from a pool of client threads, each request
+picked from a sequence fixed by the seed, so two runs of a scenario send
+the same traffic. Results are plain dicts of throughput and latency
+percentiles that serialise to JSON and compare against a stored baseline.
+"""
+import http.client
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+
+from django.core.management.base import CommandError
+
+from .scale import FIRST_NAMES, LAST_NAMES, admission_values
+
+ANONYMOUS = 'anonymous'
+STAFF = 'staff'
+
+# label: (method, path, client). Paths are formatted with the pks of
+# existing rows: {notice}, {admission}, {user}, {group} and {permission}.
+ROUTES = {
+    'public:home': ('GET', '/', ANONYMOUS),
+    'public:notice_list': ('GET', '/notices/', ANONYMOUS),
+    'public:admission_form': ('GET', '/admission/', ANONYMOUS),
+    'public:admission_success': ('GET', '/admission/success/', ANONYMOUS),
+    'accounts:login': ('GET', '/accounts/login/', ANONYMOUS),
+    'accounts:register': ('GET', '/accounts/register/', ANONYMOUS),
+
+    'notice-list': ('GET', '/api/public/notices/', ANONYMOUS),
+    'notice-list?search': ('GET', '/api/public/notices/?search={term}', ANONYMOUS),
+    'notice-recent': ('GET', '/api/public/notices/recent/', ANONYMOUS),
+    'notice-detail': ('GET', '/api/public/notices/{notice}/', ANONYMOUS),
+    'admission-list': ('GET', '/api/public/admissions/', STAFF),
+    'admission-list?search': ('GET', '/api/public/admissions/?search={term}', STAFF),
+    'admission-list POST': ('POST', '/api/public/admissions/', ANONYMOUS),
+    'admission-detail': ('GET', '/api/public/admissions/{admission}/', STAFF),
+    'admission-autocomplete': ('GET', '/api/public/admissions/autocomplete/?q={term}', STAFF),
+
+    'dashboard-stats': ('GET', '/api/dashboard/stats/', STAFF),
+    'user-permissions': ('GET', '/api/dashboard/permissions/', STAFF),
+    'user-list': ('GET', '/api/dashboard/users/', STAFF),
+    'user-list?search': ('GET', '/api/dashboard/users/?search={term}', STAFF),
+    'user-detail': ('GET', '/api/dashboard/users/{user}/', STAFF),
+    'user-autocomplete': ('GET', '/api/dashboard/users/autocomplete/?q={term}', STAFF),
+    'group-list': ('GET', '/api/dashboard/groups/', STAFF),
+    'group-detail': ('GET', '/api/dashboard/groups/{group}/', STAFF),
+    'permission-detail': ('GET', '/api/dashboard/permissions/{permission}/', STAFF),
+
+    'dashboard:dashboard': ('GET', '/dashboard/', STAFF),
+    'dashboard:notice_management': ('GET', '/dashboard/notices/', STAFF),
+    'dashboard:notice_create': ('GET', '/dashboard/notices/create/', STAFF),
+    'dashboard:notice_detail': ('GET', '/dashboard/notices/{notice}/', STAFF),
+    'dashboard:notice_update': ('GET', '/dashboard/notices/{notice}/edit/', STAFF),
+    'dashboard:notice_delete': ('GET', '/dashboard/notices/{notice}/delete/', STAFF),
+    'dashboard:admission_management': ('GET', '/dashboard/admissions/', STAFF),
+    'dashboard:admission_management?search': ('GET', '/dashboard/admissions/?search={term}', STAFF),
+    'dashboard:admission_create': ('GET', '/dashboard/admissions/create/', STAFF),
+    'dashboard:admission_detail': ('GET', '/dashboard/admissions/{admission}/', STAFF),
+    'dashboard:admission_update': ('GET', '/dashboard/admissions/{admission}/edit/', STAFF),
+    'dashboard:admission_delete': ('GET', '/dashboard/admissions/{admission}/delete/', STAFF),
+    'dashboard:user_management': ('GET', '/dashboard/users/', STAFF),
+    'dashboard:user_management?search': ('GET', '/dashboard/users/?search={term}', STAFF),
+    'dashboard:user_create': ('GET', '/dashboard/users/create/', STAFF),
+    'dashboard:user_detail': ('GET', '/dashboard/users/{user}/', STAFF),
+    'dashboard:user_update': ('GET', '/dashboard/users/{user}/edit/', STAFF),
+    'dashboard:user_delete': ('GET', '/dashboard/users/{user}/delete/', STAFF),
+    'dashboard:role_management': ('GET', '/dashboard/roles/', STAFF),
+    'dashboard:role_create': ('GET', '/dashboard/roles/create/', STAFF),
+    'dashboard:role_update': ('GET', '/dashboard/roles/{group}/edit/', STAFF),
+    'dashboard:role_delete': ('GET', '/dashboard/roles/{group}/delete/', STAFF),
+    'dashboard:user_role_update': ('GET', '/dashboard/roles/users/{user}/', STAFF),
+}
+
+# Named routes deliberately left out: writes other than submissions,
+# bulk exports/imports, token and account flows, and API roots.
+# permission-list is shadowed by user-permissions at the same path.
+SKIPPED_ROUTES = {
+    'permission-list', 'metrics', 'dashboard:profiles', 'dashboard:profile_download',
+    'accounts:logout', 'dashboard:bulk_role_update', 'admission-export', 'admission-import-file',
+    'admission-intake-status', 'user-export', 'user-bulk-roles', 'user-update-roles', 'api-root',
+    'jwt-create', 'jwt-refresh', 'jwt-verify', 'user-me', 'user-activation', 'user-resend-activation',
+    'user-reset-password', 'user-reset-password-confirm', 'user-reset-username',
+    'user-reset-username-confirm', 'user-set-password', 'user-set-username',
+}
+
+# Admission season: mostly anonymous notice reads, a steady share of
+# applications, and staff working through them with searches
+SEASON = {
+    'public:home': 10,
+    'public:notice_list': 15,
+    'notice-list': 25,
+    'notice-recent': 10,
+    'notice-detail': 5,
+    'public:admission_form': 5,
+    'admission-list POST': 10,
+    'admission-list?search': 6,
+    'dashboard:admission_management?search': 5,
+    'admission-autocomplete': 3,
+    'user-list?search': 2,
+    'dashboard-stats': 2,
+    'dashboard:dashboard': 2,
+}
+
+SCENARIOS = {
+    # Every route, equally often, for per-endpoint latencies
+    'sweep': dict.fromkeys(ROUTES, 1),
+    'season': SEASON,
+    # Deadline-day burst of submissions with the notice board still being read
+    'burst': {'admission-list POST': 8, 'notice-list': 1, 'public:home': 1},
+}
+
+# Submissions are accepted with 202 in write-behind intake mode
+EXPECTED_STATUS = {'GET': {200}, 'POST': {201, 202}}
+
+# Generated submissions are dated like the rest of the seeded data
+SUBMISSION_UNTIL = datetime(2026, 6, 30, tzinfo=timezone.utc)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError('The server exited during startup')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'The server did not start within {timeout}s')
+
+
+@contextmanager
+def gunicorn_server(arguments, env=None):
+    """
+    Run gunicorn with `arguments` on a free local port and yield the port
+
+    The server inherits this process's environment, so it uses the same
+    settings module and database, updated with `env`.
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *arguments, '-b', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        env={**os.environ, **(env or {})},
+    )
+    try:
+        wait_for(port, process)
+        yield port
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def percentile(latencies, p):
+    """Nearest-rank percentile of sorted latencies"""
+    return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+
+def plan(scenario, requests, seed):
+    """The scenario's route labels for `requests` requests, fixed by the seed"""
+    weights = SCENARIOS[scenario]
+    rng = random.Random(f'{seed}:{scenario}')
+    return rng.choices(list(weights), list(weights.values()), k=requests)
+
+
+def submission(seed, n):
+    """A realistic admission form payload, as JSON"""
+    [values] = admission_values(random.Random(f'{seed}:submission:{n}'), n, 1, SUBMISSION_UNTIL, 1)
+    payload = {
+        key: value.isoformat() if isinstance(value, date) else value
+        for key, value in values.items() if key not in ('created_at', 'updated_at')
+    }
+    return json.dumps(payload)
+
+
+def run(port, labels, concurrency, headers, pks, seed=0):
+    """
+    Send one request per label over `concurrency` keep-alive connections
+
+    Args:
+        port: Local port of the server
+        labels: Route labels, sent in order
+        concurrency: Number of client threads, each with one connection
+        headers: {client: headers} for ANONYMOUS and STAFF requests
+        pks: Values for the placeholders in ROUTES paths
+        seed: Picks search terms and submission payloads
+
+    Returns:
+        tuple: (elapsed seconds, {label: [(latency, ok), ...]})
+    """
+    counter = itertools.count()
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        samples = []
+        while (n := next(counter)) < len(labels):
+            label = labels[n]
+            method, path, client = ROUTES[label]
+            rng = random.Random(f'{seed}:{n}')
+            path = path.format(term=rng.choice(FIRST_NAMES + LAST_NAMES).lower(), **pks)
+            request_headers = dict(headers[client])
+            body = None
+            if method == 'POST':
+                body = submission(seed, n)
+                request_headers['Content-Type'] = 'application/json'
+
+            started = time.perf_counter()
+            connection.request(method, path, body=body, headers=request_headers)
+            response = connection.getresponse()
+            response.read()
+            samples.append((label, time.perf_counter() - started, response.status in EXPECTED_STATUS[method]))
+            if response.will_close:
+                connection.close()
+        connection.close()
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    samples = {}
+    for label, latency, ok in itertools.chain.from_iterable(results):
+        samples.setdefault(label, []).append((latency, ok))
+    return elapsed, samples
+
+
+def summarize(elapsed, samples):
+    """
+    Throughput, errors and p50/p95/p99 latency in milliseconds, per label and in total
+
+    Returns:
+        dict: {'total': stats, 'endpoints': {label: stats}}
+    """
+    def stats(entries):
+        latencies = sorted(latency for latency, _ in entries)
+        return {
+            'requests': len(entries),
+            'errors': sum(not ok for _, ok in entries),
+            'throughput': round(len(entries) / elapsed, 1),
+            **{f'p{p}': round(percentile(latencies, p / 100) * 1000, 2) for p in (50, 95, 99)},
+        }
+
+    return {
+        'total': stats(list(itertools.chain.from_iterable(samples.values()))),
+        'endpoints': {label: stats(samples[label]) for label in sorted(samples)},
+    }
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    Find regressions against a baseline from an earlier run
+
+    A latency percentile regresses when it is more than `tolerance` (a
+    fraction) and `min_delta` milliseconds slower than the baseline's, and a
+    scenario when its throughput drops by more than `tolerance`.
+
+    Returns:
+        list: One line per regression
+    """
+    regressions = []
+    for scenario, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(scenario)
+        if before is None:
+            continue
+        if current['total']['throughput'] < before['total']['throughput'] * (1 - tolerance):
+            regressions.append(
+                f'{scenario}: throughput {current["total"]["throughput"]} req/s, '
+                f'baseline {before["total"]["throughput"]} req/s'
+            )
+        for label, stats in current['endpoints'].items():
+            previous = before['endpoints'].get(label)
+            if previous is None:
+                continue
+            for key in ('p95', 'p99'):
+                if stats[key] > previous[key] * (1 + tolerance) and stats[key] - previous[key] > min_delta:
+                    regressions.append(
+                        f'{scenario} {label}: {key} {stats[key]} ms, baseline {previous[key]} ms'
+                    )
+    return regressions
@@ -0,0 +1,82 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from public.intake import drain
+from public.models import AdmissionApplication, AdmissionIntake
+
+GRADES = [f'Grade {n}' for n in range(1, 13)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares sustained public admission submission throughput with direct writes '
+        'and with the write-behind intake queue, then drains the queue and checks every '
+        'submission became exactly one application. Each submission commits, as in '
+        'production; everything created is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions', type=int, default=2_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['submissions']
+        payloads = [self.payload(rng, i) for i in range(count)]
+        url = reverse('admission-list')
+        last_application = AdmissionApplication.objects.aggregate(last=Max('pk'))['last'] or 0
+        last_intake = AdmissionIntake.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False):
+                client = Client()
+                direct = self.submit(client, url, payloads, 201)
+                self.stdout.write(f'direct writes   {count / direct:>8.0f} submissions/s')
+
+                with override_settings(ADMISSION_INTAKE_QUEUE=True):
+                    before = AdmissionApplication.objects.count()
+                    queued = self.submit(client, url, payloads, 202)
+                    self.stdout.write(
+                        f'intake queue    {count / queued:>8.0f} submissions/s ({direct / queued:.1f}x)'
+                    )
+
+                    started = time.perf_counter()
+                    while drain():
+                        pass
+                    drained = time.perf_counter() - started
+                    self.stdout.write(f'drain           {count / drained:>8.0f} rows/s')
+
+            created = AdmissionApplication.objects.count() - before
+            done = AdmissionIntake.objects.filter(
+                pk__gt=last_intake, status=AdmissionIntake.DONE, application__isnull=False,
+            ).count()
+        finally:
+            AdmissionIntake.objects.filter(pk__gt=last_intake).delete()
+            AdmissionApplication.objects.filter(pk__gt=last_application).delete()
+
+        if created != count or done != count:
+            raise CommandError(f'{count} queued, {done} marked done, {created} applications created')
+        self.stdout.write(self.style.SUCCESS(f'All {count} queued submissions written exactly once'))
+
+    def submit(self, client, url, payloads, expected_status):
+        started = time.perf_counter()
+        for payload in payloads:
+            response = client.post(url, payload, content_type='application/json')
+            if response.status_code != expected_status:
+                raise CommandError(f'Submission returned {response.status_code}: {response.content[:200]}')
+        return time.perf_counter() - started
+
+    def payload(self, rng, i):
+        return {
+            'first_name': f'First{i}', 'last_name': f'Last{i}', 'email': f'applicant{i}@example.com',
+            'phone': '0123456789', 'date_of_birth': f'{rng.randint(2008, 2019)}-01-01',
+            'gender': rng.choice('MFO'), 'address': f'{i} School Road', 'previous_school': '',
+            'grade_applying_for': rng.choice(GRADES), 'parent_name': f'Parent {i}',
+            'parent_phone': '0123456789', 'parent_email': f'parent{i}@example.com',
+        }
@@ -0,0 +1,144 @@
+import http.client
+import importlib.util
+import itertools
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.utils.crypto import get_random_string
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from public.loadtest import gunicorn_server, percentile
+from public.models import Notice
+
+User = get_user_model()
+
+BENCH_EMAIL = 'bench-asgi@example.com'
+BENCH_TITLE = 'bench-asgi'
+
+PATHS = [
+    '/api/public/notices/',
+    '/api/public/notices/recent/',
+    '/api/dashboard/stats/',
+    '/api/dashboard/permissions/',
+]
+
+# gunicorn config that delays every query by BENCH_DB_LATENCY seconds, in
+# the server processes only, to stand in for a database across a network
+LATENCY_CONFIG = """
+import time
+
+from django.db.backends.signals import connection_created
+
+LATENCY = float(os.environ['BENCH_DB_LATENCY'])
+
+
+def delay(execute, sql, params, many, context):
+    time.sleep(LATENCY)
+    return execute(sql, params, many, context)
+
+
+def add_latency(sender, connection, **kwargs):
+    if delay not in connection.execute_wrappers:
+        connection.execute_wrappers.append(delay)
+
+
+def post_worker_init(worker):
+    connection_created.connect(add_latency, weak=False)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares gunicorn sync workers serving the WSGI app with an ASGI (uvicorn) worker '
+        'serving the async read path, under concurrent load on the notice, stats and '
+        'permissions endpoints. Needs uvicorn. Seeded rows are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notices', type=int, default=2_000)
+        parser.add_argument('--requests', type=int, default=2_000, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--sync-workers', type=int, default=4)
+        parser.add_argument('--asgi-workers', type=int, default=1)
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help='Milliseconds added to every query in the servers')
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec('uvicorn') is None:
+            raise CommandError('bench_asgi needs uvicorn: pip install uvicorn')
+
+        servers = [
+            (f'wsgi  {options["sync_workers"]} sync workers', [
+                'school_management.wsgi', '-w', str(options['sync_workers']),
+            ], {}),
+            (f'asgi  {options["asgi_workers"]} uvicorn worker(s)', [
+                'school_management.asgi', '-w', str(options['asgi_workers']),
+                '-k', 'uvicorn.workers.UvicornWorker',
+            ], {'ASYNC_API_VIEWS': 'True'}),
+        ]
+
+        config = tempfile.NamedTemporaryFile('w', suffix='.py')
+        config.write(LATENCY_CONFIG)
+        config.flush()
+        env = {'BENCH_DB_LATENCY': str(options['db_latency'] / 1000)}
+
+        user = User.objects.create_user(email=BENCH_EMAIL, password=get_random_string(32))
+        try:
+            Notice.objects.bulk_create([
+                Notice(title=f'{BENCH_TITLE} {i}', content=f'Exam schedule update {i}')
+                for i in range(options['notices'])
+            ])
+            headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+            for label, arguments, server_env in servers:
+                self.stdout.write(f'{label} ({options["db_latency"]:g} ms per query)')
+                # Measure the views, not the limits or the response cache
+                server_env = {**env, **server_env, 'THROTTLE_ENABLED': 'False', 'RESPONSE_CACHE_ENABLED': 'False'}
+                with gunicorn_server([*arguments, '-c', config.name], server_env) as port:
+                    for path in PATHS:
+                        self.report(path, *self.load(
+                            port, path, headers, options['concurrency'], options['requests']
+                        ))
+        finally:
+            Notice.objects.filter(title__startswith=BENCH_TITLE).delete()
+            user.delete()
+            config.close()
+
+    def load(self, port, path, headers, concurrency, requests):
+        """Send `requests` GETs over `concurrency` keep-alive connections"""
+        counter = itertools.count()
+
+        def worker():
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            latencies, errors = [], 0
+            while next(counter) < requests:
+                started = time.perf_counter()
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                latencies.append(time.perf_counter() - started)
+                errors += response.status != 200
+            connection.close()
+            return latencies, errors
+
+        # Warm up imports, connections and caches in every worker
+        for _ in range(concurrency):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            connection.request('GET', path, headers=headers)
+            connection.getresponse().read()
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(lambda _: worker(), range(concurrency)))
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latency for worker_latencies, _ in results for latency in worker_latencies)
+        return len(latencies) / elapsed, latencies, sum(errors for _, errors in results)
+
+    def report(self, path, throughput, latencies, errors):
+        self.stdout.write(
+            f'  {path:<30} {throughput:>7.0f} req/s  p50 {percentile(latencies, 0.5) * 1000:>6.1f} ms  '
+            f'p99 {percentile(latencies, 0.99) * 1000:>6.1f} ms' + (f'  {errors} errors' if errors else '')
+        )
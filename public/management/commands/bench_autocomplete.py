@@ -0,0 +1,91 @@
+import random
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from public.models import AdmissionApplication
+from public.utils import apply_autocomplete, ADMISSION_SEARCH_FIELDS, USER_SEARCH_FIELDS
+
+User = get_user_model()
+
+FIRST_NAMES = (
+    'aarav ayesha fatima rahim karim nusrat tanvir sadia imran farhana john mary '
+    'david sarah michael emily daniel sophia james olivia noah emma liam ava'
+).split()
+LAST_NAMES = (
+    'rahman hossain ahmed islam khan chowdhury sarkar das roy smith johnson brown '
+    'williams jones garcia miller davis wilson anderson taylor thomas moore'
+).split()
+PROBES = ['rah', 'hoss', 'fati', 'john', 'smi', 'ahmed@', 'zzq', 'tanvir.k']
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks autocomplete latency for admissions and users. Seeded rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admissions', type=int, default=200_000)
+        parser.add_argument('--users', type=int, default=20_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--target-ms', type=float, default=25.0,
+                            help='p95 latency budget per autocomplete query')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self.seed(rng, options['admissions'], options['users'])
+            failed = False
+            for label, model, fields in [
+                ('admissions', AdmissionApplication, ADMISSION_SEARCH_FIELDS),
+                ('users', User, USER_SEARCH_FIELDS),
+            ]:
+                failed |= self.run(label, model, fields, options['repeat'], options['target_ms'])
+            transaction.set_rollback(True)
+        if failed:
+            self.stdout.write(self.style.ERROR('p95 latency target missed'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All probes within the p95 latency target'))
+
+    def seed(self, rng, admissions, users):
+        def name():
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            return first.title(), last.title(), f'{first}.{last[0]}{rng.randrange(10**6)}@example.com'
+
+        batch = []
+        for _ in range(admissions):
+            first, last, email = name()
+            batch.append(AdmissionApplication(
+                first_name=first, last_name=last, email=email, phone='0170000000',
+                date_of_birth=date(2012, 1, 1), gender='M', address='-',
+                grade_applying_for='Grade 1', parent_name='-', parent_phone='0170000000',
+                parent_email=email,
+            ))
+            if len(batch) == 5000:
+                AdmissionApplication.objects.bulk_create(batch)
+                batch = []
+        AdmissionApplication.objects.bulk_create(batch)
+        User.objects.bulk_create(
+            [User(email=email, first_name=first, last_name=last)
+             for first, last, email in (name() for _ in range(users))],
+            batch_size=5000,
+        )
+
+    def run(self, label, model, fields, repeat, target_ms):
+        failed = False
+        for probe in PROBES:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                matches = list(apply_autocomplete(model.objects.all(), probe, fields, limit=10))
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            failed |= p95 > target_ms
+            self.stdout.write(
+                f'{label:10} {probe!r:12} hits={len(matches):<3} p50={p50:.2f}ms p95={p95:.2f}ms'
+            )
+        return failed
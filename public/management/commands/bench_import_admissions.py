@@ -0,0 +1,88 @@
+import csv
+import json
+import random
+import resource
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from public.imports import CSV, NDJSON, import_admissions, iter_records
+from public.serializers import AdmissionApplicationSerializer
+
+GRADES = [f'Grade {n}' for n in range(1, 13)]
+FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'gender', 'address',
+    'previous_school', 'grade_applying_for', 'parent_name', 'parent_phone', 'parent_email',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures admission import throughput in rows per second for CSV and NDJSON '
+        'files, against creating rows one at a time through the serializer. '
+        'Imported rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20_000)
+        parser.add_argument('--baseline-rows', type=int, default=1_000,
+                            help='Rows to create one at a time for comparison')
+        parser.add_argument('--invalid-every', type=int, default=100,
+                            help='Make every Nth row invalid (0 for none)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        records = list(self.records(options['rows'], options['invalid_every'], options['seed']))
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            for record in records[:options['baseline_rows']]:
+                serializer = AdmissionApplicationSerializer(data=record)
+                if serializer.is_valid():
+                    serializer.save()
+            self.report('one at a time', options['baseline_rows'], time.perf_counter() - started)
+
+            for file_format, write in ((CSV, self.write_csv), (NDJSON, self.write_ndjson)):
+                with tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as lines:
+                    write(lines, records)
+                    lines.seek(0)
+                    started = time.perf_counter()
+                    result = import_admissions(iter_records(lines, file_format))
+                    self.report(file_format, len(records), time.perf_counter() - started, result)
+            transaction.set_rollback(True)
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(f'peak RSS {peak:.0f} MiB (includes the generated records)')
+
+    def report(self, label, rows, elapsed, result=None):
+        line = f'{label:<14} {rows:>8} rows {elapsed:7.2f}s {rows / elapsed:>9.0f} rows/s'
+        if result:
+            line += f'  created={result["created"]} failed={result["failed"]}'
+        self.stdout.write(line)
+
+    def records(self, rows, invalid_every, seed):
+        rng = random.Random(seed)
+        for i in range(rows):
+            record = {
+                'first_name': f'First{i}', 'last_name': f'Last{i}',
+                'email': f'applicant{i}@example.com', 'phone': f'01{rng.randrange(10**9):09d}',
+                'date_of_birth': f'{rng.randint(2008, 2019)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+                'gender': rng.choice('MFO'), 'address': f'{i} School Road',
+                'previous_school': rng.choice(['', 'Feeder Primary School']),
+                'grade_applying_for': rng.choice(GRADES), 'parent_name': f'Parent {i}',
+                'parent_phone': f'01{rng.randrange(10**9):09d}', 'parent_email': f'parent{i}@example.com',
+            }
+            if invalid_every and i % invalid_every == invalid_every - 1:
+                record['email'] = 'not-an-email'
+            yield record
+
+    def write_csv(self, lines, records):
+        writer = csv.DictWriter(lines, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+    def write_ndjson(self, lines, records):
+        for record in records:
+            lines.write(json.dumps(record) + '\n')
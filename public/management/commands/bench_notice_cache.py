@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from public.models import Notice
+from public.response_cache import notice_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures anonymous notice API throughput with the response cache disabled and '
+        'warm. Seeded rows are rolled back and the cache is invalidated afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notices', type=int, default=2_000)
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        urls = [
+            reverse('notice-list'),
+            reverse('notice-list') + '?page=2',
+            reverse('notice-list') + '?search=exam',
+            reverse('notice-recent'),
+        ]
+        try:
+            # Replicas cannot see the seeded rows, which are never committed
+            with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False, REPLICA_DATABASES=[]), transaction.atomic():
+                Notice.objects.bulk_create([
+                    Notice(title=f'Notice {i}', content=f'Exam schedule update {i}')
+                    for i in range(options['notices'])
+                ])
+                client = Client()
+                for url in urls:
+                    with override_settings(RESPONSE_CACHE_ENABLED=False):
+                        cold = self.run(client, url, options['requests'])
+                    notice_cache.invalidate()
+                    client.get(url)  # fill the cache
+                    warm = self.run(client, url, options['requests'])
+                    self.stdout.write(
+                        f'{url:<32} uncached {cold[0]:>7.0f} req/s {cold[1]:>2} queries | '
+                        f'cached {warm[0]:>7.0f} req/s {warm[1]:>2} queries ({warm[0] / cold[0]:.1f}x)'
+                    )
+                transaction.set_rollback(True)
+        finally:
+            # Entries built from the rolled-back rows must not outlive them
+            notice_cache.invalidate()
+
+    def run(self, client, url, requests):
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        # Read now: every request start resets the connection's query log
+        query_count = len(queries)
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.get(url)
+        return requests / (time.perf_counter() - started), query_count
@@ -0,0 +1,72 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from public.models import Notice
+from public.search import IcontainsSearchBackend, get_search_backend
+from public.utils import NOTICE_SEARCH_FIELDS
+
+WORDS = (
+    'admission exam holiday schedule parent meeting sports annual science fair '
+    'library uniform transport fee payment result term vacation cultural '
+    'program teacher training workshop notice grade class assembly canteen '
+    'medical checkup picnic excursion competition debate music art'
+).split()
+
+QUERIES = ['exam', 'sports day', 'parent meet', 'annual science fair', 'xylophone']
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks full-text notice search against the icontains scan. Seeded rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notices', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['notices'], options['seed'])
+            self.run(options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, count, seed):
+        rng = random.Random(seed)
+        started = time.perf_counter()
+        batch = []
+        for i in range(count):
+            batch.append(Notice(
+                title=' '.join(rng.choices(WORDS, k=4)).capitalize(),
+                content=' '.join(rng.choices(WORDS, k=80)),
+                is_active=rng.random() < 0.9,
+            ))
+            if len(batch) == 5000:
+                Notice.objects.bulk_create(batch)
+                batch = []
+        Notice.objects.bulk_create(batch)
+        self.stdout.write(f'Seeded {count} notices in {time.perf_counter() - started:.1f}s')
+
+    def run(self, repeat):
+        backends = [
+            ('icontains', IcontainsSearchBackend()),
+            ('full-text', get_search_backend(Notice)),
+        ]
+        for query in QUERIES:
+            for name, backend in backends:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    queryset = backend.search(
+                        Notice.objects.filter(is_active=True), query, NOTICE_SEARCH_FIELDS
+                    )
+                    # One listing page plus the paginator count
+                    list(queryset[:10])
+                    total = queryset.count()
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f'{query!r:24} {name:10} matches={total:<7} '
+                    f'median={timings[len(timings) // 2]:.1f}ms best={timings[0]:.1f}ms'
+                )
@@ -0,0 +1,103 @@
+import resource
+import time
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from public.models import AdmissionApplication
+
+User = get_user_model()
+
+GRADES = [f'Grade {n}' for n in range(1, 13)]
+
+
+def current_rss_mib():
+    """Resident set size of this process, falling back to its peak off Linux"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Streams the admission and user exports over seeded data and fails if memory '
+        'grows with the number of rows. Seeded rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Admissions to export')
+        parser.add_argument('--users', type=int, default=100_000, help='Users to export')
+        parser.add_argument('--max-growth-mib', type=float, default=64.0,
+                            help='Allowed RSS growth while streaming one export')
+
+    def handle(self, *args, **options):
+        failures = []
+        # Replicas cannot see the seeded rows, which are never committed
+        with override_settings(ALLOWED_HOSTS=['*'], REPLICA_DATABASES=[]), transaction.atomic():
+            self.seed(options['rows'], options['users'])
+            client = Client()
+            client.force_login(User.objects.create_superuser(
+                email='export-check@example.com', password='export-check',
+            ))
+            for name, file_format in [
+                ('admission-export', 'csv'), ('admission-export', 'ndjson'), ('user-export', 'csv'),
+            ]:
+                label = f'{name} ({file_format})'
+                growth = self.measure(client, label, reverse(name), file_format)
+                if growth > options['max_growth_mib']:
+                    failures.append(label)
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'Memory grew past the limit for: {", ".join(failures)}')
+
+    def seed(self, rows, users):
+        self.stdout.write(f'Seeding {rows} admissions and {users} users...')
+        applications = (
+            AdmissionApplication(
+                first_name=f'First{i}', last_name=f'Last{i}', email=f'applicant{i}@example.com',
+                phone='0', date_of_birth=date(2012, 1, 1), gender='F', address='-',
+                grade_applying_for=GRADES[i % len(GRADES)], parent_name='-', parent_phone='0',
+                parent_email=f'parent{i}@example.com',
+            )
+            for i in range(rows)
+        )
+        while batch := list(islice(applications, 10_000)):
+            AdmissionApplication.objects.bulk_create(batch)
+        accounts = (User(email=f'export{i}@example.com') for i in range(users))
+        while batch := list(islice(accounts, 10_000)):
+            User.objects.bulk_create(batch)
+
+    def measure(self, client, label, url, file_format):
+        baseline = peak = current_rss_mib()
+        started = time.perf_counter()
+        response = client.get(url, {'file_format': file_format})
+        if response.status_code != 200 or not response.streaming:
+            raise CommandError(f'{label} returned {response.status_code} without streaming')
+
+        first_byte = None
+        size = lines = 0
+        for i, chunk in enumerate(response.streaming_content):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(chunk)
+            lines += chunk.count(b'\n')
+            if i % 100 == 0:
+                peak = max(peak, current_rss_mib())
+        elapsed = time.perf_counter() - started
+        peak = max(peak, current_rss_mib())
+
+        self.stdout.write(
+            f'{label:<26} {lines:>9} lines {size / 2**20:7.1f} MiB in {elapsed:6.1f}s '
+            f'first byte {first_byte * 1000:6.1f}ms RSS +{peak - baseline:.1f} MiB'
+        )
+        return peak - baseline
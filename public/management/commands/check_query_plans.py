@@ -0,0 +1,130 @@
+import random
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+
+from dashboard.api_views import UserManagementViewSet
+from dashboard.views import AdmissionManagementView, NoticeManagementView
+from public.api_views import AdmissionApplicationViewSet, NoticeViewSet
+from public.models import AdmissionApplication, Notice
+from public.pagination import keyset_filter
+from public.views import NoticeListView
+
+User = get_user_model()
+
+GRADES = [f'Grade {n}' for n in range(1, 13)]
+
+# Plan lines that mean a full read of a table
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'SCAN (\w+)(?! USING)(?:\s|$)'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAINs the main query of each list endpoint against seeded data and '
+        'fails if any of them falls back to a sequential scan. Seeded rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20_000)
+        parser.add_argument('--verbose-plans', action='store_true')
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'No plan checks for database vendor {connection.vendor!r}')
+
+        with transaction.atomic():
+            staff = self.seed(options['rows'])
+            failures = []
+            for name, queryset in self.endpoint_queries(staff):
+                plan = queryset.explain()
+                scans = pattern.findall(plan)
+                if options['verbose_plans'] or scans:
+                    self.stdout.write(plan)
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'SEQ SCAN  {name}: {", ".join(scans)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'ok        {name}'))
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} endpoint queries use a sequential scan')
+
+    def seed(self, rows):
+        rng = random.Random(0)
+        now = timezone.now()
+        Notice.objects.bulk_create([
+            Notice(title=f'Notice {i}', content='-', is_active=rng.random() < 0.9)
+            for i in range(rows)
+        ], batch_size=5000)
+        AdmissionApplication.objects.bulk_create([
+            AdmissionApplication(
+                first_name=f'First{i}', last_name=f'Last{i}', email=f'applicant{i}@example.com',
+                phone='0', date_of_birth=date(2012, 1, 1), gender='F', address='-',
+                grade_applying_for=rng.choice(GRADES), parent_name='-', parent_phone='0',
+                parent_email=f'parent{i}@example.com',
+            )
+            for i in range(rows)
+        ], batch_size=5000)
+        # Spread creation dates so the date ordering is meaningful
+        for model in (Notice, AdmissionApplication):
+            for pk in model.objects.values_list('pk', flat=True)[:2000]:
+                model.objects.filter(pk=pk).update(created_at=now - timedelta(minutes=pk))
+        User.objects.bulk_create([
+            User(email=f'user{i}@example.com') for i in range(rows // 10)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return User.objects.create_superuser(email='plan-check@example.com', password='plan-check')
+
+    def view_queryset(self, view_class, user, params=None, **initkwargs):
+        request = RequestFactory().get('/', params or {})
+        request.user = user
+        view = view_class(**initkwargs)
+        view.setup(request)
+        if hasattr(view, 'initialize_request'):
+            view.request = Request(request)
+            view.format_kwarg = None
+        return view.get_queryset()
+
+    def endpoint_queries(self, staff):
+        anonymous = AnonymousUser()
+        notice = Notice.objects.filter(is_active=True).order_by('-created_at', 'id')[100]
+        admission = AdmissionApplication.objects.order_by('-created_at', 'id')[100]
+        ordering = ('-created_at', 'id')
+        cursor_values = lambda obj: [getattr(obj, key.lstrip('-')) for key in ordering]
+
+        public_notices = self.view_queryset(NoticeListView, anonymous)
+        api_notices = self.view_queryset(NoticeViewSet, anonymous, action='list')
+        staff_notices = self.view_queryset(NoticeManagementView, staff)
+        admissions = self.view_queryset(AdmissionApplicationViewSet, staff, action='list')
+        by_grade = self.view_queryset(AdmissionManagementView, staff, {'grade': 'Grade 3'})
+        users = self.view_queryset(UserManagementViewSet, staff, action='list')
+
+        return [
+            ('public:notice_list', public_notices[:10]),
+            ('notice-list (anonymous)', api_notices[:5]),
+            ('notice-list (cursor page)', api_notices.filter(
+                keyset_filter(ordering, cursor_values(notice)))[:5]),
+            ('notice-recent', Notice.objects.filter(is_active=True)[:3]),
+            ('dashboard:notice_management', staff_notices[:20]),
+            ('admission-list', admissions[:5]),
+            ('admission-list (cursor page)', admissions.filter(
+                keyset_filter(ordering, cursor_values(admission)))[:5]),
+            ('dashboard:admission_management (grade)', by_grade[:20]),
+            ('dashboard:admission_management (grades)', AdmissionApplication.objects.values_list(
+                'grade_applying_for', flat=True).distinct().order_by('grade_applying_for')),
+            ('user-list', users[:5]),
+        ]
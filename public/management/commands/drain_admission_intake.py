@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from public.intake import DRAIN_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes queued admission submissions (ADMISSION_INTAKE_QUEUE) to the admission '
+        'table in batches. Drains the backlog and exits, or keeps polling with --forever.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DRAIN_BATCH_SIZE)
+        parser.add_argument('--forever', action='store_true', help='Keep polling for new submissions')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty (with --forever)')
+
+    def handle(self, *args, **options):
+        total = 0
+        started = time.perf_counter()
+        while True:
+            processed = drain(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['forever']:
+                break
+            time.sleep(options['interval'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {total} submissions in {elapsed:.1f}s'
+        ))
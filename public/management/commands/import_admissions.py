@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from public.imports import (
+    FORMATS, IMPORT_BATCH_SIZE, IMPORT_ERROR_LIMIT, detect_format, import_admissions, iter_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Streams admission applications from a CSV or NDJSON file, validating each row '
+        'with the API serializer and inserting valid rows in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument('--format', dest='file_format', choices=FORMATS,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--error-limit', type=int, default=IMPORT_ERROR_LIMIT,
+                            help='Maximum number of failed rows to print')
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or detect_format(options['path'])
+        if file_format is None:
+            raise CommandError('Cannot tell the file format from its name; pass --format')
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                result = import_admissions(
+                    iter_records(lines, file_format),
+                    batch_size=options['batch_size'],
+                    error_limit=options['error_limit'],
+                )
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(f'Cannot read {options["path"]}: {error}')
+        elapsed = time.perf_counter() - started
+
+        for error in result['errors']:
+            messages = '; '.join(
+                f'{field}: {" ".join(str(message) for message in field_errors)}'
+                for field, field_errors in error['errors'].items()
+            )
+            self.stderr.write(f'row {error["row"]}: {messages}')
+        rows = result['created'] + result['failed']
+        summary = (
+            f'{result["created"]} created, {result["failed"]} failed in {elapsed:.1f}s '
+            f'({rows / elapsed if elapsed else 0:.0f} rows/s)'
+        )
+        if result['failed']:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
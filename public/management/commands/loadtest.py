@@ -0,0 +1,191 @@
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils.crypto import get_random_string
+
+from public import loadtest
+from public.models import AdmissionApplication, AdmissionIntake, Notice
+
+User = get_user_model()
+
+LOADTEST_EMAIL = 'loadtest@example.com'
+DEFAULT_BASELINE = settings.BASE_DIR / 'loadtest_baseline.json'
+
+
+def route_names(patterns, namespace=None):
+    """Names of every URL pattern, with namespaces"""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from route_names(pattern.url_patterns, pattern.namespace or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+class Command(BaseCommand):
+    help = (
+        'Boots the project under gunicorn and drives concurrent traffic at its pages and API '
+        'routes, reporting throughput and p50/p95/p99 latency per route for each scenario: '
+        'sweep (every route), season (admission-season mix) and burst (submission burst). '
+        'Results are compared with a stored baseline and the run fails on a regression or '
+        'any failed request. Submissions made during the run are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', choices=list(loadtest.SCENARIOS),
+                            default=list(loadtest.SCENARIOS))
+        parser.add_argument('--requests', type=int, default=2_000, help='Requests per scenario')
+        parser.add_argument('--warmup', type=int, default=200, help='Unrecorded requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--workers', type=int, default=4, help='gunicorn sync workers')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--seed-data', action='store_true',
+                            help='Replace admissions and notices with seed_scale data first')
+        parser.add_argument('--admissions', type=int, default=100_000, help='With --seed-data')
+        parser.add_argument('--notices', type=int, default=5_000, help='With --seed-data')
+        parser.add_argument('--users', type=int, default=5_000, help='With --seed-data')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store these results as the baseline instead of comparing')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed slowdown against the baseline, as a fraction')
+        parser.add_argument('--min-delta', type=float, default=2.0,
+                            help='Latency increases below this many ms never count as regressions')
+
+    def handle(self, *args, **options):
+        uncovered = set(route_names(get_resolver().url_patterns)) - set(loadtest.ROUTES) - loadtest.SKIPPED_ROUTES
+        uncovered = {name for name in uncovered if not name.startswith('admin:')}
+        if uncovered:
+            self.stdout.write(self.style.WARNING(f'Routes without load: {", ".join(sorted(uncovered))}'))
+
+        if options['seed_data']:
+            call_command(
+                'seed_scale', reset=True, seed=options['seed'], until=loadtest.SUBMISSION_UNTIL.date(),
+                admissions=options['admissions'], notices=options['notices'], users=options['users'],
+                stdout=self.stdout,
+            )
+
+        pks = self.fixture_pks()
+        last_application = AdmissionApplication.objects.aggregate(last=Max('pk'))['last'] or 0
+        last_intake = AdmissionIntake.objects.aggregate(last=Max('pk'))['last'] or 0
+        User.objects.filter(email=LOADTEST_EMAIL).delete()
+        user = User.objects.create_superuser(email=LOADTEST_EMAIL, password=get_random_string(32))
+        try:
+            client = Client()
+            client.force_login(user)
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+            headers = {
+                loadtest.ANONYMOUS: {},
+                loadtest.STAFF: {'Cookie': f'{settings.SESSION_COOKIE_NAME}={cookie}'},
+            }
+            results = {
+                'meta': {
+                    'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'workers': options['workers'],
+                    'concurrency': options['concurrency'],
+                    'requests': options['requests'],
+                    'seed': options['seed'],
+                    'data': self.data_size(),
+                },
+                'scenarios': {},
+            }
+            # Submission bursts come from few addresses; the limits are not under test
+            with loadtest.gunicorn_server(
+                ['school_management.wsgi', '-w', str(options['workers'])], {'THROTTLE_ENABLED': 'False'},
+            ) as port:
+                for scenario in options['scenarios']:
+                    labels = loadtest.plan(scenario, options['warmup'] + options['requests'], options['seed'])
+                    loadtest.run(port, labels[:options['warmup']], options['concurrency'], headers, pks,
+                                 options['seed'])
+                    elapsed, samples = loadtest.run(
+                        port, labels[options['warmup']:], options['concurrency'], headers, pks, options['seed'],
+                    )
+                    results['scenarios'][scenario] = summary = loadtest.summarize(elapsed, samples)
+                    self.report(scenario, summary)
+        finally:
+            AdmissionApplication.objects.filter(pk__gt=last_application).delete()
+            AdmissionIntake.objects.filter(pk__gt=last_intake).delete()
+            user.delete()
+
+        if options['output']:
+            self.write_json(options['output'], results)
+        self.check_results(results, options)
+
+    def fixture_pks(self):
+        """Pks of existing rows for the detail routes"""
+        pks = {
+            'notice': Notice.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True).first(),
+            'admission': AdmissionApplication.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'user': User.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'group': Group.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'permission': Permission.objects.order_by('pk').values_list('pk', flat=True).first(),
+        }
+        missing = [name for name, pk in pks.items() if pk is None]
+        if missing:
+            raise CommandError(
+                f'No {", ".join(missing)} to load; run with --seed-data or `manage.py seed_scale` first'
+            )
+        return pks
+
+    def data_size(self):
+        return {
+            'admissions': AdmissionApplication.objects.count(),
+            'notices': Notice.objects.count(),
+            'users': User.objects.count(),
+        }
+
+    def report(self, scenario, summary):
+        total = summary['total']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{scenario}: {total["throughput"]:.0f} req/s, p50 {total["p50"]} ms, '
+            f'p95 {total["p95"]} ms, p99 {total["p99"]} ms'
+        ))
+        for label, stats in summary['endpoints'].items():
+            self.stdout.write(
+                f'  {label:<40} {stats["requests"]:>5} req {stats["throughput"]:>7.1f} req/s  '
+                f'p50 {stats["p50"]:>7.1f}  p95 {stats["p95"]:>7.1f}  p99 {stats["p99"]:>7.1f} ms'
+                + (f'  {stats["errors"]} errors' if stats['errors'] else '')
+            )
+
+    def write_json(self, path, results):
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+
+    def check_results(self, results, options):
+        failures = [
+            f'{scenario} {label}: {stats["errors"]} failed requests'
+            for scenario, summary in results['scenarios'].items()
+            for label, stats in summary['endpoints'].items() if stats['errors']
+        ]
+
+        if options['save_baseline']:
+            self.write_json(options['baseline'], results)
+            self.stdout.write(f'Baseline saved to {options["baseline"]}')
+        else:
+            try:
+                with open(options['baseline']) as file:
+                    baseline = json.load(file)
+            except FileNotFoundError:
+                self.stdout.write(f'No baseline at {options["baseline"]}; store one with --save-baseline')
+            else:
+                if baseline['meta']['data'] != results['meta']['data']:
+                    self.stdout.write(self.style.WARNING(
+                        f'The baseline ran against different data ({baseline["meta"]["data"]}); '
+                        'use --seed-data for comparable runs'
+                    ))
+                failures += loadtest.compare(results, baseline, options['tolerance'], options['min_delta'])
+
+        for failure in failures:
+            self.stdout.write(self.style.ERROR(f'FAIL {failure}'))
+        if failures:
+            raise CommandError(f'{len(failures)} regressions or failures')
+        self.stdout.write(self.style.SUCCESS('No regressions'))
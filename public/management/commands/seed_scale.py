@@ -0,0 +1,215 @@
+import itertools
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as dt_time, timezone as dt_timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from accounts.backends import bump_permission_version
+from dashboard import counters
+from public.models import AdmissionApplication, AdmissionIntake, Notice
+from public.response_cache import notice_cache
+from public.scale import GENERATORS, SEED_EMAIL_DOMAIN, USER_GROUPS, explicit_timestamps
+from public.search import search_index_suspended
+
+User = get_user_model()
+
+# Rows generated (and, with parallel inserts, written) per task
+CHUNK_SIZE = 10_000
+
+SEED_PASSWORD = 'seed-password'
+
+
+def insert(kind, rows, batch_size, context):
+    """Write generated rows with bulk_create and return how many were written"""
+    model, _ = GENERATORS[kind]
+    if kind != 'users':
+        with explicit_timestamps(model):
+            return len(model.objects.bulk_create([model(**values) for values in rows], batch_size=batch_size))
+
+    users = User.objects.bulk_create(
+        [User(password=context['password'], **values) for values, _ in rows], batch_size=batch_size
+    )
+    Membership = User.groups.through
+    Membership.objects.bulk_create([
+        Membership(user_id=user.pk, group_id=context['groups'][name])
+        for user, (_, groups) in zip(users, rows) for name in groups
+    ], batch_size=batch_size)
+    return len(users)
+
+
+def insert_fields(model):
+    return [field for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def column_adapter(field):
+    """The database adaptation for one generated column, resolved once per chunk"""
+    internal_type = field.get_internal_type()
+    if internal_type in ('CharField', 'TextField', 'BooleanField'):
+        # Generated values already have the database type
+        return None
+    if internal_type == 'DateTimeField':
+        return connection.ops.adapt_datetimefield_value
+    if internal_type == 'DateField':
+        return connection.ops.adapt_datefield_value
+    return lambda value: field.get_db_prep_save(value, connection)
+
+
+def db_values(model, rows):
+    """Adapt generated rows to parameter tuples for insert_values()"""
+    fields = insert_fields(model)
+    defaults = {field.attname: field.get_default() for field in fields}
+    columns = [(field.attname, column_adapter(field)) for field in fields]
+    return [
+        tuple(
+            values.get(name, defaults[name]) if adapt is None else adapt(values.get(name, defaults[name]))
+            for name, adapt in columns
+        )
+        for values in rows
+    ]
+
+
+def insert_values(model, values):
+    """Write db_values() tuples with one executemany and return how many were written"""
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in insert_fields(model))
+    placeholders = ', '.join(['%s'] * len(insert_fields(model)))
+    sql = f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, values)
+    return len(values)
+
+
+def init_worker():
+    # Spawned workers start from scratch; forked ones already have the apps loaded
+    django.setup()
+
+
+def generate_chunk(task):
+    """
+    Generate one chunk of rows, deterministically from the seed and chunk number
+
+    With `write` set the rows are inserted here and the count returned.
+    Otherwise the parent inserts them: users as generated (their group
+    memberships need the new pks), other rows already adapted for the
+    database so that the single writer has as little to do as possible.
+    """
+    kind, chunk, start, count, context = task
+    rng = random.Random(f'{context["seed"]}:{kind}:{chunk}')
+    model, generate = GENERATORS[kind]
+    rows = generate(rng, start, count, context['until'], context['years'])
+    if not context['write']:
+        return rows if kind == 'users' else db_values(model, rows)
+    try:
+        return insert(kind, rows, context['batch_size'], context)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Loads synthetic admissions, notices and users (with group memberships) for scale testing. '
+        'Output is deterministic for a given --seed and --until. Rows are generated across a '
+        'process pool; workers also insert them, except on SQLite, which allows one writer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admissions', type=int, default=1_000_000)
+        parser.add_argument('--notices', type=int, default=20_000)
+        parser.add_argument('--users', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--until', type=date.fromisoformat, default=None,
+                            help='Latest generated date, YYYY-MM-DD (default: today)')
+        parser.add_argument('--years', type=int, default=3, help='Span of generated dates')
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--reset', action='store_true',
+                            help='Delete all admissions and notices, and previously seeded users, first')
+
+    def handle(self, *args, **options):
+        until = options['until'] or timezone.localdate()
+        if options['years'] < 1:
+            raise CommandError('--years must be at least 1')
+
+        if options['reset']:
+            self.reset()
+
+        # Every seeded user gets the same (slow to compute) password hash
+        context = {
+            'seed': options['seed'],
+            'until': datetime.combine(until, dt_time.max, tzinfo=dt_timezone.utc),
+            'years': options['years'],
+            'batch_size': options['batch_size'],
+            'write': connection.vendor != 'sqlite',
+            'password': make_password(SEED_PASSWORD),
+            'groups': {
+                name: Group.objects.get_or_create(name=name)[0].pk for name, _, _ in USER_GROUPS
+            },
+        }
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(options['workers'], initializer=init_worker) as pool:
+            for kind in ('users', 'notices', 'admissions'):
+                if options[kind]:
+                    self.seed(pool, kind, options[kind], context, options['workers'] * 2)
+
+        # Bulk inserts skip the signals that keep these in step
+        counters.reconcile()
+        bump_permission_version()
+        notice_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded with --seed {options["seed"]} --until {until}; users log in with "{SEED_PASSWORD}"'
+        ))
+
+    def seed(self, pool, kind, total, context, window):
+        model, _ = GENERATORS[kind]
+        started = time.perf_counter()
+        tasks = [
+            (kind, chunk, start, min(CHUNK_SIZE, total - start), context)
+            for chunk, start in enumerate(range(0, total, CHUNK_SIZE))
+        ]
+        written = 0
+        with search_index_suspended(model):
+            for result in self.bounded_map(pool, tasks, window):
+                if context['write']:
+                    written += result
+                elif kind == 'users':
+                    written += insert(kind, result, context['batch_size'], context)
+                else:
+                    written += insert_values(model, result)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{kind:<10} {written:>9,} rows in {elapsed:6.1f}s ({written / elapsed:,.0f} rows/s)')
+
+    def bounded_map(self, pool, tasks, window):
+        """Yield generate_chunk results in order, with at most `window` chunks in flight"""
+        pending = deque()
+        tasks = iter(tasks)
+        for task in itertools.islice(tasks, window):
+            pending.append(pool.submit(generate_chunk, task))
+        while pending:
+            result = pending.popleft().result()
+            for task in itertools.islice(tasks, 1):
+                pending.append(pool.submit(generate_chunk, task))
+            yield result
+
+    def reset(self):
+        started = time.perf_counter()
+        AdmissionIntake.objects.filter(application__isnull=False).update(application=None)
+        for model in (AdmissionApplication, Notice):
+            # A raw delete skips loading every row for the delete signals;
+            # the counters they maintain are reconciled afterwards
+            with search_index_suspended(model):
+                queryset = model.objects.all()
+                queryset._raw_delete(queryset.db)
+        with search_index_suspended(User):
+            User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').delete()
+        self.stdout.write(f'Reset in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from public.idempotency import sweep
+
+
+class Command(BaseCommand):
+    help = 'Deletes idempotency keys older than IDEMPOTENCY_KEY_TTL. Run periodically, e.g. from cron.'
+
+    def handle(self, *args, **options):
+        deleted = sweep()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys'))
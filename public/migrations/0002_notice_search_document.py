@@ -0,0 +1,99 @@
+"""
+Indexed search document for Notice, used by public.search.
+
+PostgreSQL gets a trigger-maintained tsvector column with a GIN index and
+SQLite an external-content FTS5 table kept in sync by triggers. Neither lives
+in the model state, so other database vendors simply fall back to icontains.
+
+Note: on SQLite, any later migration that rebuilds public_notice (e.g. an
+AlterField) drops these triggers and must recreate them.
+"""
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE public_notice ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION public_notice_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER public_notice_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON public_notice
+    FOR EACH ROW EXECUTE FUNCTION public_notice_search_vector_update()
+    """,
+    # Fire the trigger once for existing rows
+    "UPDATE public_notice SET title = title",
+    "CREATE INDEX public_notice_search_vector_idx ON public_notice USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TRIGGER IF EXISTS public_notice_search_vector_trigger ON public_notice",
+    "DROP FUNCTION IF EXISTS public_notice_search_vector_update()",
+    "ALTER TABLE public_notice DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE public_notice_fts USING fts5(
+        title, content,
+        content='public_notice', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER public_notice_fts_insert AFTER INSERT ON public_notice BEGIN
+        INSERT INTO public_notice_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER public_notice_fts_delete AFTER DELETE ON public_notice BEGIN
+        INSERT INTO public_notice_fts(public_notice_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER public_notice_fts_update AFTER UPDATE OF title, content ON public_notice BEGIN
+        INSERT INTO public_notice_fts(public_notice_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO public_notice_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO public_notice_fts(public_notice_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS public_notice_fts_insert",
+    "DROP TRIGGER IF EXISTS public_notice_fts_delete",
+    "DROP TRIGGER IF EXISTS public_notice_fts_update",
+    "DROP TABLE IF EXISTS public_notice_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""
+Trigram search index for AdmissionApplication name and email searches.
+
+See public.search.trigram_index_sql for the per-vendor SQL; the same
+SQLite caveat as 0002 applies to table rebuilds.
+"""
+from django.db import migrations
+
+from public.search import trigram_index_sql
+
+
+INDEX_SQL = trigram_index_sql(
+    'public_admissionapplication', ['first_name', 'last_name', 'email']
+)
+
+
+def run_for_vendor(direction):
+    def run(apps, schema_editor):
+        statements = INDEX_SQL.get(schema_editor.connection.vendor)
+        for statement in statements[direction] if statements else []:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public', '0002_notice_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_for_vendor(0), run_for_vendor(1)),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-17 20:00
+
+from django.db import migrations, models
+
+from public.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('public', '0003_admission_trigram_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='admissionapplication',
+            index=models.Index(fields=['-created_at', 'id'], name='admission_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='admissionapplication',
+            index=models.Index(fields=['grade_applying_for', '-created_at', 'id'], name='admission_grade_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notice',
+            index=models.Index(fields=['-created_at', 'id'], name='notice_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', 'id'], name='notice_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.23 on 2026-10-17 21:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    AdmissionApplication = apps.get_model('public', 'AdmissionApplication')
+    AdmissionApplication.objects.filter(updated_at__isnull=True).update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public', '0004_hot_filter_indexes'),
+    ]
+
+    operations = [
+        # auto_now gives the field an effective default, which makes SQLite
+        # rebuild the table (dropping the trigram triggers from 0003). It only
+        # matters in Python, so the column itself is added as plain nullable.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AddField(
+                    model_name='admissionapplication',
+                    name='updated_at',
+                    field=models.DateTimeField(null=True),
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='admissionapplication',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True, null=True),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+from public.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('public', '0007_idempotencykey'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='admissionapplication',
+            index=models.Index(fields=['updated_at'], name='admission_updated_idx'),
+        ),
+    ]
@@ -1,5 +1,10 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
+from .querysets import BulkSignalQuerySet
+
 
 class Notice(models.Model):
     title = models.CharField(max_length=200)
@@ -8,11 +13,23 @@ class Notice(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    objects = BulkSignalQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         permissions = [
             ('can_manage_notices', 'Can manage notices'),
         ]
+        indexes = [
+            # Staff listings: every notice, newest first
+            models.Index(fields=['-created_at', 'id'], name='notice_created_idx'),
+            # Public listings only ever read active notices, newest first
+            models.Index(
+                fields=['-created_at', 'id'],
+                condition=models.Q(is_active=True),
+                name='notice_active_created_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -38,12 +55,95 @@ class AdmissionApplication(models.Model):
     parent_phone = models.CharField(max_length=15)
     parent_email = models.EmailField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Nullable so the column is added in place (a SQLite table rebuild would
+    # drop the search index triggers); migration 0005 backfills it.
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+    
+    objects = BulkSignalQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         permissions = [
             ('can_manage_admissions', 'Can manage admission applications'),
         ]
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='admission_created_idx'),
+            # Grade filter plus date order; also serves the distinct grade list
+            models.Index(
+                fields=['grade_applying_for', '-created_at', 'id'],
+                name='admission_grade_created_idx',
+            ),
+            # max(updated_at) for the list ETag (public.conditional)
+            models.Index(fields=['updated_at'], name='admission_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.grade_applying_for}"
+
+
+class AdmissionIntake(models.Model):
+    """
+    A validated admission submission waiting to be written.
+
+    Used in write-behind intake mode (see public.intake): submissions are
+    appended here and turned into AdmissionApplication rows in batches.
+    """
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    receipt = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    application = models.OneToOneField(
+        AdmissionApplication, null=True, blank=True, on_delete=models.SET_NULL, related_name='intake'
+    )
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The worker only ever scans the pending backlog, oldest first
+            models.Index(
+                fields=['id'], condition=models.Q(status='pending'), name='intake_pending_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.receipt} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    A client-supplied idempotency key and the response it produced.
+
+    See public.idempotency. Rows older than IDEMPOTENCY_KEY_TTL are ignored
+    and removed by `manage.py sweep_idempotency_keys`.
+    """
+    scope = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64, blank=True)
+    # Null until the original request has produced its response
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    response_headers = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_scope_key_uniq'),
+        ]
+        indexes = [
+            # TTL sweep
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
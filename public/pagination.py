@@ -0,0 +1,195 @@
+"""
+Keyset (cursor) pagination shared by the API and dashboard list views.
+
+A cursor encodes the ordering-key values of the row at the edge of a page,
+so the next page is a range query on an index rather than an OFFSET scan:
+page N costs the same as page 1, and rows inserted concurrently never shift
+or duplicate what the client has already seen. The ordering must end in a
+unique field (normally `id`) for that to hold.
+"""
+import base64
+import json
+from collections import namedtuple
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+CURSOR_QUERY_PARAM = 'cursor'
+PAGINATION_QUERY_PARAM = 'pagination'
+
+KeysetPage = namedtuple('KeysetPage', ['object_list', 'next_cursor', 'previous_cursor'])
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _split(key):
+    return key.lstrip('-'), key.startswith('-')
+
+
+def encode_cursor(instance, ordering, reverse=False):
+    """Encode the ordering values of `instance` as an opaque cursor string."""
+    opts = instance._meta
+    values = [
+        opts.get_field(name).value_to_string(instance)
+        for name, _ in map(_split, ordering)
+    ]
+    payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Decode a cursor into (values, reverse), raising InvalidCursor if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        raw_values, reverse = payload['v'], bool(payload['r'])
+        if len(raw_values) != len(ordering):
+            raise InvalidCursor(cursor)
+        values = [
+            model._meta.get_field(name).to_python(value)
+            for (name, _), value in zip(map(_split, ordering), raw_values)
+        ]
+    except InvalidCursor:
+        raise
+    except Exception as exc:
+        raise InvalidCursor(cursor) from exc
+    return values, reverse
+
+
+def keyset_filter(ordering, values, reverse=False):
+    """
+    Build the Q for "rows strictly after `values` in `ordering`".
+
+    Expands (a, b) > (x, y) into a > x OR (a = x AND b > y), honouring the
+    direction of each key, and adds a redundant range on the leading key so
+    the database can turn it into an index range scan.
+    """
+    keys = list(map(_split, ordering))
+    lookups = ['lt' if descending != reverse else 'gt' for _, descending in keys]
+
+    q_objects = Q()
+    for position, (name, _) in enumerate(keys):
+        conditions = {keys[i][0]: values[i] for i in range(position)}
+        conditions[f'{name}__{lookups[position]}'] = values[position]
+        q_objects |= Q(**conditions)
+
+    leading, _ = keys[0]
+    leading_range = {'lt': 'lte', 'gt': 'gte'}[lookups[0]]
+    return Q(**{f'{leading}__{leading_range}': values[0]}) & q_objects
+
+
+def reverse_ordering(ordering):
+    return [key[1:] if key.startswith('-') else f'-{key}' for key in ordering]
+
+
+def paginate_keyset(queryset, ordering, cursor, page_size):
+    """
+    Return one KeysetPage of `queryset` in `ordering`, starting at `cursor`.
+
+    A missing cursor means the first page. Raises InvalidCursor for cursors
+    that can't be decoded.
+    """
+    values, reverse = None, False
+    if cursor:
+        values, reverse = decode_cursor(cursor, queryset.model, ordering)
+
+    queryset = queryset.order_by(*(reverse_ordering(ordering) if reverse else ordering))
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(ordering, values, reverse))
+
+    # Fetch one extra row to know whether there is more in this direction
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if has_more or reverse:
+            next_cursor = encode_cursor(rows[-1], ordering)
+        if (has_more and reverse) or (values is not None and not reverse):
+            previous_cursor = encode_cursor(rows[0], ordering, reverse=True)
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination over `view.cursor_ordering`, without COUNT or OFFSET.
+
+    Responses have `next`, `previous` and `results` but no `count`.
+    """
+    page_size = api_settings.PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = paginate_keyset(
+                queryset, view.cursor_ordering,
+                request.query_params.get(CURSOR_QUERY_PARAM), self.page_size,
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor.')
+        return self.page.object_list
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, PAGINATION_QUERY_PARAM, 'cursor')
+        return replace_query_param(url, CURSOR_QUERY_PARAM, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Page-number pagination, switchable to keyset pagination per request.
+
+    Views that declare `cursor_ordering` use keyset pagination when called
+    with ?pagination=cursor or a ?cursor= value; everything else keeps the
+    page-number behaviour.
+    """
+
+    def use_keyset(self, request, view):
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        return (
+            request.query_params.get(PAGINATION_QUERY_PARAM) == 'cursor'
+            or CURSOR_QUERY_PARAM in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
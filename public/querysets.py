@@ -0,0 +1,17 @@
+from django.db import models, transaction
+
+from .signals import post_bulk_create, pre_bulk_update
+
+
+class BulkSignalQuerySet(models.QuerySet):
+    """QuerySet whose bulk operations announce themselves through public.signals."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        post_bulk_create.send(sender=self.model, objs=objs, using=self.db)
+        return objs
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db):
+            pre_bulk_update.send(sender=self.model, queryset=self, values=kwargs, using=self.db)
+            return super().update(**kwargs)
@@ -0,0 +1,20 @@
+"""
+Invalidate cached notice responses whenever notices change.
+
+Covers per-instance saves and deletes and the bulk signals sent by
+public.querysets. Invalidation runs after commit so no request can cache
+pre-change data under the new version.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Notice
+from .response_cache import notice_cache
+from .signals import post_bulk_create, pre_bulk_update
+
+
+@receiver(post_save, sender=Notice)
+@receiver(post_delete, sender=Notice)
+@receiver(post_bulk_create, sender=Notice)
+@receiver(pre_bulk_update, sender=Notice)
+def invalidate_notice_responses(sender, **kwargs):
+    notice_cache.invalidate_on_commit()
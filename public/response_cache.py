@@ -0,0 +1,202 @@
+"""
+Two-tier cache for rendered API responses.
+
+Responses are stored as the final JSON bytes, so a hit costs no queries and
+no serializer or renderer work. Lookups go to a small per-process LRU first
+and to the shared cache second; entries are keyed by a namespace version,
+which is bumped on invalidation so every worker drops the whole namespace
+at once. Each process re-reads the version at most every
+RESPONSE_CACHE_VERSION_TTL seconds, which bounds how long another worker
+can keep serving a response from before an invalidation.
+"""
+import asyncio
+import functools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import parse_http_date_safe
+
+from dashboard.metrics import record_cache_lookup
+from school_management.db_router import read_from_primary
+from .conditional import conditional_response
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded in-process mapping with LRU eviction"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ResponseCache:
+    """A namespace of cached response bodies with whole-namespace invalidation"""
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.version_key = f'response:{namespace}:version'
+        self._local = None
+        self._version = (None, 0.0)
+
+    @property
+    def shared(self):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LocalLRU(settings.RESPONSE_CACHE_LOCAL_ENTRIES)
+        return self._local
+
+    def version(self):
+        version, expires = self._version
+        if version is None or time.monotonic() >= expires:
+            version = self.shared.get(self.version_key)
+            if version is None:
+                self.shared.add(self.version_key, uuid.uuid4().hex, None)
+                version = self.shared.get(self.version_key)
+            self._version = (version, time.monotonic() + settings.RESPONSE_CACHE_VERSION_TTL)
+        return version
+
+    def _shared_key(self, version, key):
+        return f'response:{self.namespace}:{version}:{key}'
+
+    def get(self, key):
+        """Return the cached (body, content_type, headers) for key, or None"""
+        version = self.version()
+        entry = self.local.get((version, key))
+        if entry is None:
+            entry = self.shared.get(self._shared_key(version, key))
+            if entry is not None:
+                self.local.set((version, key), entry)
+        record_cache_lookup(f'response:{self.namespace}', entry is not None)
+        return entry
+
+    def set(self, key, body, content_type, headers):
+        version = self.version()
+        entry = (body, content_type, headers)
+        self.local.set((version, key), entry)
+        self.shared.set(self._shared_key(version, key), entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+    def invalidate(self):
+        """Drop every entry in the namespace, in all processes"""
+        self.shared.set(self.version_key, uuid.uuid4().hex, None)
+        self.local.clear()
+        self._version = (None, 0.0)
+
+    def invalidate_on_commit(self):
+        transaction.on_commit(self.invalidate)
+
+
+notice_cache = ResponseCache('notices')
+
+# Response headers stored with cached bodies
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def request_cache_key(request):
+    """
+    Absolute URL with sorted query parameters, so ?page=2&search=x and
+    ?search=x&page=2 share an entry. The host is included because paginated
+    responses embed absolute next/previous links.
+    """
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    url = request.build_absolute_uri(request.path)
+    return f'{url}?{urlencode(params)}' if params else url
+
+
+def cache_response(response_cache, anonymous_only=True):
+    """
+    Serve a DRF view method's JSON response from `response_cache`
+
+    Only successful JSON responses are cached, together with their
+    ETag / Last-Modified, so conditional requests are answered from the
+    cache too. With `anonymous_only`, authenticated requests bypass the
+    cache, for views whose output depends on the user's permissions.
+    Misses are filled from the primary database, never a read replica.
+    Coroutine methods (see public.async_api) are supported.
+    """
+    def bypass(request):
+        return (
+            not settings.RESPONSE_CACHE_ENABLED
+            or request.accepted_renderer.format != 'json'
+            or (anonymous_only and request.user.is_authenticated)
+        )
+
+    def store(view, request, response):
+        body = request.accepted_renderer.render(
+            response.data, request.accepted_media_type, view.get_renderer_context()
+        )
+        headers = {
+            header: response[header] for header in VALIDATOR_HEADERS if header in response
+        }
+        entry = (body, request.accepted_media_type, headers)
+        response_cache.set(request_cache_key(request), *entry)
+        return entry
+
+    def cached_response(request, entry):
+        body, content_type, headers = entry
+        return conditional_response(
+            request,
+            lambda: HttpResponse(body, content_type=content_type),
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+        )
+
+    def decorator(method):
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if bypass(request):
+                    return await method(self, request, *args, **kwargs)
+                entry = await sync_to_async(response_cache.get)(request_cache_key(request))
+                if entry is None:
+                    read_from_primary()
+                    response = await method(self, request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                    entry = await sync_to_async(store)(self, request, response)
+                return cached_response(request, entry)
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if bypass(request):
+                return method(self, request, *args, **kwargs)
+            entry = response_cache.get(request_cache_key(request))
+            if entry is None:
+                read_from_primary()
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                entry = store(self, request, response)
+            return cached_response(request, entry)
+        return wrapper
+    return decorator
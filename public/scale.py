@@ -0,0 +1,187 @@
+"""
+Deterministic synthetic data for scale and load testing.
+
+Each generator takes a random.Random plus a start number, row count, latest
+timestamp and span in years, and returns field values for that many rows,
+so the same seed always yields the same data. Used by `manage.py
+seed_scale` to fill the database and by public.loadtest to build admission
+submissions.
+"""
+import itertools
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+
+from .models import AdmissionApplication, Notice
+
+User = get_user_model()
+
+# Seeded users are recognisable by their email domain
+SEED_EMAIL_DOMAIN = 'seed.example.com'
+FIRST_NAMES = [
+    'Aarav', 'Aisha', 'Amelia', 'Arjun', 'Ava', 'Benjamin', 'Chloe', 'Daniel', 'Diya', 'Elijah',
+    'Emma', 'Ethan', 'Fatima', 'Grace', 'Hannah', 'Isaac', 'Isabella', 'Ishaan', 'James', 'Kabir',
+    'Layla', 'Liam', 'Lucas', 'Maya', 'Mia', 'Mohammed', 'Noah', 'Nusrat', 'Olivia', 'Omar',
+    'Priya', 'Rafi', 'Riya', 'Samuel', 'Sara', 'Sofia', 'Tahmid', 'Yusuf', 'Zara', 'Zoe',
+]
+LAST_NAMES = [
+    'Ahmed', 'Ali', 'Anderson', 'Begum', 'Brown', 'Chowdhury', 'Das', 'Davis', 'Garcia', 'Gupta',
+    'Hassan', 'Hossain', 'Islam', 'Jackson', 'Johnson', 'Khan', 'Kumar', 'Lee', 'Martin', 'Miah',
+    'Miller', 'Moore', 'Nguyen', 'Patel', 'Rahman', 'Roy', 'Sarkar', 'Shah', 'Singh', 'Smith',
+    'Taylor', 'Thomas', 'Uddin', 'Walker', 'White', 'Williams', 'Wilson', 'Wright', 'Young', 'Zaman',
+]
+STREETS = ['Lake Road', 'Station Road', 'Park Avenue', 'Hill View', 'Mill Lane', 'Church Street', 'Green Road']
+CITIES = ['Dhaka', 'Chattogram', 'Sylhet', 'Khulna', 'Rajshahi', 'Barishal', 'Rangpur']
+SCHOOLS = [
+    'Sunbeam Primary School', 'Green Valley School', 'City Model School', 'Riverside Academy',
+    'St. Mary\'s School', 'Lakeview High School',
+]
+
+# Entry years (KG, 1, 6, 9) attract most applications
+GRADES = ['KG'] + [f'Grade {n}' for n in range(1, 13)]
+GRADE_WEIGHTS = [14, 12, 5, 5, 5, 5, 10, 5, 5, 9, 4, 3, 3]
+GRADE_AGES = dict(zip(GRADES, range(5, 18)))
+
+GENDERS = ['M', 'F', 'O']
+GENDER_WEIGHTS = [49, 49, 2]
+
+# Admission season peaks early in the year; applications cluster in office hours
+MONTH_WEIGHTS = [14, 16, 14, 9, 6, 5, 5, 7, 6, 6, 6, 6]
+HOUR_WEIGHTS = [0] * 7 + [2, 6, 9, 10, 10, 8, 8, 9, 8, 6, 4, 3, 2, 1, 1, 0, 0]
+MONTH_CUM_WEIGHTS = list(itertools.accumulate(MONTH_WEIGHTS))
+HOUR_CUM_WEIGHTS = list(itertools.accumulate(HOUR_WEIGHTS))
+
+# (group, share of users, staff) - most accounts are parents
+USER_GROUPS = [
+    ('Parents', 60, False),
+    ('Teachers', 22, True),
+    ('Admissions Office', 6, True),
+    ('Accounts', 4, True),
+    ('Librarians', 3, True),
+    ('Students', 5, False),
+]
+
+NOTICE_TITLES = [
+    'Exam schedule for {grade}', 'Parent-teacher meeting for {grade}', 'Holiday notice: {holiday}',
+    '{sport} tournament results', 'Library: new arrivals in {subject}', 'Fee payment reminder for {term}',
+    'Admission test for {grade}', '{subject} olympiad registration',
+]
+NOTICE_SENTENCES = [
+    'Students are requested to arrive fifteen minutes early.',
+    'Parents may contact the school office for further details.',
+    'The revised timetable is available at the front desk.',
+    'Uniform is mandatory on all school days.',
+    'Please bring a signed copy of this notice on Monday.',
+    'Classes will resume as usual the following day.',
+    'Results will be published on the notice board.',
+    'Late submissions will not be accepted.',
+]
+HOLIDAYS = ['Independence Day', 'Eid', 'Durga Puja', 'Victory Day', 'New Year', 'Winter break']
+SPORTS = ['Football', 'Cricket', 'Badminton', 'Athletics', 'Chess']
+SUBJECTS = ['Mathematics', 'Science', 'English', 'History', 'Geography', 'Computer Science']
+TERMS = ['first term', 'mid term', 'final term']
+
+
+def seasonal_datetime(rng, until, years):
+    """A timestamp within `years` before `until`, skewed to the admission season and office hours"""
+    while True:
+        year = until.year - rng.randrange(years)
+        month = rng.choices(range(1, 13), cum_weights=MONTH_CUM_WEIGHTS)[0]
+        hour = rng.choices(range(24), cum_weights=HOUR_CUM_WEIGHTS)[0]
+        moment = datetime(
+            year, month, rng.randint(1, 28), hour, rng.randrange(60), rng.randrange(60), tzinfo=dt_timezone.utc
+        )
+        if moment <= until:
+            return moment
+
+
+def admission_values(rng, start, count, until, years):
+    grades = rng.choices(GRADES, GRADE_WEIGHTS, k=count)
+    genders = rng.choices(GENDERS, GENDER_WEIGHTS, k=count)
+    rows = []
+    for n, grade, gender in zip(range(start, start + count), grades, genders):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        parent_first = rng.choice(FIRST_NAMES)
+        created_at = seasonal_datetime(rng, until, years)
+        age = GRADE_AGES[grade] + rng.choice((0, 0, 0, 1))
+        rows.append({
+            'first_name': first,
+            'last_name': last,
+            'email': f'{first}.{last}.{n}@{SEED_EMAIL_DOMAIN}'.lower(),
+            'phone': f'01{rng.randrange(3, 10)}{rng.randrange(10 ** 8):08d}',
+            'date_of_birth': created_at.date() - timedelta(days=365 * age + rng.randrange(365)),
+            'gender': gender,
+            'address': f'{rng.randint(1, 250)} {rng.choice(STREETS)}, {rng.choice(CITIES)}',
+            'previous_school': rng.choice(SCHOOLS) if grade != 'KG' else '',
+            'grade_applying_for': grade,
+            'parent_name': f'{parent_first} {last}',
+            'parent_phone': f'01{rng.randrange(3, 10)}{rng.randrange(10 ** 8):08d}',
+            'parent_email': f'{parent_first}.{last}.p{n}@{SEED_EMAIL_DOMAIN}'.lower(),
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(hours=rng.choice((0, 0, 1, 24, 72))),
+        })
+    return rows
+
+
+def notice_values(rng, start, count, until, years):
+    rows = []
+    for _ in range(count):
+        title = rng.choice(NOTICE_TITLES).format(
+            grade=rng.choice(GRADES), holiday=rng.choice(HOLIDAYS), sport=rng.choice(SPORTS),
+            subject=rng.choice(SUBJECTS), term=rng.choice(TERMS),
+        )
+        created_at = until - timedelta(seconds=rng.randrange(years * 365 * 24 * 60 * 60))
+        rows.append({
+            'title': title,
+            'content': ' '.join(rng.sample(NOTICE_SENTENCES, rng.randint(2, 5))),
+            'is_active': rng.random() < 0.85,
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(days=rng.choice((0, 0, 0, 1, 7))),
+        })
+    return rows
+
+
+def user_values(rng, start, count, until, years):
+    names = [name for name, _, _ in USER_GROUPS]
+    weights = [share for _, share, _ in USER_GROUPS]
+    staff = {name for name, _, is_staff in USER_GROUPS if is_staff}
+    rows = []
+    for n in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        # One role, sometimes two (a teacher who is also a parent)
+        groups = set(rng.choices(names, weights, k=rng.choice((1, 1, 1, 2))))
+        rows.append(({
+            'email': f'{first}.{last}.{n}@{SEED_EMAIL_DOMAIN}'.lower(),
+            'first_name': first,
+            'last_name': last,
+            'phone': f'01{rng.randrange(3, 10)}{rng.randrange(10 ** 8):08d}',
+            'is_staff': bool(groups & staff),
+            'is_active': rng.random() < 0.97,
+            'date_joined': until - timedelta(seconds=rng.randrange(years * 365 * 24 * 60 * 60)),
+        }, sorted(groups)))
+    return rows
+
+
+GENERATORS = {
+    'admissions': (AdmissionApplication, admission_values),
+    'notices': (Notice, notice_values),
+    'users': (User, user_values),
+}
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """Keep generated created_at/updated_at values instead of auto_now(_add)"""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
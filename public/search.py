@@ -0,0 +1,304 @@
+"""
+Pluggable search backends used by apply_search_filter.
+
+Each backend turns a free-text search term into a filtered queryset. Models
+that keep an indexed search document (see the public and accounts
+migrations) get an index-backed backend for the current database vendor;
+everything else falls back to the original icontains scan.
+"""
+import re
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Trigram indexes cannot serve terms shorter than one trigram
+TRIGRAM_MIN_LENGTH = 3
+
+
+def tokenize(search_term):
+    """Split a search term into plain word tokens, dropping query syntax."""
+    return TOKEN_RE.findall(search_term or '')
+
+
+class IcontainsSearchBackend:
+    """Portable OR-of-icontains search. Unranked, not index-assisted."""
+
+    def search(self, queryset, search_term, search_fields):
+        q_objects = Q()
+        for field in search_fields:
+            q_objects |= Q(**{f"{field}__icontains": search_term})
+        return queryset.filter(q_objects)
+
+    def autocomplete(self, queryset, search_term, search_fields, limit):
+        """Return the top `limit` matches, best first."""
+        return self.search(queryset, search_term, search_fields)[:limit]
+
+
+class IndexedSearchBackend(IcontainsSearchBackend, ABC):
+    """
+    Base class for backends that query a per-row search document.
+
+    Subclasses declare which fields the document covers; a search over any
+    other field set, or a term the index cannot serve, is delegated to the
+    icontains backend so callers never get silently different matching.
+    """
+    indexed_fields = ()
+
+    def search(self, queryset, search_term, search_fields):
+        query = None
+        if set(search_fields) == set(self.indexed_fields):
+            query = self.build_query(search_term)
+        if not query:
+            return super().search(queryset, search_term, search_fields)
+
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        queryset = self.filter(queryset, query)
+        return queryset.order_by('-search_rank', *ordering)
+
+    @abstractmethod
+    def build_query(self, search_term):
+        """Return the backend query for a term, or None if it can't be served."""
+
+    @abstractmethod
+    def filter(self, queryset, query):
+        """Filter to matching rows and annotate them with `search_rank`."""
+
+
+class SQLiteFTSSearchBackend(IndexedSearchBackend):
+    """Search through an FTS5 table named `<db_table><fts_suffix>`."""
+    fts_suffix = '_fts'
+
+    def filter(self, queryset, query):
+        table = queryset.model._meta.db_table
+        fts_table = f'{table}{self.fts_suffix}'
+        # FTS5 auxiliary functions such as bm25() only work inside the MATCH
+        # query itself, so join the FTS table instead of using a subquery.
+        # bm25() is lower-is-better; negate it to sort like ts_rank.
+        return queryset.extra(
+            tables=[fts_table],
+            where=[
+                f'"{fts_table}".rowid = "{table}"."id"',
+                f'"{fts_table}" MATCH %s',
+            ],
+            params=[query],
+            select={'search_rank': f'-bm25("{fts_table}")'},
+        )
+
+
+class PostgresNoticeSearchBackend(IndexedSearchBackend):
+    """tsvector column kept current by a trigger and served by a GIN index."""
+    indexed_fields = ('title', 'content')
+    config = 'english'
+
+    def build_query(self, search_term):
+        tokens = tokenize(search_term)
+        if not tokens:
+            return None
+        # Every word must match; the last one is treated as a prefix so that
+        # partially typed words still find results.
+        return ' & '.join(tokens[:-1] + [f"{tokens[-1]}:*"])
+
+    def filter(self, queryset, query):
+        table = queryset.model._meta.db_table
+        match = RawSQL(
+            f'"{table}"."search_vector" @@ to_tsquery(%s::regconfig, %s)',
+            (self.config, query),
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f'ts_rank("{table}"."search_vector", to_tsquery(%s::regconfig, %s))',
+            (self.config, query),
+            output_field=FloatField(),
+        )
+        return queryset.filter(match).annotate(search_rank=rank)
+
+
+class SQLiteNoticeSearchBackend(SQLiteFTSSearchBackend):
+    """FTS5 external-content table kept current by triggers."""
+    indexed_fields = ('title', 'content')
+
+    def build_query(self, search_term):
+        tokens = tokenize(search_term)
+        if not tokens:
+            return None
+        return ' '.join([f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+
+
+class PostgresTrigramSearchBackend(IcontainsSearchBackend):
+    """
+    icontains served by pg_trgm GIN indexes on UPPER(<field>::text).
+
+    Those expressions are exactly what Django emits for icontains on
+    PostgreSQL, so plain searches need no rewriting; autocomplete adds
+    similarity ranking on top of the indexed filter.
+    """
+
+    def autocomplete(self, queryset, search_term, search_fields, limit):
+        table = queryset.model._meta.db_table
+        similarity = ', '.join(
+            f'similarity("{table}"."{field}", %s)' for field in search_fields
+        )
+        rank = RawSQL(
+            f'GREATEST({similarity})',
+            [search_term] * len(search_fields),
+            output_field=FloatField(),
+        )
+        queryset = self.search(queryset, search_term, search_fields)
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', 'pk')[:limit]
+
+
+class SQLiteTrigramSearchBackend(SQLiteFTSSearchBackend):
+    """
+    Substring search through an FTS5 trigram table.
+
+    A trigram phrase query matches the same rows as an OR of icontains over
+    the indexed columns, but through the index instead of a table scan.
+    """
+    fts_suffix = '_trigram'
+
+    def build_query(self, search_term):
+        search_term = (search_term or '').strip()
+        if len(search_term) < TRIGRAM_MIN_LENGTH:
+            return None
+        return '"{}"'.format(search_term.replace('"', '""'))
+
+
+class SQLiteAdmissionSearchBackend(SQLiteTrigramSearchBackend):
+    indexed_fields = ('first_name', 'last_name', 'email')
+
+
+class SQLiteUserSearchBackend(SQLiteTrigramSearchBackend):
+    indexed_fields = ('first_name', 'last_name', 'email')
+
+
+# Index-backed backends per model label and database vendor. Models or
+# vendors that are not listed use the icontains backend.
+DEFAULT_SEARCH_BACKENDS = {
+    'public.Notice': {
+        'postgresql': 'public.search.PostgresNoticeSearchBackend',
+        'sqlite': 'public.search.SQLiteNoticeSearchBackend',
+    },
+    'public.AdmissionApplication': {
+        'postgresql': 'public.search.PostgresTrigramSearchBackend',
+        'sqlite': 'public.search.SQLiteAdmissionSearchBackend',
+    },
+    'accounts.User': {
+        'postgresql': 'public.search.PostgresTrigramSearchBackend',
+        'sqlite': 'public.search.SQLiteUserSearchBackend',
+    },
+}
+
+_backend_cache = {}
+
+
+def get_search_backend(model, using='default'):
+    """
+    Return the search backend instance for a model on a database.
+
+    settings.SEARCH_BACKENDS may override DEFAULT_SEARCH_BACKENDS with the
+    same {model label: {vendor: dotted path}} shape.
+    """
+    vendor = connections[using].vendor
+    key = (model._meta.label, vendor)
+    if key not in _backend_cache:
+        backends = {**DEFAULT_SEARCH_BACKENDS, **getattr(settings, 'SEARCH_BACKENDS', {})}
+        path = backends.get(model._meta.label, {}).get(vendor)
+        _backend_cache[key] = import_string(path)() if path else IcontainsSearchBackend()
+    return _backend_cache[key]
+
+
+def trigram_index_sql(table, fields):
+    """
+    Return {vendor: (forward, reverse)} SQL for a trigram search index.
+
+    Used by migrations: PostgreSQL gets one pg_trgm GIN index per field and
+    SQLite an external-content FTS5 trigram table kept in sync by triggers.
+    """
+    pg_forward = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+    pg_reverse = []
+    for field in fields:
+        index = f'{table}_{field}_trgm_idx'
+        pg_forward.append(
+            f'CREATE INDEX {index} ON {table} USING GIN (UPPER("{field}"::text) gin_trgm_ops)'
+        )
+        pg_reverse.append(f'DROP INDEX IF EXISTS {index}')
+
+    fts = f'{table}_trigram'
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+    insert = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});'
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    sqlite_forward = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE OF {columns} ON {table} '
+        f'BEGIN {delete} {insert} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+    sqlite_reverse = [
+        f'DROP TRIGGER IF EXISTS {fts}_insert',
+        f'DROP TRIGGER IF EXISTS {fts}_delete',
+        f'DROP TRIGGER IF EXISTS {fts}_update',
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+    return {
+        'postgresql': (pg_forward, pg_reverse),
+        'sqlite': (sqlite_forward, sqlite_reverse),
+    }
+
+
+@contextmanager
+def search_index_suspended(model, using='default'):
+    """
+    Stop maintaining a model's SQLite FTS search tables row by row.
+
+    For bulk loads and deletes: the sync triggers are dropped for the
+    duration and the tables rebuilt in one pass on exit, which is far
+    cheaper than an FTS write per row. Other vendors index as usual.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        yield
+        return
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        # External-content FTS tables over this table, see trigram_index_sql()
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND sql LIKE 'CREATE VIRTUAL TABLE%%' AND sql LIKE %s",
+            [f"%content='{table}'%"],
+        )
+        fts_tables = [name for name, in cursor.fetchall()]
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+            [table],
+        )
+        triggers = [
+            (name, sql) for name, sql in cursor.fetchall()
+            if any(name.startswith(f'{fts}_') for fts in fts_tables)
+        ]
+        for name, _ in triggers:
+            cursor.execute(f'DROP TRIGGER {name}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for fts in fts_tables:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            for _, sql in triggers:
+                cursor.execute(sql)
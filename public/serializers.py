@@ -3,7 +3,8 @@ Serializers for converting model data to/from JSON for API responses.
 """
 
 from rest_framework import serializers
-from .models import Notice, AdmissionApplication
+from rest_framework.reverse import reverse
+from .models import Notice, AdmissionApplication, AdmissionIntake
 
 
 class NoticeSerializer(serializers.ModelSerializer):
@@ -22,4 +23,23 @@ class AdmissionApplicationSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class AdmissionAutocompleteSerializer(serializers.ModelSerializer):
 
+    class Meta:
+        model = AdmissionApplication
+        fields = ["id", "first_name", "last_name", "email", "grade_applying_for"]
+        read_only_fields = fields
+
+
+class AdmissionIntakeSerializer(serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AdmissionIntake
+        fields = ["receipt", "status", "received_at", "processed_at", "status_url"]
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        return reverse(
+            "admission-intake-status", kwargs={"receipt": obj.receipt}, request=self.context.get("request")
+        )
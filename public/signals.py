@@ -0,0 +1,15 @@
+"""
+Signals for bulk operations that bypass per-instance model signals.
+
+QuerySet.bulk_create() and QuerySet.update() never send pre/post_save, so
+anything that keeps derived data in sync with signals (e.g. dashboard
+counters) listens to these instead. They are sent by BulkSignalQuerySet.
+"""
+from django.dispatch import Signal
+
+# Sent after bulk_create() with `objs`, the created instances.
+post_bulk_create = Signal()
+
+# Sent before update() with `queryset` (still unchanged) and `values`, the
+# update() keyword arguments. Runs in the same transaction as the update.
+pre_bulk_update = Signal()
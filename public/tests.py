@@ -1,3 +1,351 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import uuid
+from datetime import timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from dashboard import api_urls as dashboard_api_urls
+from dashboard.api_views import UserManagementViewSet
+from dashboard.tests import QueryBudgetMixin, create_rows
+
+from . import api_urls, intake
+from .api_views import AdmissionApplicationViewSet, NoticeViewSet
+from .management.commands.check_query_plans import Command as QueryPlanCommand
+from .models import AdmissionApplication, AdmissionIntake, Notice
+from .response_cache import notice_cache
+from .serializers import AdmissionApplicationSerializer
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=False, THROTTLE_ENABLED=False)
+class NPlusOneSweepTests(TestCase):
+    """GETs every public API route, anonymously and as a superuser; an N+1 query fails the route"""
+
+    # Model of the <pk> by route basename
+    PK_MODELS = {'notice': Notice, 'admission': AdmissionApplication}
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows()
+        cls.superuser = User.objects.create_superuser(email='admin@example.com', password='unused')
+
+    def urls(self):
+        for pattern in api_urls.urlpatterns:
+            groups = pattern.pattern.regex.groupindex
+            # Format suffix variants run the same views
+            if 'format' in groups:
+                continue
+            kwargs = {}
+            if 'pk' in groups:
+                model = self.PK_MODELS[pattern.name.split('-')[0]]
+                kwargs['pk'] = model.objects.order_by('pk').last().pk
+            if 'receipt' in groups:
+                kwargs['receipt'] = uuid.uuid4()
+            yield reverse(pattern.name, kwargs=kwargs)
+
+    def test_routes_have_no_n_plus_one_queries(self):
+        for staff in (False, True):
+            if staff:
+                self.client.force_login(self.superuser)
+            for url in self.urls():
+                with self.subTest(url=url, staff=staff):
+                    response = self.client.get(url)
+                    self.assertLess(response.status_code, 500)
+
+
+@override_settings(REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=False, THROTTLE_ENABLED=False)
+class AnonymousQueryBudgetTests(QueryBudgetMixin, TestCase):
+    QUERY_BUDGETS = {
+        'public:notice_list': 1,
+        'notice-list': 2,
+        'notice-recent': 1,
+    }
+
+
+@override_settings(REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=False, THROTTLE_ENABLED=False)
+class StaffQueryBudgetTests(QueryBudgetMixin, TestCase):
+    QUERY_BUDGETS = {
+        'notice-list': 4,
+        'admission-list': 6,
+    }
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='unused'))
+
+
+@override_settings(REPLICA_DATABASES=[], THROTTLE_ENABLED=False)
+class AdmissionFormTests(TestCase):
+    def payload(self, key, **changes):
+        return {
+            'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com', 'phone': '555-0100',
+            'date_of_birth': '2015-12-10', 'gender': 'F', 'address': '12 St James Square',
+            'grade_applying_for': '5', 'parent_name': 'Anne', 'parent_phone': '555-0101',
+            'parent_email': 'anne@example.com', 'idempotency_key': key, **changes,
+        }
+
+    def test_resubmitting_the_same_form_creates_one_application(self):
+        url = reverse('public:admission_form')
+        for _ in range(2):
+            response = self.client.post(url, self.payload('token-1'))
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response['Location'], reverse('public:admission_success'))
+        self.assertEqual(AdmissionApplication.objects.count(), 1)
+
+    def test_token_reused_for_different_details_shows_the_form_again(self):
+        url = reverse('public:admission_form')
+        self.client.post(url, self.payload('token-1'))
+        response = self.client.post(url, self.payload('token-1', first_name='Grace'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'already used to submit a different application')
+        key = response.context['idempotency_key']
+        self.assertNotEqual(key, 'token-1')
+
+        response = self.client.post(url, self.payload(key, first_name='Grace'))
+        self.assertRedirects(response, reverse('public:admission_success'))
+        self.assertQuerySetEqual(
+            AdmissionApplication.objects.order_by('pk').values_list('first_name', flat=True), ['Ada', 'Grace'],
+        )
+
+
+@override_settings(REPLICA_DATABASES=[])
+class AdmissionIntakeTests(TestCase):
+    def test_drained_applications_keep_their_received_order(self):
+        serializer = AdmissionApplicationSerializer(data={
+            'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com', 'phone': '555-0100',
+            'date_of_birth': '2015-12-10', 'gender': 'F', 'address': '12 St James Square',
+            'grade_applying_for': '5', 'parent_name': 'Anne', 'parent_phone': '555-0101',
+            'parent_email': 'anne@example.com',
+        })
+        serializer.is_valid(raise_exception=True)
+        entries = [intake.enqueue(serializer.validated_data) for _ in range(2)]
+        # Received a day apart, drained together
+        AdmissionIntake.objects.filter(pk=entries[0].pk).update(received_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(intake.drain(), 2)
+        received = AdmissionIntake.objects.order_by('-received_at')
+        self.assertQuerySetEqual(
+            AdmissionApplication.objects.order_by('-created_at').values_list('pk', 'created_at'),
+            [(entry.application_id, entry.received_at) for entry in received],
+        )
+
+
+@override_settings(REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=True, THROTTLE_ENABLED=False)
+class ResponseCacheTests(TestCase):
+    url = reverse('notice-list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.notice = Notice.objects.create(title='Sports day', content='Friday on the main field.')
+
+    def setUp(self):
+        # The shared cache outlives the test database
+        notice_cache.invalidate()
+
+    def titles(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [notice['title'] for notice in response.json()['results']]
+
+    def test_warm_hit_runs_no_queries(self):
+        self.titles()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles(), ['Sports day'])
+
+    def test_writes_invalidate_the_cache_once_committed(self):
+        changes = [
+            lambda: Notice.objects.create(title='Exam week', content='Starts Monday.'),
+            lambda: Notice.objects.filter(pk=self.notice.pk).update(title='Field day'),
+            lambda: Notice.objects.get(title='Exam week').delete(),
+        ]
+        for change in changes:
+            before = self.titles()
+            with self.captureOnCommitCallbacks() as callbacks:
+                change()
+            # Still cached until the transaction commits
+            self.assertEqual(self.titles(), before)
+            for callback in callbacks:
+                callback()
+            with self.subTest(after=before):
+                self.assertNotEqual(self.titles(), before)
+        self.assertEqual(self.titles(), ['Field day'])
+
+    def test_staff_responses_stay_out_of_the_shared_cache(self):
+        Notice.objects.create(title='Staff meeting', content='Draft.', is_active=False)
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='unused'))
+        self.assertIn('Staff meeting', self.titles())
+        self.client.logout()
+        self.assertEqual(self.titles(), ['Sports day'])
+
+
+@override_settings(REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=False, THROTTLE_ENABLED=False)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.notice = Notice.objects.create(title='Sports day', content='Friday on the main field.')
+
+    def setUp(self):
+        notice_cache.invalidate()
+
+    def test_matching_etag_answers_304_until_an_edit(self):
+        for url in (reverse('notice-list'), reverse('notice-detail', args=[self.notice.pk])):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.notice.title = f'{self.notice.title}!'
+                    self.notice.save()
+                response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_deleting_a_row_changes_the_list_etag(self):
+        url = reverse('notice-list')
+        Notice.objects.create(title='Exam week', content='Starts Monday.')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Notice.objects.get(title='Exam week').delete()
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_keyset_pages_are_not_validated(self):
+        response = self.client.get(reverse('notice-list'), {'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+
+@override_settings(REPLICA_DATABASES=[], THROTTLE_ENABLED=False)
+class AdmissionExportTests(TestCase):
+    url = reverse('admission-export')
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(count=15)
+        cls.superuser = User.objects.create_superuser(email='admin@example.com', password='unused')
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_export_applies_the_search_and_grade_filters(self):
+        response, content = self.export(search='Student1', grade='Grade 2')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="admissions.csv"')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(sorted(row['first_name'] for row in rows), ['Student1', 'Student13'])
+        self.assertEqual({row['grade_applying_for'] for row in rows}, {'Grade 2'})
+
+    def test_ndjson_export_has_one_object_per_row(self):
+        response, content = self.export(file_format='ndjson', search='Student1')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), AdmissionApplication.objects.filter(first_name__startswith='Student1').count())
+        self.assertEqual(rows[0].keys(), {field.name for field in AdmissionApplication._meta.concrete_fields})
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(self.url, {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file_format', response.json())
+
+
+# PostgreSQL picks sequential scans for small tables whatever the indexes,
+# so its plans are only meaningful against production-sized data
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked on SQLite')
+@override_settings(REPLICA_DATABASES=[])
+class QueryPlanTests(TestCase):
+    def test_searches_match_through_the_search_index(self):
+        staff = User.objects.create_superuser(email='admin@example.com', password='unused')
+        searches = [
+            (NoticeViewSet, AnonymousUser(), 'public_notice'),
+            (AdmissionApplicationViewSet, staff, 'public_admissionapplication'),
+            (UserManagementViewSet, staff, 'accounts_user'),
+        ]
+        for view_class, user, table in searches:
+            with self.subTest(view=view_class.__name__):
+                queryset = QueryPlanCommand().view_queryset(view_class, user, {'search': 'rahman'}, action='list')
+                plan = queryset[:5].explain()
+                # A MATCH on the FTS table, then a rowid lookup instead of a scan
+                self.assertRegex(plan, rf'SCAN {table}_\w+ VIRTUAL TABLE INDEX \d+:M')
+                self.assertRegex(plan, rf'SEARCH {table} USING INTEGER PRIMARY KEY')
+                self.assertNotRegex(plan, rf'SCAN {table}(?!\w)')
+
+    def test_list_queries_use_their_indexes(self):
+        call_command('check_query_plans', rows=2000, stdout=io.StringIO())
+
+
+class AsyncAPIURLs:
+    """The async read routes at their usual URLs, as ASYNC_API_VIEWS mounts them"""
+    urlpatterns = [
+        path('api/public/', include(api_urls.async_urlpatterns())),
+        path('api/dashboard/', include(dashboard_api_urls.async_urlpatterns())),
+    ]
+
+
+# The async views query on worker threads with their own connections,
+# which only see committed rows
+@override_settings(REPLICA_DATABASES=[], RESPONSE_CACHE_ENABLED=False, THROTTLE_ENABLED=False)
+class AsyncAPIParityTests(TransactionTestCase):
+    """The async read views answer exactly like the sync views they stand in for"""
+
+    URLS = [
+        reverse('notice-list'),
+        reverse('notice-list') + '?page=2',
+        reverse('notice-list') + '?search=Notice 3',
+        reverse('notice-list') + '?pagination=cursor',
+        reverse('notice-list') + '?page=99',
+        reverse('notice-recent'),
+        reverse('dashboard-stats'),
+        reverse('user-permissions'),
+    ]
+
+    def setUp(self):
+        create_rows(count=7)
+        Notice.objects.create(title='Staff meeting', content='Draft.', is_active=False)
+        self.superuser = User.objects.create_superuser(email='admin@example.com', password='unused')
+
+    def async_get(self, url, headers=None):
+        async def get():
+            return await self.async_client.get(url, headers=headers)
+
+        with self.settings(ROOT_URLCONF=AsyncAPIURLs):
+            return async_to_sync(get)()
+
+    def assertSameResponse(self, sync, asynchronous):
+        self.assertEqual(asynchronous.status_code, sync.status_code)
+        self.assertEqual(asynchronous.get('ETag'), sync.get('ETag'))
+        if sync.content:
+            self.assertEqual(asynchronous.json(), sync.json())
+
+    def test_async_views_match_the_sync_views(self):
+        for staff in (False, True):
+            if staff:
+                self.client.force_login(self.superuser)
+                self.async_client.force_login(self.superuser)
+            for url in self.URLS:
+                with self.subTest(url=url, staff=staff):
+                    self.assertSameResponse(self.client.get(url), self.async_get(url))
+
+    def test_async_views_answer_304_to_the_sync_etag(self):
+        for url in (reverse('notice-list'), reverse('notice-recent')):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                headers = {'If-None-Match': etag}
+                sync = self.client.get(url, headers=headers)
+                self.assertEqual(sync.status_code, 304)
+                self.assertSameResponse(sync, self.async_get(url, headers))
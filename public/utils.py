@@ -1,15 +1,19 @@
 """
 Utility functions for the public app to reduce code duplication
 """
-from django.db.models import Q
 from rest_framework import status
 from rest_framework.response import Response
+from .search import get_search_backend, TRIGRAM_MIN_LENGTH
 
 
 def apply_search_filter(queryset, search_term, search_fields):
     """
     Apply search filter to queryset using provided fields
     
+    The matching strategy comes from the search backend configured for the
+    queryset's model (see public.search). Full-text backends order results
+    by relevance, keeping the queryset's existing ordering as a tiebreaker.
+    
     Args:
         queryset: Django QuerySet to filter
         search_term: Search term from request
@@ -21,12 +25,38 @@ def apply_search_filter(queryset, search_term, search_fields):
     if not search_term:
         return queryset
     
-    # Build Q objects for each field
-    q_objects = Q()
-    for field in search_fields:
-        q_objects |= Q(**{f"{field}__icontains": search_term})
+    backend = get_search_backend(queryset.model, using=queryset.db)
+    return backend.search(queryset, search_term, search_fields)
+
+
+def apply_autocomplete(queryset, search_term, search_fields, limit=None):
+    """
+    Return the top matches for a typeahead query, best first
     
-    return queryset.filter(q_objects)
+    Terms shorter than AUTOCOMPLETE_MIN_LENGTH return no rows, so every
+    keystroke that does query is served by the search index.
+    
+    Args:
+        queryset: Django QuerySet to search
+        search_term: Partial term typed by the user
+        search_fields: List of field names to search in
+        limit: Maximum number of results (string or int from the request)
+    
+    Returns:
+        Sliced queryset of at most `limit` rows
+    """
+    search_term = (search_term or '').strip()
+    if len(search_term) < AUTOCOMPLETE_MIN_LENGTH:
+        return queryset.none()
+    
+    try:
+        limit = int(limit or AUTOCOMPLETE_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = AUTOCOMPLETE_DEFAULT_LIMIT
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+    
+    backend = get_search_backend(queryset.model, using=queryset.db)
+    return backend.autocomplete(queryset, search_term, search_fields, limit)
 
 
 def check_api_permission(user, permission):
@@ -51,4 +81,9 @@ def check_api_permission(user, permission):
 # Common search field configurations
 NOTICE_SEARCH_FIELDS = ['title', 'content']
 ADMISSION_SEARCH_FIELDS = ['first_name', 'last_name', 'email']
-USER_SEARCH_FIELDS = ['first_name', 'last_name', 'email']
\ No newline at end of file
+USER_SEARCH_FIELDS = ['first_name', 'last_name', 'email']
+
+# Typeahead settings
+AUTOCOMPLETE_MIN_LENGTH = TRIGRAM_MIN_LENGTH
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 25
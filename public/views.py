@@ -1,7 +1,13 @@
+import uuid
+
 from django.shortcuts import render, redirect
 from django.views.generic import ListView, CreateView, TemplateView
 from django.urls import reverse_lazy
 from django.contrib import messages
+from . import intake
+from .api_views import notice_etag
+from .conditional import conditional_response
+from .idempotency import REPLAYED_HEADER, idempotent_response, request_fingerprint
 from .models import Notice, AdmissionApplication
 from .utils import apply_search_filter, NOTICE_SEARCH_FIELDS
 
@@ -24,6 +30,15 @@ class NoticeListView(ListView):
         queryset = Notice.objects.filter(is_active=True)
         search = self.request.GET.get('search')
         return apply_search_filter(queryset, search, NOTICE_SEARCH_FIELDS)
+    
+    def get(self, request, *args, **kwargs):
+        get_response = lambda: super(NoticeListView, self).get(request, *args, **kwargs)
+        # Pending flash messages are part of the page and must be rendered
+        if len(messages.get_messages(request)):
+            return get_response()
+        # The page header shows who is logged in
+        etag = notice_etag(request, request.user.pk, getattr(request.user, 'email', None))
+        return conditional_response(request, get_response, etag=etag)
 
 
 class AdmissionFormView(CreateView):
@@ -36,7 +51,43 @@ class AdmissionFormView(CreateView):
     ]
     success_url = reverse_lazy('public:admission_success')
     
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Re-rendering an invalid form keeps the token, so the corrected
+        # submission is still recognised if it gets sent twice
+        context.setdefault('idempotency_key', self.request.POST.get('idempotency_key') or uuid.uuid4().hex)
+        return context
+    
     def form_valid(self, form):
+        # The hidden token turns a double click or a resubmitted POST into
+        # a redirect to the success page instead of a second application
+        response = idempotent_response(
+            self.request, 'admission-form', lambda: self.submit(form),
+            key=self.request.POST.get('idempotency_key'),
+            fingerprint=request_fingerprint(form.cleaned_data),
+        )
+        if response.status_code == 422:
+            # The token already submitted different details, e.g. after the
+            # Back button or when reusing the form for a sibling: show the
+            # form again with a fresh token rather than drop this application
+            messages.error(
+                self.request,
+                'This form was already used to submit a different application. '
+                'Please check the details and submit again.'
+            )
+            return self.render_to_response(self.get_context_data(form=form, idempotency_key=uuid.uuid4().hex))
+        if response.has_header(REPLAYED_HEADER):
+            messages.info(self.request, 'Your admission application has already been submitted.')
+        return response
+    
+    def submit(self, form):
+        if intake.intake_enabled():
+            entry = intake.enqueue(form.cleaned_data)
+            messages.success(
+                self.request,
+                f'Your admission application has been received. Your reference number is {entry.receipt}.'
+            )
+            return redirect(self.success_url)
         messages.success(self.request, 'Your admission application has been submitted successfully!')
         return super().form_valid(form)
 
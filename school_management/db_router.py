@@ -0,0 +1,222 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+Writes always go to the primary ("default"). Reads go to a replica in
+REPLICA_DATABASES only while ReplicaRoutingMiddleware is handling a GET or
+HEAD request for a view that is safe to serve slightly stale data:
+
+* ViewSet actions in the viewset's `replica_actions` (list and retrieve
+  unless the viewset says otherwise),
+* ListView pages,
+* views with `replica_reads = True`, like the dashboard stats.
+
+Everything else, including reads made while handling a write, stays on the
+primary, as do reads that fill a shared cache (see read_from_primary). A request that writes marks the client with a cookie that keeps
+its reads on the primary for REPLICA_STICKY_SECONDS, so a user sees their
+own change on the next page even if the replicas lag behind.
+
+Each process checks a replica at most every REPLICA_HEALTH_INTERVAL
+seconds before using it: the replica must answer, and PostgreSQL replicas
+must be within REPLICA_MAX_LAG seconds of the primary. Replicas that fail
+the check, or raise a connection error during a query, are skipped until
+the next check; with none healthy, reads fall back to the primary.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, InterfaceError, OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.views.generic.list import BaseListView
+
+REPLICA_ACTIONS = frozenset({'list', 'retrieve'})
+SAFE_METHODS = ('GET', 'HEAD')
+STICKY_COOKIE = 'db_primary'
+
+# The routing state of the request being handled, or None outside requests
+_state = ContextVar('db_routing', default=None)
+# alias -> (healthy, time.monotonic() of the check)
+_health = {}
+
+LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+class RoutingState:
+    """Where one request's reads may go, and whether it has written"""
+
+    def __init__(self, sticky):
+        self.replica = False
+        self.sticky = sticky
+        self.wrote = False
+
+
+def replica_safe(view_func, method):
+    """Whether `view_func` may read from a replica when handling `method`"""
+    if method not in SAFE_METHODS:
+        return False
+    if getattr(view_func, 'replica_reads', False):
+        return True
+    # Django's as_view() sets view_class, DRF's ViewSet.as_view() only cls
+    view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+    if view_class is None:
+        return False
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        # DRF answers HEAD with the GET action
+        action = actions.get(method.lower()) or actions.get('get')
+        return action in getattr(view_class, 'replica_actions', REPLICA_ACTIONS)
+    return issubclass(view_class, BaseListView) or getattr(view_class, 'replica_reads', False)
+
+
+def check_replica(alias):
+    """Whether `alias` answers and, on PostgreSQL, is within REPLICA_MAX_LAG"""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(LAG_SQL)
+                [lag] = cursor.fetchone()
+                # NULL on a server that is not replaying WAL, i.e. not lagging
+                return lag is None or lag <= settings.REPLICA_MAX_LAG
+            cursor.execute('SELECT 1')
+            return True
+    except DatabaseError:
+        connection.close_if_unusable_or_obsolete()
+        return False
+
+
+def mark_unhealthy(alias):
+    _health[alias] = (False, time.monotonic())
+
+
+def healthy_replicas():
+    """The replicas to read from, checking those whose last check is stale"""
+    now = time.monotonic()
+    healthy = []
+    for alias in settings.REPLICA_DATABASES:
+        ok, checked = _health.get(alias, (False, None))
+        if checked is None or now - checked >= settings.REPLICA_HEALTH_INTERVAL:
+            ok = check_replica(alias)
+            _health[alias] = (ok, now)
+        if ok:
+            healthy.append(alias)
+    return healthy
+
+
+def _replica_errors(execute, sql, params, many, context):
+    try:
+        return execute(sql, params, many, context)
+    except (OperationalError, InterfaceError):
+        mark_unhealthy(context['connection'].alias)
+        raise
+
+
+def _watch_replica(sender, connection, **kwargs):
+    if connection.alias in settings.REPLICA_DATABASES and _replica_errors not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_replica_errors)
+
+
+connection_created.connect(_watch_replica)
+
+
+class PrimaryReplicaRouter:
+    """Routes reads of replica-safe requests to a healthy replica; see the module docstring"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.sticky or state.wrote:
+            return DEFAULT_DB_ALIAS
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's data, so any two rows may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def read_from_primary():
+    """
+    Keep the rest of the current request's reads on the primary
+
+    For reads whose result outlives the request, such as a response stored
+    in a shared cache: cached after an invalidation, a lagging replica's
+    rows would be served to everyone until the entry expires.
+    """
+    state = _state.get()
+    if state is not None:
+        state.replica = False
+
+
+def _in_state(content, state):
+    """Iterate streamed content with the request's routing, e.g. for exports"""
+    token = _state.set(state)
+    try:
+        yield from content
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRoutingMiddleware:
+    """Decides per request whether reads may use a replica; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState(sticky=STICKY_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState(sticky=STICKY_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if state is not None:
+            state.replica = replica_safe(view_func, request.method)
+
+    def finish(self, request, response, state):
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        elif state.replica and response.streaming and not response.is_async:
+            # Streamed bodies are read after the view returns
+            response.streaming_content = _in_state(response.streaming_content, state)
+        return response
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+import tempfile
 from decouple import config
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -26,14 +27,22 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so the total covers the whole chain; inert unless enabled
+    "dashboard.server_timing.ServerTimingMiddleware",
+    "dashboard.metrics.MetricsMiddleware",
+    "dashboard.nplusone.NPlusOneMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # After authentication, so only superusers can start the profiler
+    "dashboard.profiling.ProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Innermost, so it sees the resolved view; inert without replicas
+    "school_management.db_router.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "school_management.urls"
@@ -76,6 +85,132 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "accounts.User"
 
+# Read replicas (school_management.db_router): aliases in DATABASES that
+# serve replica-safe GET requests. A client that writes reads from the
+# primary for REPLICA_STICKY_SECONDS; each process re-checks a replica every
+# REPLICA_HEALTH_INTERVAL seconds and skips it when down or, on PostgreSQL,
+# more than REPLICA_MAX_LAG seconds behind. dev.py and prod.py fill it in.
+DATABASE_ROUTERS = ["school_management.db_router.PrimaryReplicaRouter"]
+REPLICA_DATABASES = []
+REPLICA_STICKY_SECONDS = 10
+REPLICA_HEALTH_INTERVAL = 5
+REPLICA_MAX_LAG = 5
+
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.CachedPermissionBackend",
+]
+
+# "shared" must be visible to every worker process (file or Redis cache);
+# it holds state that has to agree across workers, like permission snapshots.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": config(
+            "SHARED_CACHE_BACKEND",
+            default="django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": config(
+            "SHARED_CACHE_LOCATION",
+            default=os.path.join(tempfile.gettempdir(), "school_management_cache"),
+        ),
+    },
+    # Token buckets (accounts.throttling), written on every throttled request
+    "throttle": {
+        "BACKEND": config(
+            "THROTTLE_CACHE_BACKEND",
+            default="accounts.throttling.BucketFileCache",
+        ),
+        "LOCATION": config(
+            "THROTTLE_CACHE_LOCATION",
+            default=os.path.join(tempfile.gettempdir(), "school_management_throttle"),
+        ),
+    },
+}
+
+PERMISSION_CACHE_ALIAS = "shared"
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+
+# Rendered API responses (public.response_cache): a per-process LRU in
+# front of the shared cache. Other workers notice an invalidation within
+# RESPONSE_CACHE_VERSION_TTL seconds.
+RESPONSE_CACHE_ENABLED = config("RESPONSE_CACHE_ENABLED", default=True, cast=bool)
+RESPONSE_CACHE_ALIAS = "shared"
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+RESPONSE_CACHE_LOCAL_ENTRIES = 256
+RESPONSE_CACHE_VERSION_TTL = 2
+
+# Write-behind admission intake (public.intake): public submissions are
+# queued and written by `manage.py drain_admission_intake`.
+ADMISSION_INTAKE_QUEUE = config("ADMISSION_INTAKE_QUEUE", default=False, cast=bool)
+
+# Idempotency keys on create endpoints (public.idempotency) are honoured for
+# this long; `manage.py sweep_idempotency_keys` deletes older ones.
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+
+# Token-bucket limits (accounts.throttling), keyed "<View>.<action>" or
+# "<View>" for every action; other views are not throttled. Buckets live in
+# a cache every worker sees, so the limits hold across workers.
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", default=True, cast=bool)
+THROTTLE_CACHE_ALIAS = "throttle"
+THROTTLE_RATES = {
+    "AdmissionApplicationViewSet.create": "10/min",
+    "NoticeViewSet.search": "30/min",
+    "NoticeViewSet": "120/min",
+    # djoser
+    "UserViewSet.create": "5/min",
+    "UserViewSet.activation": "5/min",
+    "UserViewSet.resend_activation": "5/min",
+    "UserViewSet.reset_password": "5/min",
+    "UserViewSet.reset_password_confirm": "5/min",
+    "TokenObtainPairView": "10/min",
+    "TokenRefreshView": "30/min",
+    "TokenVerifyView": "30/min",
+}
+
+# Serve the notice list/recent, dashboard stats and permissions API reads
+# with async views (public.async_api). Enable when running under ASGI.
+ASYNC_API_VIEWS = config("ASYNC_API_VIEWS", default=False, cast=bool)
+
+# Server-Timing headers with query, template and serializer time on every
+# response, and ?_timing=json breakdowns for superusers (dashboard.server_timing)
+SERVER_TIMING_ENABLED = config("SERVER_TIMING_ENABLED", default=False, cast=bool)
+
+# Prometheus request, query and cache metrics (dashboard.metrics), served at
+# /metrics. Workers write to memory-mapped files in METRICS_DIR, which must
+# be shared by every worker of a deployment and match gunicorn.conf.py.
+# Scrapers send "Authorization: Bearer <METRICS_TOKEN>"; without a token
+# only superusers can read the metrics. Off by default; production turns it on.
+METRICS_ENABLED = config("METRICS_ENABLED", default=False, cast=bool)
+METRICS_DIR = config(
+    "PROMETHEUS_MULTIPROC_DIR", default=os.path.join(tempfile.gettempdir(), "school_management_metrics")
+)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# N+1 detection (dashboard.nplusone): a query shape that runs
+# NPLUSONE_THRESHOLD times in one request is logged ("log"), fails the
+# request ("raise", as in the tests) or goes unchecked ("off").
+NPLUSONE_DETECTION = config("NPLUSONE_DETECTION", default="log")
+NPLUSONE_THRESHOLD = 3
+
+# Runs the tests with N+1 detection set to "raise"
+TEST_RUNNER = "school_management.test_runner.TestRunner"
+
+# Sampling profiler (dashboard.profiling): superusers add ?_profile to a URL,
+# and PROFILER_SAMPLE_RATE (0-1) of all requests are profiled at random.
+# Stacks are sampled every PROFILER_INTERVAL seconds for at most
+# PROFILER_MAX_SECONDS; the newest PROFILER_KEEP profiles are kept in
+# PROFILER_DIR and listed at /dashboard/profiles/.
+PROFILER_ENABLED = config("PROFILER_ENABLED", default=False, cast=bool)
+PROFILER_SAMPLE_RATE = config("PROFILER_SAMPLE_RATE", default=0.0, cast=float)
+PROFILER_INTERVAL = 0.005
+PROFILER_MAX_SECONDS = 30
+PROFILER_KEEP = 200
+PROFILER_DIR = config(
+    "PROFILER_DIR", default=os.path.join(tempfile.gettempdir(), "school_management_profiles")
+)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -84,7 +219,14 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "accounts.throttling.TokenBucketThrottle",
+    ],
+    # Proxies in front of the app that append to X-Forwarded-For. Throttling
+    # counts anonymous clients by the address the nearest of them saw, so a
+    # client cannot pick its own bucket by sending the header itself.
+    "NUM_PROXIES": config("NUM_PROXIES", default=0, cast=int),
+    "DEFAULT_PAGINATION_CLASS": "public.pagination.SelectablePagination",
     "PAGE_SIZE": 5,
 }
 
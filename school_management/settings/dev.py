@@ -3,6 +3,9 @@ from .base import *
 DEBUG = True
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "testserver"]
 
+SERVER_TIMING_ENABLED = config("SERVER_TIMING_ENABLED", default=True, cast=bool)
+PROFILER_ENABLED = config("PROFILER_ENABLED", default=True, cast=bool)
+
 USE_SQLITE = config("USE_SQLITE", default=True, cast=bool)
 
 if USE_SQLITE:
@@ -23,3 +26,9 @@ else:
             "PORT": config("DATABASE_PORT"),
         }
     }
+
+# A second connection to the same database stands in for a read replica, so
+# replica routing runs locally; the tests mirror it onto the test database.
+if config("EMULATE_REPLICA", default=True, cast=bool):
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
@@ -1,10 +1,18 @@
 from .base import *
 import dj_database_url
+from decouple import Csv
 
 DEBUG = False
 
 ALLOWED_HOSTS = [config("RENDER_EXTERNAL_HOSTNAME", default="")]
 
+# Timings reveal internals and cost a little on every query
+SERVER_TIMING_ENABLED = False
+# Off unless switched on to chase a slow page; keep PROFILER_SAMPLE_RATE low
+PROFILER_ENABLED = config("PROFILER_ENABLED", default=False, cast=bool)
+# Run under gunicorn.conf.py, which shares METRICS_DIR between workers
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+
 DATABASES = {
     "default": dj_database_url.config(
         # Replace this with your local test DB for migrations
@@ -14,5 +22,20 @@ DATABASES = {
     )
 }
 
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+# Read replicas, e.g. DATABASE_REPLICA_URLS=postgres://replica-1/db,postgres://replica-2/db
+for number, url in enumerate(config("DATABASE_REPLICA_URLS", default="", cast=Csv()), start=1):
+    DATABASES[f"replica{number}"] = dj_database_url.parse(url, conn_max_age=600, ssl_require=True)
+    # A replica that is down should fail its health check fast
+    DATABASES[f"replica{number}"].setdefault("OPTIONS", {})["connect_timeout"] = 2
+    DATABASES[f"replica{number}"]["TEST"] = {"MIRROR": "default"}
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
+
+# Render's load balancer is the one proxy in front of the app
+REST_FRAMEWORK["NUM_PROXIES"] = config("NUM_PROXIES", default=1, cast=int)
+
+# Just inside CorsMiddleware, as in the baseline stack, so static responses
+# still get CORS headers and are timed and counted by the outer middleware
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware"), "whitenoise.middleware.WhiteNoiseMiddleware"
+)
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
\ No newline at end of file
@@ -0,0 +1,19 @@
+"""
+Test runner for the project (settings.TEST_RUNNER).
+
+Runs the whole suite with NPLUSONE_DETECTION = "raise", so any request a
+test makes that repeats a query shape fails instead of logging a warning.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.nplusone = override_settings(NPLUSONE_DETECTION="raise")
+        self.nplusone.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.nplusone.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from public.models import Notice
+from public.response_cache import notice_cache
+
+from . import db_router
+
+User = get_user_model()
+
+
+# TransactionTestCase commits its rows, so the emulated replica (a second
+# connection to the test database) reads the same data as the primary
+@override_settings(RESPONSE_CACHE_ENABLED=False, THROTTLE_ENABLED=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        db_router._health.clear()
+        Notice.objects.create(title='Sports day', content='Friday on the main field.')
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='unused'))
+
+    def get(self, url):
+        """GET url, returning (response, replica queries)"""
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(replica)
+
+    def test_list_views_and_list_actions_read_from_the_replica(self):
+        for url in (reverse('dashboard:notice_management'), reverse('notice-list'), reverse('dashboard-stats')):
+            with self.subTest(url=url):
+                self.assertGreater(self.get(url)[1], 0)
+
+    def test_other_views_read_from_the_primary(self):
+        self.assertEqual(self.get(reverse('dashboard:role_management'))[1], 0)
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        response = self.client.post(reverse('dashboard:notice_create'), {'title': 'Exam', 'content': 'Monday'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(db_router.STICKY_COOKIE, response.cookies)
+        response, replica_queries = self.get(reverse('dashboard:notice_management'))
+        self.assertEqual(replica_queries, 0)
+        self.assertContains(response, 'Exam')
+
+    def test_unhealthy_replica_falls_back_to_the_primary(self):
+        db_router.mark_unhealthy('replica')
+        self.assertEqual(self.get(reverse('dashboard:notice_management'))[1], 0)
+        # Forgetting the result stands in for REPLICA_HEALTH_INTERVAL passing
+        db_router._health.clear()
+        self.assertGreater(self.get(reverse('dashboard:notice_management'))[1], 0)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True, THROTTLE_ENABLED=False)
+class CachedReadRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        db_router._health.clear()
+        notice_cache.invalidate()
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='unused'))
+
+    def test_cache_fills_after_a_write_read_from_the_primary(self):
+        response = self.client.post(reverse('dashboard:notice_create'), {'title': 'Exam', 'content': 'Monday', 'is_active': 'on'})
+        self.assertEqual(response.status_code, 302)
+        # Another visitor, without the writer's sticky cookie
+        anonymous = self.client_class()
+        for url in (reverse('notice-list'), reverse('notice-recent')):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connections['replica']) as replica:
+                    response = anonymous.get(url)
+                self.assertContains(response, 'Exam')
+                self.assertEqual(len(replica), 0)
+                with CaptureQueriesContext(connections['default']) as primary:
+                    self.assertContains(anonymous.get(url), 'Exam')
+                self.assertEqual(len(primary), 0)
@@ -30,16 +30,21 @@ class APIClient {
 
     /**
      * Generic API request method
+     *
+     * GETs use the 'no-cache' fetch mode: the browser keeps the response and
+     * revalidates it with If-None-Match / If-Modified-Since on every call,
+     * so an unchanged resource costs a 304 instead of a full download.
      */
     async request(endpoint, options = {}) {
         const url = `${this.baseURL}${endpoint}`;
         const config = {
+            cache: 'no-cache',
+            ...options,
             headers: {
                 'Content-Type': 'application/json',
                 'X-CSRFToken': this.csrfToken,
                 ...options.headers
-            },
-            ...options
+            }
         };
 
         try {
@@ -68,9 +73,11 @@ class APIClient {
         return this.request(`/public/notices/${id}/`);
     }
 
-    async createNotice(data) {
+    // Pass the same idempotencyKey when retrying so the record is created once
+    async createNotice(data, idempotencyKey = null) {
         return this.request('/public/notices/', {
             method: 'POST',
+            headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
             body: JSON.stringify(data)
         });
     }
@@ -93,9 +100,16 @@ class APIClient {
         return this.request(`/public/admissions/${queryString ? '?' + queryString : ''}`);
     }
 
-    async createAdmission(data) {
+    async autocompleteAdmissions(query, limit = 10) {
+        const queryString = new URLSearchParams({ q: query, limit }).toString();
+        return this.request(`/public/admissions/autocomplete/?${queryString}`);
+    }
+
+    // Pass the same idempotencyKey when retrying so the record is created once
+    async createAdmission(data, idempotencyKey = null) {
         return this.request('/public/admissions/', {
             method: 'POST',
+            headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
             body: JSON.stringify(data)
         });
     }
@@ -114,6 +128,18 @@ class APIClient {
         return this.request(`/dashboard/users/${queryString ? '?' + queryString : ''}`);
     }
 
+    async autocompleteUsers(query, limit = 10) {
+        const queryString = new URLSearchParams({ q: query, limit }).toString();
+        return this.request(`/dashboard/users/autocomplete/?${queryString}`);
+    }
+
+    async bulkUpdateRoles(userIds, groupIds, mode = 'assign') {
+        return this.request('/dashboard/users/bulk-roles/', {
+            method: 'POST',
+            body: JSON.stringify({ users: userIds, groups: groupIds, mode: mode })
+        });
+    }
+
     async updateUserRoles(userId, groupIds) {
         return this.request(`/dashboard/users/${userId}/update_roles/`, {
             method: 'POST',